@@ -0,0 +1,389 @@
+"""API HTTP de solo lectura con los resultados, servida desde memoria.
+
+Los consumidores internos leían resultados_todos.json y los historico_*.json
+del repositorio. Este servidor (asyncio de la stdlib, sin dependencias) los
+sirve desde memoria:
+
+    GET /resultados                      resultados_todos.json
+    GET /resultados/<juego>              último resultado del juego
+    GET /historico/<juego>               histórico paginado (más reciente primero)
+        ?pagina=1&por_pagina=50&desde=YYYY-MM-DD&hasta=YYYY-MM-DD
+    GET /historico/<juego>/<fecha>       un sorteo
+    GET /salud                           fecha del último sorteo de cada juego
+
+Cada archivo se lee y parsea una sola vez. Cada respuesta se arma la primera
+vez que se pide y queda guardada ya serializada, comprimida con gzip y con su
+ETag (LRU de API_CACHE_MAX_RESPUESTAS), así que una consulta repetida no
+serializa nada y un cliente con If-None-Match recibe 304 sin cuerpo.
+
+Cada API_INTERVALO_REFRESCO segundos se hace un stat de los archivos (en un
+hilo, como la lectura y el parseo): los que el scraper reescribió (escritura
+atómica: cambia mtime/inodo) se recargan y se descartan solo las respuestas
+armadas con ellos. Un archivo que no se puede leer o parsear no tumba el
+refresco: se sigue sirviendo la versión anterior.
+
+Uso:
+    python api_resultados.py                    # API_HOST:API_PUERTO
+    python api_resultados.py --puerto 9000 --host 0.0.0.0
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from config import (
+    API_CACHE_MAX_RESPUESTAS,
+    API_GZIP_MINIMO,
+    API_HOST,
+    API_INTERVALO_REFRESCO,
+    API_MAX_AGE_SEGUNDOS,
+    API_POR_PAGINA,
+    API_POR_PAGINA_MAXIMA,
+    API_PUERTO,
+    API_TIMEOUT_INACTIVIDAD,
+    COMBINED_FILE,
+    GAMES,
+)
+
+MAX_CABECERAS = 16 * 1024
+RAZONES = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 431: 'Request Header Fields Too Large', 503: 'Service Unavailable'}
+
+
+class ErrorApi(Exception):
+    def __init__(self, status, mensaje):
+        super().__init__(mensaje)
+        self.status = status
+
+
+class Fuente:
+    """Un archivo JSON en memoria; se recarga si cambia su firma (stat)."""
+
+    def __init__(self, nombre, ruta, historico=False):
+        self.nombre = nombre
+        self.ruta = ruta
+        self.historico = historico
+        self.firma = None
+        self.crudo = None       # bytes del archivo tal cual
+        self.datos = None       # JSON parseado
+        self.por_fecha = {}     # solo históricos: fecha -> entrada
+        self.modificado = None  # mtime, para Last-Modified
+
+    def _firma(self):
+        try:
+            st = os.stat(self.ruta)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def leer_cambios(self):
+        """Lee el archivo si cambió su firma; devuelve la carga para aplicar()
+        o None si no hay nada que recargar.
+
+        Bloquea (stat, lectura y json.loads): el refresco periódico lo corre
+        en un hilo. Si el archivo no se puede leer o no tiene el formato
+        esperado, se sigue sirviendo lo anterior y se reintenta en el
+        próximo refresco."""
+        try:
+            firma = self._firma()
+            if firma == self.firma:
+                return None
+            if firma is None:
+                return None, None, None, {}
+            with open(self.ruta, 'rb') as f:
+                crudo = f.read()
+            datos = json.loads(crudo)
+            por_fecha = {}
+            if self.historico:
+                datos = sorted(datos, key=lambda e: e['sorteo']['fecha'], reverse=True)
+                por_fecha = {e['sorteo']['fecha']: e for e in datos}
+        except Exception as e:
+            logging.warning(f"API: no se pudo recargar {self.ruta}: {e}")
+            return None
+        return firma, crudo, datos, por_fecha
+
+    def aplicar(self, carga):
+        self.firma, self.crudo, self.datos, self.por_fecha = carga
+        if self.firma is not None:
+            self.modificado = self.firma[0] / 1e9
+
+
+class Respuesta:
+    """Cuerpo ya serializado (y comprimido) con su ETag."""
+
+    __slots__ = ('status', 'cuerpo', 'comprimido', 'etag', 'modificado')
+
+    def __init__(self, status, cuerpo, modificado=None):
+        self.status = status
+        self.cuerpo = cuerpo
+        self.comprimido = gzip.compress(cuerpo, mtime=0) if len(cuerpo) >= API_GZIP_MINIMO else None
+        self.etag = '"' + hashlib.blake2b(cuerpo, digest_size=12).hexdigest() + '"'
+        self.modificado = modificado
+
+    @classmethod
+    def json(cls, status, datos, modificado=None):
+        return cls(status, json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                   modificado)
+
+
+def etag_coincide(if_none_match, etag):
+    if not if_none_match:
+        return False
+    etiquetas = {e.strip().removeprefix('W/') for e in if_none_match.split(',')}
+    return '*' in etiquetas or etag in etiquetas
+
+
+def _entero(params, nombre, defecto, minimo, maximo):
+    valor = params.get(nombre, [None])[-1]
+    if valor is None:
+        return defecto
+    try:
+        valor = int(valor)
+    except ValueError:
+        raise ErrorApi(400, f"'{nombre}' debe ser un número entero")
+    if not minimo <= valor <= maximo:
+        raise ErrorApi(400, f"'{nombre}' debe estar entre {minimo} y {maximo}")
+    return valor
+
+
+class ApiResultados:
+    def __init__(self, games=None, combined_file=COMBINED_FILE, max_respuestas=API_CACHE_MAX_RESPUESTAS):
+        self.games = games or GAMES
+        self.fuentes = {'combinado': Fuente('combinado', combined_file)}
+        for game_key, cfg in self.games.items():
+            self.fuentes[f'resultados:{game_key}'] = Fuente(game_key, cfg['results_file'])
+            self.fuentes[f'historico:{game_key}'] = Fuente(game_key, cfg['historic_file'], historico=True)
+        self.max_respuestas = max_respuestas
+        self._respuestas = OrderedDict()   # (fuente, ruta, parámetros) -> Respuesta
+        self.estadisticas = {'peticiones': 0, 'armadas': 0, 'no_modificadas': 0, 'recargas': 0}
+        self.refrescar()
+
+    # ──────────────────────────────────────────────
+    # Caché
+    # ──────────────────────────────────────────────
+    def refrescar(self):
+        """Revisa todas las fuentes; descarta las respuestas de las que cambiaron."""
+        return self._aplicar(self._leer_cambios())
+
+    async def refrescar_async(self):
+        """refrescar() con la lectura de los archivos en un hilo, fuera del
+        event loop; las fuentes y la caché se actualizan desde el loop."""
+        return self._aplicar(await asyncio.to_thread(self._leer_cambios))
+
+    def _leer_cambios(self):
+        return {clave: fuente.leer_cambios() for clave, fuente in self.fuentes.items()}
+
+    def _aplicar(self, cargas):
+        cambiadas = set()
+        for clave, carga in cargas.items():
+            if carga is not None:
+                self.fuentes[clave].aplicar(carga)
+                cambiadas.add(clave)
+        if cambiadas:
+            self.estadisticas['recargas'] += len(cambiadas)
+            for clave in [c for c in self._respuestas if c[0] in cambiadas or c[0] == 'salud']:
+                del self._respuestas[clave]
+        return cambiadas
+
+    async def refrescar_periodicamente(self, intervalo=API_INTERVALO_REFRESCO):
+        while True:
+            await asyncio.sleep(intervalo)
+            cambiadas = await self.refrescar_async()
+            if cambiadas:
+                logging.info(f"API: recargado {', '.join(sorted(cambiadas))}")
+
+    def _cacheada(self, clave, armar):
+        respuesta = self._respuestas.get(clave)
+        if respuesta is not None:
+            self._respuestas.move_to_end(clave)
+            return respuesta
+        respuesta = armar()
+        self.estadisticas['armadas'] += 1
+        self._respuestas[clave] = respuesta
+        while len(self._respuestas) > self.max_respuestas:
+            self._respuestas.popitem(last=False)
+        return respuesta
+
+    # ──────────────────────────────────────────────
+    # Rutas
+    # ──────────────────────────────────────────────
+    def _fuente(self, clave):
+        fuente = self.fuentes.get(clave)
+        if fuente is None:
+            raise ErrorApi(404, 'juego desconocido')
+        if fuente.datos is None:
+            raise ErrorApi(503, f'{fuente.ruta} todavía no existe')
+        return fuente
+
+    def resolver(self, ruta, query=''):
+        """Respuesta (status, cuerpo, ETag) para una ruta GET; errores como JSON."""
+        try:
+            return self._resolver(ruta, parse_qs(query))
+        except ErrorApi as e:
+            return Respuesta.json(e.status, {'error': str(e)})
+
+    def _resolver(self, ruta, params):
+        partes = [unquote(p) for p in ruta.strip('/').split('/') if p]
+        if partes == ['resultados']:
+            fuente = self._fuente('combinado')
+            return self._cacheada(('combinado', 'resultados', ()),
+                                  lambda: Respuesta(200, fuente.crudo, fuente.modificado))
+        if len(partes) == 2 and partes[0] == 'resultados':
+            clave = f'resultados:{partes[1]}'
+            fuente = self._fuente(clave)
+            return self._cacheada((clave, 'resultados', ()), lambda: Respuesta(200, fuente.crudo, fuente.modificado))
+        if len(partes) == 3 and partes[0] == 'historico':
+            clave = f'historico:{partes[1]}'
+            fuente = self._fuente(clave)
+            entrada = fuente.por_fecha.get(partes[2])
+            if entrada is None:
+                raise ErrorApi(404, f'no hay sorteo el {partes[2]}')
+            return self._cacheada((clave, 'sorteo', partes[2]),
+                                  lambda: Respuesta.json(200, entrada, fuente.modificado))
+        if len(partes) == 2 and partes[0] == 'historico':
+            return self._pagina(partes[1], params)
+        if partes == ['salud']:
+            return self._cacheada(('salud', 'salud', ()), self._salud)
+        raise ErrorApi(404, 'ruta desconocida')
+
+    def _pagina(self, game_key, params):
+        clave = f'historico:{game_key}'
+        fuente = self._fuente(clave)
+        por_pagina = _entero(params, 'por_pagina', API_POR_PAGINA, 1, API_POR_PAGINA_MAXIMA)
+        pagina = _entero(params, 'pagina', 1, 1, 10 ** 9)
+        desde = params.get('desde', [None])[-1]
+        hasta = params.get('hasta', [None])[-1]
+
+        def armar():
+            sorteos = fuente.datos
+            if desde or hasta:
+                sorteos = [e for e in sorteos
+                           if (not desde or e['sorteo']['fecha'] >= desde)
+                           and (not hasta or e['sorteo']['fecha'] <= hasta)]
+            total = len(sorteos)
+            inicio = (pagina - 1) * por_pagina
+            return Respuesta.json(200, {
+                'juego': game_key,
+                'pagina': pagina,
+                'por_pagina': por_pagina,
+                'total': total,
+                'paginas': -(-total // por_pagina),
+                'sorteos': sorteos[inicio:inicio + por_pagina],
+            }, fuente.modificado)
+
+        return self._cacheada((clave, 'pagina', (pagina, por_pagina, desde, hasta)), armar)
+
+    def _salud(self):
+        juegos = {}
+        for game_key in self.games:
+            fuente = self.fuentes[f'historico:{game_key}']
+            juegos[game_key] = fuente.datos[0]['sorteo']['fecha'] if fuente.datos else None
+        return Respuesta.json(200, {'ultimo_sorteo': juegos})
+
+    # ──────────────────────────────────────────────
+    # HTTP
+    # ──────────────────────────────────────────────
+    def cabeceras_y_cuerpo(self, metodo, ruta, cabeceras):
+        """Bytes de la respuesta HTTP completa para una petición ya parseada."""
+        self.estadisticas['peticiones'] += 1
+        if metodo not in ('GET', 'HEAD'):
+            respuesta = Respuesta.json(405, {'error': 'solo GET y HEAD'})
+        else:
+            url = urlsplit(ruta)
+            respuesta = self.resolver(url.path, url.query)
+
+        gzip_ok = respuesta.comprimido is not None and 'gzip' in cabeceras.get('accept-encoding', '')
+        etag = respuesta.etag[:-1] + '-gz"' if gzip_ok else respuesta.etag
+        lineas = {'Content-Type': 'application/json; charset=utf-8', 'Vary': 'Accept-Encoding'}
+        status, cuerpo = respuesta.status, respuesta.comprimido if gzip_ok else respuesta.cuerpo
+        if status == 200:
+            lineas['ETag'] = etag
+            lineas['Cache-Control'] = f'public, max-age={API_MAX_AGE_SEGUNDOS}'
+            if respuesta.modificado:
+                lineas['Last-Modified'] = formatdate(respuesta.modificado, usegmt=True)
+            inm = cabeceras.get('if-none-match')
+            if etag_coincide(inm, etag) or etag_coincide(inm, respuesta.etag):
+                status, cuerpo = 304, b''
+                self.estadisticas['no_modificadas'] += 1
+        if gzip_ok and status != 304:
+            lineas['Content-Encoding'] = 'gzip'
+        if status == 405:
+            lineas['Allow'] = 'GET, HEAD'
+        lineas['Content-Length'] = str(len(cuerpo))
+        cabecera = f'HTTP/1.1 {status} {RAZONES[status]}\r\n' + ''.join(f'{k}: {v}\r\n' for k, v in lineas.items())
+        return cabecera.encode('latin-1') + b'\r\n' + (b'' if metodo == 'HEAD' else cuerpo)
+
+    async def atender(self, reader, writer):
+        """Conexión keep-alive: una petición tras otra hasta que el cliente cierre."""
+        try:
+            while True:
+                try:
+                    crudo = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), API_TIMEOUT_INACTIVIDAD)
+                except asyncio.LimitOverrunError:
+                    writer.write(b'HTTP/1.1 431 Request Header Fields Too Large\r\n'
+                                 b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                lineas = crudo.decode('latin-1').split('\r\n')
+                try:
+                    metodo, ruta, version = lineas[0].split(' ', 2)
+                except ValueError:
+                    writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+                cabeceras = {}
+                for linea in lineas[1:]:
+                    nombre, _, valor = linea.partition(':')
+                    if nombre:
+                        cabeceras[nombre.strip().lower()] = valor.strip()
+                conexion = cabeceras.get('connection', '').lower()
+                seguir = conexion != 'close' if version == 'HTTP/1.1' else conexion == 'keep-alive'
+                writer.write(self.cabeceras_y_cuerpo(metodo, ruta, cabeceras))
+                await writer.drain()
+                if not seguir:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host=API_HOST, puerto=API_PUERTO, intervalo=API_INTERVALO_REFRESCO):
+        servidor = await asyncio.start_server(self.atender, host, puerto, limit=MAX_CABECERAS)
+        refresco = asyncio.create_task(self.refrescar_periodicamente(intervalo))
+        direcciones = ', '.join(f'{s.getsockname()[0]}:{s.getsockname()[1]}' for s in servidor.sockets)
+        logging.info(f"API de resultados escuchando en {direcciones}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            refresco.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='API HTTP de solo lectura con los resultados')
+    parser.add_argument('--host', default=API_HOST, help=f'interfaz (por defecto {API_HOST})')
+    parser.add_argument('--puerto', type=int, default=API_PUERTO, help=f'puerto (por defecto {API_PUERTO})')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    api = ApiResultados()
+    inicio = time.monotonic()
+    try:
+        asyncio.run(api.servir(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    e = api.estadisticas
+    logging.info(f"API detenida tras {time.monotonic() - inicio:.0f}s: {e['peticiones']} peticiones, "
+                 f"{e['no_modificadas']} 304, {e['armadas']} respuestas armadas, {e['recargas']} recargas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Carga histórica completa desde data.ny.gov (backfill).
+
+data.ny.gov guarda años de sorteos de Powerball, Mega Millions y Cash4Life,
+mientras que los históricos solo tienen lo que el cron alcanzó a ver. Este
+comando recorre cada `socrata_url` en páginas ($limit/$offset, con $select
+de las columnas necesarias), convierte cada fila con parse_socrata_row y la
+carga en el histórico indexado página por página, sin tener todo el dataset
+en memoria. Al final regenera el JSON una sola vez.
+
+El offset alcanzado se guarda como checkpoint en la misma transacción que
+cada página: si la carga se corta, la siguiente ejecución sigue desde ahí
+(y una vez completa, solo trae las filas nuevas).
+
+Uso:
+    python backfill.py                    # todos los juegos con socrata_url
+    python backfill.py powerball cash4life
+    python backfill.py --reiniciar        # ignora el checkpoint
+"""
+
+import argparse
+import logging
+import time
+
+from config import GAMES, SOCRATA_TAM_PAGINA
+from lottery_scraper import crear_scraper
+import historico_store
+import sesiones_http
+
+CHECKPOINT = 'backfill_offset'
+
+
+def columnas_socrata(cfg):
+    formato = cfg['socrata_formato']
+    columnas = ['draw_date', 'winning_numbers', formato['campo_especial'], formato['campo_multiplicador']]
+    return ','.join(c for c in columnas if c)
+
+
+def backfill_juego(scraper, tam_pagina=SOCRATA_TAM_PAGINA, reiniciar=False):
+    """Carga en el histórico todos los sorteos de data.ny.gov; devuelve cuántos eran nuevos."""
+    store = scraper.historico
+    offset = 0 if reiniciar else int(store.leer_meta(CHECKPOINT) or 0)
+    if offset:
+        logging.info(f"[{scraper.nombre}] Retomando backfill desde la fila {offset}")
+
+    inicio = time.monotonic()
+    filas_leidas = nuevos = descartadas = 0
+    for offset, filas in scraper.iterar_socrata(offset=offset, tam_pagina=tam_pagina,
+                                                select=columnas_socrata(scraper.cfg)):
+        entradas = []
+        for fila in filas:
+            results = scraper.parse_socrata_row(fila)
+            if results.get('_success'):
+                entradas.append(scraper.entrada_historico(results))
+            else:
+                descartadas += 1
+        nuevos += store.agregar_varios(entradas, meta={CHECKPOINT: offset})
+        filas_leidas += len(filas)
+
+        transcurrido = max(time.monotonic() - inicio, 1e-9)
+        logging.info(
+            f"[{scraper.nombre}] {filas_leidas} filas ({filas_leidas / transcurrido:.0f} filas/s), "
+            f"{nuevos} nuevas, offset {offset}"
+        )
+
+    store.exportar_pendiente()
+    logging.info(
+        f"[{scraper.nombre}] Backfill terminado: {filas_leidas} filas leídas, {nuevos} sorteos nuevos, "
+        f"{descartadas} descartadas, histórico con {len(store)} sorteos"
+    )
+    return nuevos
+
+
+def main(argv=None):
+    con_socrata = [k for k, cfg in GAMES.items() if cfg.get('socrata_url')]
+    parser = argparse.ArgumentParser(description='Carga histórica completa desde data.ny.gov')
+    parser.add_argument('juegos', nargs='*', metavar='JUEGO',
+                        help=f"juegos a cargar ({', '.join(con_socrata)}; por defecto todos)")
+    parser.add_argument('--tam-pagina', type=int, default=SOCRATA_TAM_PAGINA,
+                        help=f'filas por página (por defecto {SOCRATA_TAM_PAGINA})')
+    parser.add_argument('--reiniciar', action='store_true',
+                        help='empezar desde la primera fila, ignorando el checkpoint')
+    args = parser.parse_args(argv)
+    desconocidos = [j for j in args.juegos if j not in con_socrata]
+    if desconocidos:
+        parser.error(f"juegos sin fuente data.ny.gov: {', '.join(desconocidos)}")
+
+    fallidos = []
+    for game_key in args.juegos or con_socrata:
+        scraper = crear_scraper(game_key, GAMES[game_key])
+        try:
+            backfill_juego(scraper, tam_pagina=args.tam_pagina, reiniciar=args.reiniciar)
+        except Exception as e:
+            logging.error(f"[{scraper.nombre}] Backfill interrumpido: {e} (se puede retomar)")
+            fallidos.append(game_key)
+
+    sesiones_http.cerrar_sesiones()
+    historico_store.cerrar_stores()
+    if fallidos:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
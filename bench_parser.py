@@ -0,0 +1,87 @@
+"""Benchmark de los backends del parser HTML (no usa la red).
+
+Mide el tiempo de parse_html por página con cada backend de BeautifulSoup
+instalado (lxml, html.parser, html5lib) y verifica que todos extraigan el
+mismo resultado. lxml y html5lib son opcionales (no están en
+requirements.txt): los que no estén instalados se omiten. Sin archivos usa
+las páginas de ejemplo de paginas_ejemplo.py; para
+medir con páginas reales, guardarlas antes (ej. `curl -o pb.html
+https://www.powerball.com/`) y pasarlas como argumento.
+
+Uso:
+    python bench_parser.py
+    python bench_parser.py pb.html la.html --juego powerball -n 50
+"""
+
+import argparse
+import logging
+import time
+
+from config import GAMES
+from lottery_scraper import BACKENDS_HTML, backends_disponibles, crear_scraper
+from paginas_ejemplo import HTML_LOTTO_AMERICA, HTML_POWERBALL
+
+
+def paginas_de_ejemplo():
+    return {
+        'ejemplo powerball': ('powerball', HTML_POWERBALL),
+        'ejemplo lotto america': ('lottoamerica', HTML_LOTTO_AMERICA),
+    }
+
+
+def medir(scraper, html, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        results = scraper.parse_html(html)
+    return (time.perf_counter() - inicio) / repeticiones, results
+
+
+def comparable(results):
+    return {k: v for k, v in results.items() if k != 'fecha_actualizacion'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compara los backends del parser HTML')
+    parser.add_argument('archivos', nargs='*', help='páginas HTML guardadas (por defecto, las de ejemplo)')
+    parser.add_argument('--juego', default='powerball', help='configuración de juego a usar (por defecto powerball)')
+    parser.add_argument('-n', '--repeticiones', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    # Sin logs por cada parseo
+    logging.disable(logging.INFO)
+
+    if args.archivos:
+        paginas = {}
+        for ruta in args.archivos:
+            with open(ruta, 'rb') as f:
+                paginas[ruta] = (args.juego, f.read())
+    else:
+        paginas = paginas_de_ejemplo()
+
+    backends = backends_disponibles()
+    faltantes = [b for b in BACKENDS_HTML if b not in backends]
+    print(f"Backends instalados: {', '.join(backends)} | {args.repeticiones} repeticiones por página")
+    if faltantes:
+        print(f"Se omiten (no instalados): {', '.join(faltantes)} (pip install {' '.join(faltantes)})")
+    print()
+    print(f"{'página':<28}{'backend':<14}{'ms/página':>12}{'vs html.parser':>16}")
+    for nombre, (juego, html) in paginas.items():
+        # Sin la página dedicada del Double Play: solo se mide el parseo
+        cfg = {k: v for k, v in GAMES[juego].items() if k != 'double_play_url'}
+        tiempos, referencia = {}, None
+        for backend in backends:
+            scraper = crear_scraper(juego, cfg)
+            scraper.backend_html = backend
+            tiempos[backend], results = medir(scraper, html, args.repeticiones)
+            if referencia is None:
+                referencia = comparable(results)
+            elif comparable(results) != referencia:
+                print(f"  ¡ATENCIÓN! {backend} extrae un resultado distinto en {nombre}")
+        base = tiempos.get('html.parser')
+        for backend, t in tiempos.items():
+            relativo = f"{base / t:.2f}x" if base else '-'
+            print(f"{nombre[:27]:<28}{backend:<14}{t * 1000:>12.3f}{relativo:>16}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Caché HTTP condicional en disco (ETag / Last-Modified).
+
+Por cada URL se guardan los validadores de la última respuesta y el resultado
+ya parseado. En la siguiente corrida la petición se envía con
+`If-None-Match`/`If-Modified-Since`; si el servidor responde 304 no hay cuerpo
+que descargar ni HTML/JSON que parsear: se reutiliza el resultado guardado.
+
+La fecha de modificación de cada archivo marca su último uso (se renueva con
+cada 304): una entrada sin uso por más de CACHE_HTTP_TTL_SEGUNDOS vence, y si
+el directorio supera CACHE_HTTP_MAX_BYTES se eliminan las usadas hace más
+tiempo. Cada entrada guarda además la VERSION_PARSEO de memo_parseo.py: si el
+parser cambió, el resultado guardado ya no vale aunque la página no cambie.
+
+La caché solo sirve si el directorio sobrevive entre corridas: el demonio y
+las corridas locales lo reutilizan; el workflow lo guarda con actions/cache.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+import escritura
+from config import CACHE_HTTP_DIR, CACHE_HTTP_MAX_BYTES, CACHE_HTTP_TTL_SEGUNDOS
+from memo_parseo import VERSION_PARSEO
+
+
+def clave(url, params=None, variante=''):
+    """Clave de caché: URL + parámetros ordenados + variante (quién la parsea)."""
+    if params:
+        url = f"{url}?{urlencode(sorted(params.items()))}"
+    return f"{url}#{variante}" if variante else url
+
+
+class CacheHTTP:
+    def __init__(self, directorio=CACHE_HTTP_DIR, ttl=CACHE_HTTP_TTL_SEGUNDOS,
+                 max_bytes=CACHE_HTTP_MAX_BYTES):
+        self.directorio = directorio
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.estadisticas = {'hits': 0, 'misses': 0, 'escrituras': 0, 'evicciones': 0}
+
+    def _ruta(self, clave):
+        nombre = hashlib.sha256(clave.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directorio, f'{nombre}.json')
+
+    def _contar(self, campo, n=1):
+        with self._lock:
+            self.estadisticas[campo] += n
+
+    def _vencida(self, mtime, ahora=None):
+        # mtime = último uso (ver hit); el mismo reloj en leer y en purgar
+        return (ahora or time.time()) - mtime > self.ttl
+
+    def leer(self, clave):
+        """Entrada vigente para la clave, o None (ausente, corrupta, vencida o de
+        otra versión del parser)."""
+        ruta = self._ruta(clave)
+        try:
+            vencida = self._vencida(os.stat(ruta).st_mtime)
+            with open(ruta, 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if vencida or entrada.get('clave') != clave or entrada.get('version_parseo') != VERSION_PARSEO:
+            self._eliminar(ruta)
+            return None
+        return entrada
+
+    @staticmethod
+    def cabeceras_condicionales(entrada):
+        if not entrada:
+            return {}
+        cabeceras = {}
+        if entrada.get('etag'):
+            cabeceras['If-None-Match'] = entrada['etag']
+        if entrada.get('last_modified'):
+            cabeceras['If-Modified-Since'] = entrada['last_modified']
+        return cabeceras
+
+    def hit(self, clave):
+        self._contar('hits')
+        try:
+            # La fecha de modificación marca el último uso (para el desalojo LRU)
+            os.utime(self._ruta(clave))
+        except OSError:
+            pass
+
+    def miss(self):
+        self._contar('misses')
+
+    def guardar(self, clave, response, resultado):
+        """Guarda validadores + resultado si la respuesta trae ETag o Last-Modified."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return False
+        entrada = {
+            'clave': clave,
+            'etag': etag,
+            'last_modified': last_modified,
+            'version_parseo': VERSION_PARSEO,
+            'resultado': resultado,
+        }
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            escritura.escribir_atomico(self._ruta(clave), json.dumps(entrada, ensure_ascii=False))
+        except OSError as e:
+            logging.warning(f"No se pudo escribir la caché HTTP: {e}")
+            return False
+        self._contar('escrituras')
+        return True
+
+    def _eliminar(self, ruta):
+        try:
+            os.remove(ruta)
+            self._contar('evicciones')
+        except OSError:
+            pass
+
+    def purgar(self):
+        """Elimina entradas vencidas y, si se supera el tamaño máximo, las menos usadas."""
+        try:
+            nombres = [n for n in os.listdir(self.directorio) if n.endswith('.json')]
+        except FileNotFoundError:
+            return
+        ahora = time.time()
+        vigentes = []
+        for nombre in nombres:
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                continue
+            if self._vencida(st.st_mtime, ahora):
+                self._eliminar(ruta)
+            else:
+                vigentes.append((st.st_mtime, st.st_size, ruta))
+
+        total = sum(size for _, size, _ in vigentes)
+        for _, size, ruta in sorted(vigentes):
+            if total <= self.max_bytes:
+                break
+            self._eliminar(ruta)
+            total -= size
+
+    def resumen(self):
+        e = self.estadisticas
+        return (f"Caché HTTP: {e['hits']} hits (304), {e['misses']} misses, "
+                f"{e['escrituras']} escrituras, {e['evicciones']} evicciones")
+
+
+cache = CacheHTTP()
@@ -6,15 +6,143 @@ LOG_FILE = 'lottery_scraper.log'
 # Configuración de reintentos (por juego)
 MAX_RETRY_ATTEMPTS = 3
 RETRY_DELAY_SECONDS = 10
+# Backoff exponencial con jitter (reintentos.py): antes del intento n+1 se
+# espera un tiempo al azar entre 0 y RETRY_DELAY_SECONDS·2^(n-1), con este tope.
+RETRY_BACKOFF_MAX_SEGUNDOS = 60
+# Máximo de intentos según la clase del error (nunca más que MAX_RETRY_ATTEMPTS)
+REINTENTOS_POR_CLASE = {
+    'transitorio': MAX_RETRY_ATTEMPTS,  # timeouts, conexión, HTTP 5xx/408/429
+    'parseo': 2,                        # la página llegó sin el sorteo completo
+    'permanente': 1,                    # otros 4xx
+    'circuito': 1,                      # host (y respaldo) con el circuito abierto
+}
+# Circuit breaker por host: tras estos fallos seguidos (red o 5xx) el host se
+# deja de consultar y los juegos pasan directo al respaldo; después del
+# enfriamiento se prueba con una sola petición.
+CIRCUITO_UMBRAL_FALLOS = 3
+CIRCUITO_ENFRIAMIENTO_SEGUNDOS = 120
 
 # Timeout de peticiones HTTP (segundos)
 REQUEST_TIMEOUT = 15
 
+# Pool de conexiones HTTP (sesiones_http.py): una sesión keep-alive por host.
+# HTTP_POOL_MAXSIZE es el máximo de conexiones simultáneas reutilizables por
+# host; conviene que no sea menor que MAX_WORKERS.
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 10
+
+# Limitador de peticiones por host (limitador.py): cubeta de tokens compartida
+# por todos los juegos que consultan el mismo origen. 'tasa' = peticiones por
+# segundo sostenidas, 'rafaga' = peticiones seguidas sin esperar. Un host que
+# no está en la lista usa LIMITE_POR_DEFECTO (None = sin límite).
+LIMITES_POR_HOST = {
+    'www.powerball.com': {'tasa': 1.0, 'rafaga': 4},
+    'data.ny.gov': {'tasa': 2.0, 'rafaga': 5},
+    'www.megamillions.com': {'tasa': 1.0, 'rafaga': 2},
+}
+LIMITE_POR_DEFECTO = {'tasa': 1.0, 'rafaga': 2}
+
+# Caché HTTP condicional (cache_http.py): guarda ETag/Last-Modified y el
+# resultado ya parseado de cada página; si el servidor responde 304 no se
+# descarga ni se parsea nada. Las entradas vencen a los TTL segundos y el
+# directorio se limita a CACHE_HTTP_MAX_BYTES (se desalojan las menos usadas).
+CACHE_HTTP_ACTIVO = True
+CACHE_HTTP_DIR = '.cache_http'
+CACHE_HTTP_TTL_SEGUNDOS = 7 * 24 * 3600
+CACHE_HTTP_MAX_BYTES = 5 * 1024 * 1024
+
+# Memo de parseo (memo_parseo.py): el resultado de parse_html se guarda por
+# hash del contenido de la página (sin scripts ni comentarios); si la página
+# no cambió se reutiliza sin parsear. LRU de MEMO_PARSEO_MAX_ENTRADAS
+# entradas, persistido en MEMO_PARSEO_ARCHIVO entre corridas.
+MEMO_PARSEO_ACTIVO = True
+MEMO_PARSEO_ARCHIVO = '.cache_parseo.json'
+MEMO_PARSEO_MAX_ENTRADAS = 64
+
+# Backend del parser HTML (BeautifulSoup). 'auto' usa el más rápido que esté
+# instalado: lxml si está disponible, si no el 'html.parser' de la stdlib.
+# Valores posibles: 'auto', 'lxml', 'html.parser', 'html5lib'.
+# Para comparar tiempos: python bench_parser.py
+HTML_PARSER = 'auto'
+
+# Ejecución concurrente: los juegos se extraen en paralelo en un pool acotado
+# de hilos, así un juego lento (o sus reintentos) no retrasa a los demás.
+# Con `python lottery_scraper.py --secuencial` se vuelve al modo uno a uno.
+EJECUCION_CONCURRENTE = True
+MAX_WORKERS = 5
+
+# Peticiones con cobertura (hedging): si la fuente principal de un juego no
+# respondió en este tiempo (segundos), se lanza en paralelo el respaldo de
+# data.ny.gov y gana el primer resultado completo. None = solo se usa el
+# respaldo cuando la principal falla (comportamiento anterior).
+HEDGE_LATENCIA_SEGUNDOS = 4
+# Si gana el respaldo, se espera todavía este tiempo (segundos) a la fuente
+# principal, que trae más datos (ej. el Double Play de Powerball).
+HEDGE_GRACIA_SEGUNDOS = 1
+
+# Sincronización incremental con data.ny.gov: además del último sorteo, se
+# traen todos los posteriores al más reciente del histórico (tapa los huecos
+# que deja una corrida perdida). También con `--sincronizar`.
+SINCRONIZAR_SOCRATA = False
+# Filas por página en las consultas paginadas a data.ny.gov ($limit)
+SOCRATA_TAM_PAGINA = 1000
+# Fechas por consulta `draw_date in (...)` al rellenar huecos (huecos.py)
+SOCRATA_FECHAS_POR_CONSULTA = 100
+
+# Modo demonio (demonio.py): espera a la hora de cada sorteo y sondea hasta
+# guardar el resultado. El primer sondeo sale DEMONIO_RETRASO_PRIMER_SONDEO
+# segundos después del sorteo; los siguientes se espacian multiplicando el
+# intervalo por DEMONIO_FACTOR_INTERVALO hasta DEMONIO_INTERVALO_MAXIMO. Si
+# pasadas DEMONIO_ABANDONO_HORAS el sorteo sigue sin aparecer, se pasa al
+# siguiente (el hueco queda para huecos.py).
+DEMONIO_RETRASO_PRIMER_SONDEO = 180
+DEMONIO_INTERVALO_INICIAL = 60
+DEMONIO_FACTOR_INTERVALO = 1.5
+DEMONIO_INTERVALO_MAXIMO = 1800
+DEMONIO_ABANDONO_HORAS = 36
+
+# Estadísticas (estadisticas.py): sorteos de la ventana de números
+# "calientes"/"fríos"
+ESTADISTICAS_VENTANA = 20
+
+# Verificador de boletos (verificador.py): boletos por bloque (cada bloque
+# se compara contra todos los sorteos a la vez) y aciertos mínimos
+# (blancas + rojas + especial) para listar una coincidencia
+VERIFICADOR_BLOQUE = 1024
+VERIFICADOR_MINIMO_ACIERTOS = 3
+
+# Simulador Monte Carlo (simulador.py): boletos generados por bloque
+# vectorizado y por tarea del pool de procesos (cada tarea tiene su propio
+# flujo aleatorio, así el resultado no depende de la cantidad de procesos)
+SIMULADOR_BLOQUE = 1_000_000
+SIMULADOR_BOLETOS_POR_TAREA = 20_000_000
+
+# API HTTP de solo lectura (api_resultados.py): sirve el combinado, los
+# resultados y el histórico de cada juego desde memoria. Los archivos se
+# revisan (stat) cada API_INTERVALO_REFRESCO segundos y se recargan si el
+# scraper los reescribió. Las respuestas se guardan ya serializadas (y
+# comprimidas si pasan de API_GZIP_MINIMO bytes) con su ETag.
+API_HOST = '127.0.0.1'
+API_PUERTO = 8080
+API_INTERVALO_REFRESCO = 2
+API_POR_PAGINA = 50
+API_POR_PAGINA_MAXIMA = 500
+API_MAX_AGE_SEGUNDOS = 30
+API_CACHE_MAX_RESPUESTAS = 1024
+API_GZIP_MINIMO = 1024
+API_TIMEOUT_INACTIVIDAD = 30
+
 # Archivo combinado con el último resultado de todos los juegos
 COMBINED_FILE = 'resultados_todos.json'
+# Reescribirlo a medida que termina cada juego (para lectores que quieren los
+# primeros resultados cuanto antes). También con `--combinado-incremental`.
+COMBINADO_INCREMENTAL = False
 
 # Juegos a extraer.
 # 'dias_sorteo': 0=Lunes, 1=Martes, ... 6=Domingo
+# 'hora_sorteo': hora del sorteo (HH:MM, hora del Este), la usa demonio.py
+# 'max_blancos' / 'max_rojos' / 'max_especial': número más alto de cada bola
+#                (matriz actual del juego; los usan los análisis)
 # 'socrata_url': API de datos abiertos del estado de NY (data.ny.gov),
 #                se usa como fuente de respaldo cuando el sitio oficial falla.
 GAMES = {
@@ -27,6 +155,9 @@ GAMES = {
         'results_file': 'resultados_actuales.json',
         'historic_file': 'historico_resultados.json',
         'dias_sorteo': [0, 2, 5],           # Lunes, Miércoles, Sábado
+        'hora_sorteo': '22:59',
+        'max_blancos': 69,
+        'max_especial': 26,
         'bola_especial': 'powerball',
         'multiplicador': 'powerplay',
         'clases_bola_especial': ['powerball'],
@@ -40,6 +171,9 @@ GAMES = {
         'results_file': 'resultados_megamillions.json',
         'historic_file': 'historico_megamillions.json',
         'dias_sorteo': [1, 4],              # Martes, Viernes
+        'hora_sorteo': '23:00',
+        'max_blancos': 70,
+        'max_especial': 24,
         'bola_especial': 'megaball',
         'multiplicador': 'megaplier',
         'socrata_formato': {'bolas': 5, 'campo_especial': 'mega_ball', 'campo_multiplicador': 'multiplier'},
@@ -53,6 +187,9 @@ GAMES = {
         'results_file': 'resultados_lottoamerica.json',
         'historic_file': 'historico_lottoamerica.json',
         'dias_sorteo': [0, 2, 5],           # Lunes, Miércoles, Sábado
+        'hora_sorteo': '23:00',
+        'max_blancos': 52,
+        'max_especial': 10,
         'bola_especial': 'star_ball',
         'multiplicador': 'all_star_bonus',
         'clases_bola_especial': ['star', 'bonus'],
@@ -63,6 +200,9 @@ GAMES = {
         'results_file': 'resultados_2by2.json',
         'historic_file': 'historico_2by2.json',
         'dias_sorteo': [0, 1, 2, 3, 4, 5, 6],  # Diario
+        'hora_sorteo': '23:00',
+        'max_blancos': 26,
+        'max_rojos': 26,
         # Formato distinto: 2 bolas rojas + 2 blancas, sin bola especial
         'num_blancos': 2,
         'num_rojas': 2,
@@ -76,6 +216,9 @@ GAMES = {
         'results_file': 'resultados_cash4life.json',
         'historic_file': 'historico_cash4life.json',
         'dias_sorteo': [0, 1, 2, 3, 4, 5, 6],  # Diario
+        'hora_sorteo': '21:00',
+        'max_blancos': 60,
+        'max_especial': 4,
         'bola_especial': 'cash_ball',
         'multiplicador': None,
         'premio_descripcion': '$1,000 al día de por vida',
@@ -83,6 +226,70 @@ GAMES = {
     },
 }
 
+# Tablas de premios (premios.py), reglas vigentes de cada juego.
+# 'niveles': (aciertos blancas, aciertos bola especial) -> premio en dólares;
+#            en 2by2 la clave es (blancas, rojas). Un texto es un premio no
+#            fijo (pozo o renta vitalicia) y no se multiplica.
+# 'con_multiplicador': premios que con el multiplicador pagan un monto fijo
+#            en lugar de multiplicarse.
+# 'multiplicador_incluido': fecha desde la que el multiplicador del sorteo
+#            se aplica siempre (antes, y en los juegos sin esta clave, solo a
+#            boletos que lo compraron). Los sorteos anteriores a un cambio de
+#            reglas se evalúan igual con los montos vigentes.
+# 'multiplicador_por_dia': {día de la semana: factor} fijo por día.
+# 'multiplicadores': {factor: casos} del multiplicador incluido, para simular
+#            sorteos (probabilidad = casos / total).
+# 'doble_jugada': niveles de la Double Play (sin multiplicador).
+# 'precio': precio del boleto en dólares (sin multiplicador ni Double Play).
+PREMIOS = {
+    'powerball': {
+        'precio': 2,
+        'niveles': {
+            (5, 1): 'Jackpot', (5, 0): 1_000_000, (4, 1): 50_000, (4, 0): 100,
+            (3, 1): 100, (3, 0): 7, (2, 1): 7, (1, 1): 4, (0, 1): 4,
+        },
+        'con_multiplicador': {(5, 0): 2_000_000},
+        'doble_jugada': {
+            (5, 1): 10_000_000, (5, 0): 500_000, (4, 1): 50_000, (4, 0): 500,
+            (3, 1): 500, (3, 0): 20, (2, 1): 20, (1, 1): 10, (0, 1): 7,
+        },
+    },
+    'megamillions': {
+        'precio': 5,
+        'niveles': {
+            (5, 1): 'Jackpot', (5, 0): 1_000_000, (4, 1): 10_000, (4, 0): 500,
+            (3, 1): 200, (3, 0): 10, (2, 1): 10, (1, 1): 7, (0, 1): 5,
+        },
+        # Desde el 8/4/2025 el multiplicador viene en el boleto de $5; antes
+        # el Megaplier era opcional (y los montos eran otros)
+        'multiplicador_incluido': '2025-04-08',
+        'multiplicadores': {2: 15, 3: 10, 4: 4, 5: 2, 10: 1},
+    },
+    'lottoamerica': {
+        'precio': 1,
+        'niveles': {
+            (5, 1): 'Jackpot', (5, 0): 20_000, (4, 1): 1_000, (4, 0): 100,
+            (3, 1): 20, (3, 0): 5, (2, 1): 5, (1, 1): 2, (0, 1): 2,
+        },
+    },
+    '2by2': {
+        'precio': 1,
+        # 1 de 4 paga un boleto gratis (su precio, $1)
+        'niveles': {
+            (2, 2): 22_000, (2, 1): 100, (1, 2): 100,
+            (2, 0): 3, (1, 1): 3, (0, 2): 3, (1, 0): 1, (0, 1): 1,
+        },
+        'multiplicador_por_dia': {1: 2},    # Los martes se duplican
+    },
+    'cash4life': {
+        'precio': 2,
+        'niveles': {
+            (5, 1): '$1,000 al día de por vida', (5, 0): '$1,000 a la semana de por vida',
+            (4, 1): 2_500, (4, 0): 500, (3, 1): 100, (3, 0): 25, (2, 1): 10, (2, 0): 4, (1, 1): 2,
+        },
+    },
+}
+
 # --- Compatibilidad con la versión anterior (solo Powerball) ---
 POWERBALL_URL = GAMES['powerball']['url']
 RESULTS_FILE = GAMES['powerball']['results_file']
@@ -0,0 +1,91 @@
+"""Consultas rápidas al histórico de un juego por números, bola especial y fechas.
+
+Usa el índice invertido del histórico (ver historico_store.py): cada consulta
+es una búsqueda en el índice (tipo de bola, número) sin leer todas las
+entradas, y se mantiene al día solo porque save_results agrega cada sorteo
+al mismo almacén.
+
+Uso:
+    python consultar.py megamillions --numeros 7 23 --limite 1   # ¿cuándo salieron juntos por última vez?
+    python consultar.py powerball --especial 5 --desde 2026-01-01
+    python consultar.py powerball --numeros 11 33 --doble          # en la Double Play
+    python consultar.py 2by2 --rojos 1 26
+    python consultar.py cash4life --frecuencias
+"""
+
+import argparse
+import time
+
+from config import GAMES
+import historico_store
+
+
+def criterios(args):
+    """{tipo de bola: números} para HistoricoStore.buscar."""
+    prefijo = 'doble_' if args.doble else ''
+    numeros = {}
+    if args.numeros:
+        numeros[prefijo + 'blancos'] = args.numeros
+    if args.rojos:
+        numeros['rojos'] = args.rojos
+    if args.especial is not None:
+        numeros[prefijo + 'especial'] = [args.especial]
+    return numeros
+
+
+def formatear(sorteo, cfg, doble=False):
+    """Una línea por sorteo: fecha, blancas, rojas y bola especial."""
+    if doble:
+        dp = sorteo.get('doble_jugada') or {}
+        return f"{sorteo['fecha']}  {' '.join(f'{n:2d}' for n in dp.get('blancos', []))} + {dp.get('powerball')}  (Double Play)"
+    linea = f"{sorteo['fecha']}  {' '.join(f'{n:2d}' for n in sorteo['blancos'])}"
+    if sorteo.get('rojos'):
+        linea += f"  | rojas {' '.join(f'{n:2d}' for n in sorteo['rojos'])}"
+    if cfg.get('bola_especial'):
+        linea += f" + {sorteo.get(cfg['bola_especial'])}"
+    if cfg.get('multiplicador') and sorteo.get(cfg['multiplicador']):
+        linea += f"  (x{sorteo[cfg['multiplicador']]})"
+    return linea
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Consulta el histórico de un juego por números y fechas')
+    parser.add_argument('juego', choices=list(GAMES))
+    parser.add_argument('--numeros', '-n', type=int, nargs='+', help='bolas blancas que salieron juntas')
+    parser.add_argument('--rojos', type=int, nargs='+', help='bolas rojas (2by2)')
+    parser.add_argument('--especial', '-e', type=int, help='bola especial (powerball, megaball, star ball, cash ball)')
+    parser.add_argument('--doble', action='store_true', help='buscar en los números de la Double Play (Powerball)')
+    parser.add_argument('--desde', help='desde esta fecha (YYYY-MM-DD)')
+    parser.add_argument('--hasta', help='hasta esta fecha (YYYY-MM-DD)')
+    parser.add_argument('--limite', type=int, default=20, help='sorteos a mostrar, los más recientes (por defecto 20)')
+    parser.add_argument('--frecuencias', action='store_true', help='veces que salió cada número en el rango')
+    args = parser.parse_args(argv)
+
+    cfg = GAMES[args.juego]
+    store = historico_store.obtener_store(cfg['historic_file'])
+    try:
+        if args.frecuencias:
+            prefijo = 'doble_' if args.doble else ''
+            tipos = [prefijo + 'blancos'] + (['rojos'] if cfg.get('num_rojas') else [])
+            if cfg.get('bola_especial'):
+                tipos.append(prefijo + 'especial')
+            inicio = time.perf_counter()
+            frecuencias = {t: store.frecuencias(t, args.desde, args.hasta) for t in tipos}
+            duracion = time.perf_counter() - inicio
+            for t, veces in frecuencias.items():
+                orden = sorted(veces.items(), key=lambda nv: (-nv[1], nv[0]))
+                print(f"[{t}] " + ', '.join(f"{n}({v})" for n, v in orden))
+        else:
+            inicio = time.perf_counter()
+            fechas = store.buscar(criterios(args), args.desde, args.hasta, args.limite)
+            duracion = time.perf_counter() - inicio
+            for entrada in store.entradas_de(fechas):
+                print(formatear(entrada['sorteo'], cfg, args.doble))
+            print(f"\n{len(fechas)} sorteo(s)" + (f" (límite {args.limite})" if len(fechas) == args.limite else ''))
+        print(f"Consulta: {duracion * 1000:.2f} ms")
+    finally:
+        historico_store.cerrar_stores()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""Modo demonio: publica cada resultado lo antes posible después del sorteo.
+
+El cron corre una vez al día, así que los resultados aparecen horas después
+del sorteo. Este proceso queda corriendo: con `dias_sorteo` y `hora_sorteo`
+de cada juego calcula el próximo sorteo que falta en el histórico, duerme
+hasta esa hora y luego sondea con intervalos cortos al principio (los sitios
+publican a los pocos minutos) que se van espaciando. En cuanto save_results
+guarda la fecha esperada, ese juego deja de sondear hasta su próximo sorteo.
+
+Los scrapers, las sesiones HTTP (keep-alive) y los históricos indexados se
+crean una sola vez y se reutilizan en todos los sondeos.
+
+Uso:
+    python demonio.py                   # todos los juegos
+    python demonio.py powerball 2by2
+"""
+
+import argparse
+import heapq
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from config import (
+    CACHE_HTTP_ACTIVO,
+    DEMONIO_ABANDONO_HORAS,
+    DEMONIO_FACTOR_INTERVALO,
+    DEMONIO_INTERVALO_INICIAL,
+    DEMONIO_INTERVALO_MAXIMO,
+    DEMONIO_RETRASO_PRIMER_SONDEO,
+    GAMES,
+    MAX_WORKERS,
+    MEMO_PARSEO_ACTIVO,
+)
+from lottery_scraper import TZ_ET, Combinado, ahora_et, crear_scraper
+import cache_http
+import historico_store
+import memo_parseo
+import reintentos
+import sesiones_http
+
+# Tope de cada espera: así un cambio de hora del sistema o una suspensión no
+# deja al demonio dormido de más
+ESPERA_MAXIMA = 300
+
+
+def momento_sorteo(scraper, fecha_iso):
+    """Fecha y hora (del Este) del sorteo del día `fecha_iso`."""
+    hora, minuto = map(int, scraper.cfg.get('hora_sorteo', '23:00').split(':'))
+    fecha = datetime.strptime(fecha_iso, '%Y-%m-%d').replace(hour=hora, minute=minuto)
+    return fecha.replace(tzinfo=TZ_ET) if TZ_ET else fecha
+
+
+def ultimo_sorteo_realizado(scraper, ahora):
+    """Fecha (YYYY-MM-DD) del último sorteo cuya hora ya pasó."""
+    for i in range(8):
+        fecha = (ahora - timedelta(days=i)).strftime('%Y-%m-%d')
+        if (ahora - timedelta(days=i)).weekday() in scraper.cfg['dias_sorteo'] \
+                and momento_sorteo(scraper, fecha) <= ahora:
+            return fecha
+    return None
+
+
+def sorteo_pendiente(scraper, ahora=None):
+    """Fecha del sorteo a esperar: el último ya realizado si todavía no está
+    en el histórico (y no es demasiado viejo), si no el próximo."""
+    ahora = ahora or ahora_et()
+    fecha = ultimo_sorteo_realizado(scraper, ahora)
+    limite = ahora - timedelta(hours=DEMONIO_ABANDONO_HORAS)
+    if fecha and (scraper.historico.contiene(fecha) or momento_sorteo(scraper, fecha) < limite):
+        fecha = scraper.calcular_proximo_sorteo(fecha)
+    return fecha or scraper.calcular_proximo_sorteo(ahora.strftime('%Y-%m-%d'))
+
+
+def intervalo_sondeo(sondeos):
+    """Segundos hasta el próximo sondeo después de `sondeos` sondeos sin resultado."""
+    return min(DEMONIO_INTERVALO_MAXIMO, DEMONIO_INTERVALO_INICIAL * DEMONIO_FACTOR_INTERVALO ** (sondeos - 1))
+
+
+class Demonio:
+    def __init__(self, games=GAMES, max_workers=MAX_WORKERS):
+        self.games = games
+        self.scrapers = {k: crear_scraper(k, cfg) for k, cfg in games.items()}
+        self.max_workers = max_workers
+        self.agenda = []          # heap de (momento epoch, game_key)
+        self.objetivos = {}       # game_key -> {'fecha', 'sondeos'}
+        self.combinado = Combinado(GAMES)
+        self._detener = threading.Event()
+
+    def programar(self, game_key, ahora=None):
+        """Agenda el primer sondeo del próximo sorteo pendiente del juego."""
+        scraper = self.scrapers[game_key]
+        fecha = sorteo_pendiente(scraper, ahora)
+        momento = momento_sorteo(scraper, fecha).timestamp() + DEMONIO_RETRASO_PRIMER_SONDEO
+        momento = max(momento, (ahora or ahora_et()).timestamp())
+        self.objetivos[game_key] = {'fecha': fecha, 'sondeos': 0}
+        heapq.heappush(self.agenda, (momento, game_key))
+        logging.info(f"[{scraper.nombre}] Esperando el sorteo {fecha}; primer sondeo "
+                     f"{datetime.fromtimestamp(momento, TZ_ET).strftime('%Y-%m-%d %H:%M:%S')}")
+
+    def sondear(self, game_key):
+        """Un sondeo (un solo intento) del juego; devuelve True si guardó el sorteo esperado.
+
+        Lo guardado también pasa al archivo combinado (que se mantiene en memoria)."""
+        scraper = self.scrapers[game_key]
+        objetivo = self.objetivos[game_key]
+        objetivo['sondeos'] += 1
+        results = scraper.scrape_with_retry(reintentos.PoliticaReintentos(max_intentos=1))
+        if not results.get('_success'):
+            return False
+        fecha = results['sorteo']['fecha']
+        if fecha < objetivo['fecha']:
+            logging.info(f"[{scraper.nombre}] Todavía publicado el sorteo {fecha} "
+                         f"(sondeo {objetivo['sondeos']})")
+            return False
+        if not scraper.save_results(results):
+            return False
+        scraper.exportar_historico()
+        self.combinado.agregar(game_key, results)
+        return True
+
+    def reprogramar(self, game_key, guardado, ahora=None):
+        scraper = self.scrapers[game_key]
+        objetivo = self.objetivos[game_key]
+        ahora = ahora or ahora_et()
+        vencido = ahora - momento_sorteo(scraper, objetivo['fecha']) > timedelta(hours=DEMONIO_ABANDONO_HORAS)
+        if guardado or vencido:
+            if vencido and not guardado:
+                logging.warning(f"[{scraper.nombre}] Sorteo {objetivo['fecha']} sin publicar tras "
+                                f"{objetivo['sondeos']} sondeos; se pasa al siguiente")
+            self.programar(game_key, ahora)
+            return
+        espera = intervalo_sondeo(objetivo['sondeos'])
+        heapq.heappush(self.agenda, (ahora.timestamp() + espera, game_key))
+
+    def paso(self, ejecutor, ahora=None):
+        """Corre los sondeos vencidos (en paralelo) y los reprograma."""
+        ahora_ts = (ahora or ahora_et()).timestamp()
+        vencidos = []
+        while self.agenda and self.agenda[0][0] <= ahora_ts:
+            vencidos.append(heapq.heappop(self.agenda)[1])
+        if not vencidos:
+            return
+        futuros = [ejecutor.submit(self.sondear, game_key) for game_key in vencidos]
+        guardados = []
+        for game_key, futuro in zip(vencidos, futuros):
+            # Un juego que falla no debe sacar a los demás de la agenda
+            try:
+                guardado = futuro.result()
+            except Exception as e:
+                logging.error(f"[{self.scrapers[game_key].nombre}] Sondeo falló: {e}")
+                guardado = False
+            self.reprogramar(game_key, guardado, ahora)
+            guardados.append(guardado)
+        if any(guardados):
+            self.combinado.guardar()
+
+    def correr(self):
+        for game_key in self.games:
+            self.programar(game_key)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ejecutor:
+            while not self._detener.is_set():
+                espera = self.agenda[0][0] - time.time()
+                if espera > 0:
+                    self._detener.wait(min(espera, ESPERA_MAXIMA))
+                    continue
+                try:
+                    self.paso(ejecutor)
+                except Exception as e:
+                    logging.error(f"Error en el ciclo de sondeo: {e}")
+
+    def detener(self, *_):
+        logging.info("Deteniendo el demonio...")
+        self._detener.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sondea cada juego desde la hora de su sorteo')
+    parser.add_argument('juegos', nargs='*', metavar='JUEGO',
+                        help=f"juegos a seguir ({', '.join(GAMES)}; por defecto todos)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f'sondeos simultáneos como máximo (por defecto {MAX_WORKERS})')
+    args = parser.parse_args(argv)
+    desconocidos = [j for j in args.juegos if j not in GAMES]
+    if desconocidos:
+        parser.error(f"juegos desconocidos: {', '.join(desconocidos)}")
+
+    games = {k: GAMES[k] for k in args.juegos} if args.juegos else GAMES
+    demonio = Demonio(games, max_workers=args.workers)
+    signal.signal(signal.SIGTERM, demonio.detener)
+    signal.signal(signal.SIGINT, demonio.detener)
+    try:
+        demonio.correr()
+    finally:
+        sesiones_http.cerrar_sesiones()
+        historico_store.cerrar_stores()
+        if CACHE_HTTP_ACTIVO:
+            cache_http.cache.purgar()
+        if MEMO_PARSEO_ACTIVO:
+            memo_parseo.memo.persistir()
+
+
+if __name__ == '__main__':
+    main()
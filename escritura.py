@@ -0,0 +1,88 @@
+"""Escritura atómica de archivos (y de JSON solo si cambió algo).
+
+Los JSON de resultados se abrían con 'w' y se reescribían en el lugar: un
+corte a mitad de escritura dejaba un archivo truncado. Aquí todo se escribe
+en un temporal del mismo directorio, se hace fsync y se reemplaza el destino
+con os.replace, así quien lee ve el archivo anterior o el nuevo, nunca uno a
+medias.
+
+escribir_json además compara el contenido con lo que ya hay en disco sin
+tener en cuenta las marcas de tiempo (fecha_actualizacion): si el sorteo no
+cambió, el archivo no se toca (menos E/S y menos commits vacíos en el
+workflow, que sube los *.json).
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+CAMPOS_VOLATILES = ('fecha_actualizacion',)
+
+
+def _fsync_directorio(directorio):
+    # Persiste el rename; no todos los sistemas permiten abrir un directorio
+    try:
+        fd = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def abrir_atomico(ruta, encoding='utf-8', newline=None):
+    """Como open(ruta, 'w'), pero el destino solo se reemplaza si el bloque
+    termina sin errores (temporal + fsync + os.replace)."""
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    fd, tmp = tempfile.mkstemp(dir=directorio, prefix=f'.{os.path.basename(ruta)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline=newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crea el archivo con permisos 0600: se conservan los del destino
+        try:
+            os.chmod(tmp, os.stat(ruta).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, ruta)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_directorio(directorio)
+
+
+def escribir_atomico(ruta, texto, encoding='utf-8'):
+    with abrir_atomico(ruta, encoding) as f:
+        f.write(texto)
+
+
+def sin_campos(datos, campos=CAMPOS_VOLATILES):
+    """Copia de `datos` sin las claves `campos`, en cualquier nivel."""
+    if isinstance(datos, dict):
+        return {k: sin_campos(v, campos) for k, v in datos.items() if k not in campos}
+    if isinstance(datos, list):
+        return [sin_campos(v, campos) for v in datos]
+    return datos
+
+
+def escribir_json(ruta, datos, ignorar=CAMPOS_VOLATILES):
+    """Escribe `datos` (indent=2) de forma atómica, salvo que el archivo ya
+    tenga lo mismo sin contar los campos `ignorar`. Devuelve True si escribió."""
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            actual = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        actual = None
+    if actual is not None and sin_campos(actual, ignorar) == sin_campos(datos, ignorar):
+        return False
+    escribir_atomico(ruta, json.dumps(datos, indent=2, ensure_ascii=False))
+    return True
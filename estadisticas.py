@@ -0,0 +1,277 @@
+"""Estadísticas de números por juego, calculadas con operaciones vectorizadas.
+
+A partir de una TablaSorteos (ver tabla_sorteos.py) se calcula, para cada
+grupo de bolas del juego (blancas, rojas de 2by2 y bola especial):
+
+- frecuencia: veces que salió cada número
+- ventana: veces que salió en los últimos ESTADISTICAS_VENTANA sorteos
+  (calientes / fríos)
+- ausencia: sorteos transcurridos desde la última vez que salió
+- pares y tríos: matrices de coocurrencia (cuántas veces salieron juntos)
+
+Todo se calcula de una vez sobre las matrices de bolas (bincount, matriz de
+presencia, producto matricial) y después se actualiza de a un sorteo. Las
+estadísticas se calculan a pedido: de_juego las guarda en el proceso y en
+cada llamada solo suma los sorteos que el histórico indexado tenga después
+del último contado (los guardados desde la llamada anterior), sin
+recalcular todo.
+
+Uso:
+    python estadisticas.py powerball
+    python estadisticas.py 2by2 --top 5 --ventana 30
+"""
+
+import argparse
+import threading
+from collections import deque
+from itertools import combinations
+
+import numpy as np
+
+from config import ESTADISTICAS_VENTANA, GAMES
+import historico_store
+from tabla_sorteos import SIN_DATO, TablaSorteos
+
+
+class GrupoBolas:
+    """Contadores de un grupo de bolas (ej. las 5 blancas o la bola especial).
+
+    Los arreglos se indexan por número de bola (el índice 0 no se usa)."""
+
+    def __init__(self, nombre, maximo, por_sorteo, ventana=ESTADISTICAS_VENTANA):
+        self.nombre = nombre
+        self.maximo = maximo
+        self.por_sorteo = por_sorteo
+        self.n = 0
+        self.frecuencia = np.zeros(maximo + 1, dtype=np.int64)
+        self.ultimo = np.full(maximo + 1, -1, dtype=np.int64)   # fila del último sorteo en que salió
+        self.pares = np.zeros((maximo + 1,) * 2, dtype=np.int32) if por_sorteo >= 2 else None
+        self.trios = np.zeros((maximo + 1,) * 3, dtype=np.int32) if por_sorteo >= 3 else None
+        self.recientes = deque(maxlen=ventana)
+        self.en_ventana = np.zeros(maximo + 1, dtype=np.int64)
+        self._combos_trios = np.array(list(combinations(range(por_sorteo), 3)), dtype=np.intp).T
+
+    def cargar(self, matriz):
+        """Calcula todo desde una matriz (sorteos × bolas), de más antiguo a más reciente."""
+        n, m = len(matriz), self.maximo + 1
+        matriz = np.sort(matriz.astype(np.intp), axis=1)
+        self.n = n
+        if n == 0:
+            # Juego sin sorteos (base nueva, rango vacío): contadores en cero
+            self.frecuencia = np.zeros(m, dtype=np.int64)
+            self.ultimo = np.full(m, -1, dtype=np.int64)
+            if self.pares is not None:
+                self.pares = np.zeros((m,) * 2, dtype=np.int32)
+            if self.trios is not None:
+                self.trios = np.zeros((m,) * 3, dtype=np.int32)
+            self.recientes.clear()
+            self.en_ventana = np.zeros(m, dtype=np.int64)
+            return
+        self.frecuencia = np.bincount(matriz.ravel(), minlength=m)
+        self.frecuencia[SIN_DATO] = 0
+
+        presencia = np.zeros((n, m), dtype=bool)
+        presencia[np.arange(n)[:, None], matriz] = True
+        presencia[:, SIN_DATO] = False
+        vistos = presencia.any(axis=0)
+        self.ultimo = np.where(vistos, n - 1 - presencia[::-1].argmax(axis=0), -1)
+
+        if self.pares is not None:
+            p = presencia.astype(np.int32)
+            self.pares = p.T @ p
+            np.fill_diagonal(self.pares, 0)
+        if self.trios is not None:
+            self.trios = np.zeros((m,) * 3, dtype=np.int32)
+            for a, b, c in self._combos_trios.T:
+                np.add.at(self.trios, (matriz[:, a], matriz[:, b], matriz[:, c]), 1)
+            self.trios[SIN_DATO] = self.trios[:, SIN_DATO] = self.trios[:, :, SIN_DATO] = 0
+
+        self.recientes.clear()
+        self.recientes.extend(fila[fila != SIN_DATO] for fila in matriz[-self.recientes.maxlen:])
+        self.en_ventana = np.bincount(np.concatenate([*self.recientes, np.zeros(0, np.intp)]), minlength=m)
+
+    def agregar(self, bolas):
+        """Suma un sorteo (el más reciente) a los contadores."""
+        bolas = np.sort(np.asarray(bolas, dtype=np.intp))
+        validas = bolas[bolas != SIN_DATO]
+        fila, self.n = self.n, self.n + 1
+        self.frecuencia[validas] += 1
+        self.ultimo[validas] = fila
+        if self.pares is not None:
+            self.pares[np.ix_(validas, validas)] += 1
+            self.pares[validas, validas] -= 1
+        if self.trios is not None and len(validas) == self.por_sorteo:
+            self.trios[tuple(validas[self._combos_trios])] += 1
+
+        if len(self.recientes) == self.recientes.maxlen:
+            self.en_ventana[self.recientes[0]] -= 1
+        self.recientes.append(validas)
+        self.en_ventana[validas] += 1
+
+    def ausencia(self):
+        """Sorteos transcurridos desde la última vez que salió cada número
+        (los que nunca salieron cuentan todos los sorteos)."""
+        return np.where(self.ultimo >= 0, self.n - 1 - self.ultimo, self.n)
+
+    def mas(self, valores, k, mayores=True):
+        """Los k números (sin el 0) con valores más altos (o más bajos)."""
+        numeros = np.arange(1, self.maximo + 1)
+        orden = np.argsort(-valores[1:] if mayores else valores[1:], kind='stable')[:k]
+        return [(int(numeros[i]), int(valores[1:][i])) for i in orden]
+
+    def pares_mas_frecuentes(self, k):
+        if self.pares is None:
+            return []
+        superior = np.triu(self.pares, 1)
+        planos = np.argsort(-superior, axis=None, kind='stable')[:k]
+        return [((int(a), int(b)), int(superior[a, b]))
+                for a, b in zip(*np.unravel_index(planos, superior.shape)) if superior[a, b]]
+
+    def trios_mas_frecuentes(self, k):
+        if self.trios is None:
+            return []
+        planos = np.argsort(-self.trios, axis=None, kind='stable')[:k]
+        return [((int(a), int(b), int(c)), int(self.trios[a, b, c]))
+                for a, b, c in zip(*np.unravel_index(planos, self.trios.shape)) if self.trios[a, b, c]]
+
+
+class EstadisticasJuego:
+    def __init__(self, game_key, cfg=None, ventana=ESTADISTICAS_VENTANA, maximos=None):
+        self.game_key = game_key
+        self.cfg = cfg or GAMES[game_key]
+        self.ventana = ventana
+        self.ultima_fecha = None
+        self.desactualizado = False
+        self.store = None
+        self.importaciones = 0
+        maximos = maximos or {}
+        cfg = self.cfg
+        self.grupos = {'blancos': GrupoBolas('blancos', maximos.get('blancos', cfg['max_blancos']),
+                                             cfg.get('num_blancos', 5), ventana)}
+        if cfg.get('num_rojas'):
+            self.grupos['rojos'] = GrupoBolas('rojos', maximos.get('rojos', cfg['max_rojos']),
+                                              cfg['num_rojas'], ventana)
+        if cfg.get('bola_especial'):
+            self.grupos['especial'] = GrupoBolas(cfg['bola_especial'],
+                                                 maximos.get('especial', cfg['max_especial']), 1, ventana)
+
+    @classmethod
+    def desde_tabla(cls, tabla, ventana=ESTADISTICAS_VENTANA):
+        matrices = {'blancos': tabla.blancos, 'rojos': tabla.rojos, 'especial': tabla.especial[:, None]}
+        # Sorteos viejos pueden tener números fuera de la matriz actual
+        maximos = {g: int(m.max()) for g, m in matrices.items() if m.size}
+        cfg = tabla.cfg
+        maximos = {
+            'blancos': max(cfg['max_blancos'], maximos.get('blancos', 0)),
+            'rojos': max(cfg.get('max_rojos', 0), maximos.get('rojos', 0)),
+            'especial': max(cfg.get('max_especial', 0), maximos.get('especial', 0)),
+        }
+        estadisticas = cls(tabla.game_key, cfg, ventana, maximos)
+        for nombre, grupo in estadisticas.grupos.items():
+            grupo.cargar(matrices[nombre])
+        if len(tabla):
+            estadisticas.ultima_fecha = str(tabla.fechas[-1])
+        return estadisticas
+
+    @property
+    def n_sorteos(self):
+        return self.grupos['blancos'].n
+
+    def agregar(self, sorteo):
+        """Suma un sorteo ('sorteo' de una entrada). Si es anterior al último
+        contado, o trae un número fuera de rango, queda para recalcular."""
+        fecha = sorteo['fecha']
+        bolas = {'blancos': sorteo['blancos'], 'rojos': sorteo.get('rojos', []),
+                 'especial': [sorteo.get(self.cfg.get('bola_especial')) or SIN_DATO]}
+        fuera_de_rango = any(max(bolas[g], default=0) > grupo.maximo for g, grupo in self.grupos.items())
+        if (self.ultima_fecha and fecha <= self.ultima_fecha) or fuera_de_rango:
+            self.desactualizado = True
+            return
+        for nombre, grupo in self.grupos.items():
+            grupo.agregar(bolas[nombre])
+        self.ultima_fecha = fecha
+
+    def agregar_entradas(self, entradas):
+        """Suma entradas del histórico, en cualquier orden."""
+        for entrada in sorted(entradas, key=lambda e: e['sorteo']['fecha']):
+            self.agregar(entrada['sorteo'])
+
+    def resumen(self, top=10):
+        """Diccionario con lo principal de cada grupo (para imprimir o servir)."""
+        resumen = {'juego': self.game_key, 'sorteos': self.n_sorteos, 'hasta': self.ultima_fecha,
+                   'ventana': self.ventana, 'grupos': {}}
+        for nombre, grupo in self.grupos.items():
+            resumen['grupos'][grupo.nombre] = {
+                'mas_frecuentes': grupo.mas(grupo.frecuencia, top),
+                'menos_frecuentes': grupo.mas(grupo.frecuencia, top, mayores=False),
+                'calientes': grupo.mas(grupo.en_ventana, top),
+                'frios': grupo.mas(grupo.en_ventana, top, mayores=False),
+                'mas_ausentes': grupo.mas(grupo.ausencia(), top),
+                'pares': grupo.pares_mas_frecuentes(top),
+                'trios': grupo.trios_mas_frecuentes(top),
+            }
+        return resumen
+
+
+_estadisticas = {}
+_lock = threading.Lock()
+
+
+def de_juego(game_key, ventana=ESTADISTICAS_VENTANA):
+    """Estadísticas del histórico indexado del juego, compartidas en el proceso.
+
+    La primera vez se calculan desde el histórico; después se ponen al día
+    con los sorteos posteriores al último contado. Se recalculan si quedaron
+    desactualizadas (sorteo fuera de orden), si el histórico se reemplazó
+    desde el JSON (ver HistoricoStore.sincronizar) o si la cantidad de
+    sorteos no coincide (ej. se agregó uno anterior al último)."""
+    cfg = GAMES[game_key]
+    store = historico_store.obtener_store(cfg['historic_file'])
+    with _lock:
+        store.sincronizar()
+        estadisticas = _estadisticas.get((game_key, ventana))
+        if (estadisticas is not None and estadisticas.store is store
+                and estadisticas.importaciones == store.importaciones and estadisticas.ultima_fecha):
+            nuevas = [e for e in store.entradas(desde=estadisticas.ultima_fecha)
+                      if e['sorteo']['fecha'] > estadisticas.ultima_fecha]
+            estadisticas.agregar_entradas(nuevas)
+        if (estadisticas is None or estadisticas.desactualizado or estadisticas.store is not store
+                or estadisticas.importaciones != store.importaciones
+                or estadisticas.n_sorteos != len(store)):
+            tabla = TablaSorteos.desde_store(game_key, con_actualizacion=False)
+            estadisticas = EstadisticasJuego.desde_tabla(tabla, ventana)
+            estadisticas.store, estadisticas.importaciones = store, store.importaciones
+            _estadisticas[(game_key, ventana)] = estadisticas
+        return estadisticas
+
+
+def imprimir(resumen):
+    print(f"{GAMES[resumen['juego']]['nombre']}: {resumen['sorteos']} sorteos (hasta {resumen['hasta']})")
+    formato = lambda pares: ', '.join(f"{n}({v})" for n, v in pares) or '-'
+    for nombre, grupo in resumen['grupos'].items():
+        print(f"\n  [{nombre}]")
+        print(f"  Más frecuentes   : {formato(grupo['mas_frecuentes'])}")
+        print(f"  Menos frecuentes : {formato(grupo['menos_frecuentes'])}")
+        print(f"  Calientes ({resumen['ventana']:>3})  : {formato(grupo['calientes'])}")
+        print(f"  Fríos ({resumen['ventana']:>3})      : {formato(grupo['frios'])}")
+        print(f"  Más ausentes     : {formato(grupo['mas_ausentes'])}")
+        if grupo['pares']:
+            print(f"  Pares            : {formato(('-'.join(map(str, p)), v) for p, v in grupo['pares'])}")
+        if grupo['trios']:
+            print(f"  Tríos            : {formato(('-'.join(map(str, t)), v) for t, v in grupo['trios'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Estadísticas de números del histórico de un juego')
+    parser.add_argument('juego', choices=list(GAMES))
+    parser.add_argument('--top', type=int, default=10, help='números/pares/tríos a mostrar (por defecto 10)')
+    parser.add_argument('--ventana', type=int, default=ESTADISTICAS_VENTANA,
+                        help=f'sorteos de la ventana calientes/fríos (por defecto {ESTADISTICAS_VENTANA})')
+    args = parser.parse_args(argv)
+
+    imprimir(de_juego(args.juego, args.ventana).resumen(args.top))
+    historico_store.cerrar_stores()
+
+
+if __name__ == '__main__':
+    main()
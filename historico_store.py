@@ -0,0 +1,396 @@
+"""Almacén indexado del histórico de cada juego (SQLite).
+
+Cada `historic_file` (ej. historico_resultados.json) tiene al lado una base
+SQLite con el mismo nombre y extensión .db. La tabla `sorteos` usa la fecha
+como clave primaria, así que detectar duplicados es una búsqueda en el índice
+y agregar un sorteo es un INSERT, sin cargar ni reescribir todo el histórico.
+
+El JSON sigue siendo el formato que leen los consumidores (y el que se sube
+al repositorio): `exportar_json` lo regenera desde la base, del más reciente
+al más antiguo, con el mismo formato de siempre. Si el contenido del JSON no
+es el de la última exportación (ej. llegó por git pull) la base se reemplaza
+con lo que dice el JSON.
+
+La base no se sube al repositorio: el workflow la guarda entre corridas con
+actions/cache. Sin ella (checkout nuevo, caché vencida) la primera corrida
+importa el JSON completo.
+
+Agregar sorteos no toca el JSON: quedan pendientes (marca en `meta`, así
+sobrevive a un corte) y `exportar_pendiente` los pasa al JSON una vez por
+corrida. Si todos son posteriores al último exportado, se escriben al
+principio y el resto del archivo se copia tal cual, sin volver a serializar
+cada entrada; si no (ej. backfill de sorteos viejos), se regenera entero.
+
+La tabla `bolas` es un índice invertido (tipo de bola, número) -> fechas:
+responde "¿cuándo salieron juntos el 7 y el 23?" con búsquedas en el índice
+en lugar de recorrer todas las entradas (ver buscar). Se llena desde las
+entradas guardadas con json_each, en la misma transacción que cada alta.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import escritura
+from config import GAMES
+
+# Tipos de bola del índice invertido y dónde está cada uno en la entrada.
+# La bola especial se indexa como 'especial' con el nombre de cada juego.
+TIPOS_BOLA = (
+    ('blancos', '$.sorteo.blancos'),
+    ('rojos', '$.sorteo.rojos'),
+    *(('especial', f'$.sorteo.{cfg["bola_especial"]}')
+      for cfg in GAMES.values() if cfg.get('bola_especial')),
+    ('doble_blancos', '$.sorteo.doble_jugada.blancos'),
+    ('doble_especial', '$.sorteo.doble_jugada.powerball'),
+)
+# Se sube si cambia lo que se indexa, para reconstruir el índice
+VERSION_INDICE = 1
+
+
+def ruta_db(historic_file):
+    return os.path.splitext(historic_file)[0] + '.db'
+
+
+def _huella(contenido):
+    return hashlib.blake2b(contenido, digest_size=16).hexdigest()
+
+
+def _bloque(entrada):
+    """Una entrada guardada tal como va dentro de la lista del JSON (sin la coma)."""
+    return '\n  ' + json.dumps(json.loads(entrada), indent=2, ensure_ascii=False).replace('\n', '\n  ')
+
+
+def _escritor(f, huella):
+    """write() que además va calculando el hash de lo escrito."""
+    def escribir(texto):
+        f.write(texto)
+        huella.update(texto.encode('utf-8'))
+    return escribir
+
+
+class HistoricoStore:
+    def __init__(self, historic_file, db_file=None):
+        self.historic_file = historic_file
+        self.db_file = db_file or ruta_db(historic_file)
+        self._lock = threading.RLock()
+        # Veces que las filas se reemplazaron desde el JSON (ver sincronizar)
+        self.importaciones = 0
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS sorteos (
+                fecha TEXT PRIMARY KEY,
+                entrada TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (
+                clave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+            CREATE TABLE IF NOT EXISTS bolas (
+                tipo TEXT NOT NULL,
+                numero INTEGER NOT NULL,
+                fecha TEXT NOT NULL,
+                PRIMARY KEY (tipo, numero, fecha)
+            ) WITHOUT ROWID;
+        ''')
+        if self._meta('version_indice') != str(VERSION_INDICE):
+            with self._conn:
+                self._conn.execute('DELETE FROM bolas')
+                self._indexar()
+                self._meta('version_indice', VERSION_INDICE)
+        self.sincronizar()
+
+    # ──────────────────────────────────────────────
+    # Importación / exportación del JSON
+    # ──────────────────────────────────────────────
+    def _meta(self, clave, valor=None):
+        if valor is None:
+            row = self._conn.execute('SELECT valor FROM meta WHERE clave = ?', (clave,)).fetchone()
+            return row[0] if row else None
+        self._conn.execute('INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)', (clave, str(valor)))
+
+    def _mtime_json(self):
+        try:
+            return os.stat(self.historic_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def sincronizar(self):
+        """Importa el JSON si su contenido no es el de la última exportación.
+
+        Si el mtime no cambió basta un stat. Si cambió (git pull, o un
+        checkout nuevo en el workflow, que le pone a todo la hora actual) se
+        compara el hash del contenido: con el mismo contenido solo se anota
+        el mtime nuevo; con otro, las filas se reemplazan por las del JSON,
+        así las correcciones y bajas que llegan por el JSON no se pierden ni
+        vuelven a escribirse en la siguiente exportación."""
+        with self._lock:
+            mtime = self._mtime_json()
+            if mtime is None or str(mtime) == self._meta('json_mtime'):
+                return
+            try:
+                with open(self.historic_file, 'rb') as f:
+                    contenido = f.read()
+                huella = _huella(contenido)
+                historico = None if huella == self._meta('json_hash') else json.loads(contenido)
+            except (FileNotFoundError, ValueError):
+                return
+            with self._conn:
+                if historico is not None:
+                    filas = [(e['sorteo']['fecha'], json.dumps(e, ensure_ascii=False))
+                             for e in historico if e.get('sorteo', {}).get('fecha')]
+                    self._conn.execute('DELETE FROM sorteos')
+                    self._conn.execute('DELETE FROM bolas')
+                    self._conn.executemany('INSERT OR REPLACE INTO sorteos (fecha, entrada) VALUES (?, ?)', filas)
+                    self._indexar()
+                    self.importaciones += 1
+                    self._conn.execute("DELETE FROM meta WHERE clave = 'json_pendiente'")
+                    self._meta('json_filas', len(historico))
+                    self._meta('json_ultima_fecha', max((f for f, _ in filas), default=''))
+                self._meta('json_mtime', mtime)
+                self._meta('json_hash', huella)
+
+    def _indexar(self, fechas=None):
+        """Carga en el índice invertido las bolas de los sorteos guardados
+        (de todos, o solo de `fechas`). Lo ya indexado se ignora."""
+        filtro, params = '', []
+        if fechas is not None:
+            filtro, params = 'AND s.fecha IN (SELECT value FROM json_each(?))', [json.dumps(list(fechas))]
+        for tipo, ruta in TIPOS_BOLA:
+            self._conn.execute(
+                f'''INSERT OR IGNORE INTO bolas (tipo, numero, fecha)
+                    SELECT ?, j.value, s.fecha FROM sorteos s, json_each(s.entrada, ?) j
+                    WHERE j.type = 'integer' {filtro}''',
+                [tipo, ruta, *params],
+            )
+
+    def _anotar_exportacion(self, huella, filas, ultima_fecha):
+        with self._conn:
+            self._conn.execute("DELETE FROM meta WHERE clave = 'json_pendiente'")
+            self._meta('json_mtime', self._mtime_json())
+            self._meta('json_hash', huella.hexdigest())
+            self._meta('json_filas', filas)
+            self._meta('json_ultima_fecha', ultima_fecha or '')
+
+    def exportar_json(self, destino=None):
+        """Escribe el histórico en el formato JSON de siempre (más reciente primero).
+
+        Las entradas se escriben una a una desde el cursor, sin armar la
+        lista completa en memoria, en un temporal que reemplaza al destino
+        solo al terminar (ver escritura.py). El hash se calcula con lo que se
+        va escribiendo, sin volver a leer el archivo."""
+        destino = destino or self.historic_file
+        with self._lock:
+            huella = hashlib.blake2b(digest_size=16)
+            filas, ultima_fecha = 0, None
+            with escritura.abrir_atomico(destino, newline='') as f:
+                escribir = _escritor(f, huella)
+                escribir('[')
+                for fecha, entrada in self._conn.execute('SELECT fecha, entrada FROM sorteos ORDER BY fecha DESC'):
+                    escribir(',' if filas else '')
+                    escribir(_bloque(entrada))
+                    filas += 1
+                    ultima_fecha = ultima_fecha or fecha
+                escribir('\n]' if filas else ']')
+            if destino == self.historic_file:
+                self._anotar_exportacion(huella, filas, ultima_fecha)
+
+    def exportar_pendiente(self):
+        """Pasa al JSON los sorteos agregados desde la última exportación.
+
+        Si todos son posteriores al último sorteo del JSON (y el archivo es
+        el de la última exportación), se escriben delante y el resto se copia
+        sin tocar; si no, se regenera entero. Devuelve True si escribió."""
+        with self._lock:
+            if self._meta('json_pendiente') is None:
+                return False
+            filas_json = self._meta('json_filas')
+            ultima_json = self._meta('json_ultima_fecha')
+            nuevas = self._conn.execute(
+                'SELECT fecha, entrada FROM sorteos WHERE fecha > ? ORDER BY fecha DESC',
+                (ultima_json or '',)).fetchall()
+            try:
+                with open(self.historic_file, 'rb') as f:
+                    anterior = f.read()
+            except FileNotFoundError:
+                anterior = None
+            if (filas_json is None or anterior is None or not nuevas
+                    or len(self) != int(filas_json) + len(nuevas)
+                    or _huella(anterior) != self._meta('json_hash')):
+                self.exportar_json()
+                return True
+
+            huella = hashlib.blake2b(digest_size=16)
+            with escritura.abrir_atomico(self.historic_file, newline='') as f:
+                escribir = _escritor(f, huella)
+                escribir('[')
+                escribir(','.join(_bloque(entrada) for _, entrada in nuevas))
+                escribir(',' + anterior.decode('utf-8')[1:] if int(filas_json) else '\n]')
+            self._anotar_exportacion(huella, int(filas_json) + len(nuevas), nuevas[0][0])
+            return True
+
+    # ──────────────────────────────────────────────
+    # Consultas y altas
+    # ──────────────────────────────────────────────
+    def contiene(self, fecha):
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM sorteos WHERE fecha = ?', (fecha,)).fetchone() is not None
+
+    def ultima_fecha(self):
+        with self._lock:
+            return self._conn.execute('SELECT MAX(fecha) FROM sorteos').fetchone()[0]
+
+    def primera_fecha(self):
+        with self._lock:
+            return self._conn.execute('SELECT MIN(fecha) FROM sorteos').fetchone()[0]
+
+    def fechas(self, desde=None, hasta=None):
+        """Fechas guardadas (ascendentes) en el rango, leídas solo del índice."""
+        sql, params = 'SELECT fecha FROM sorteos WHERE 1 = 1', []
+        if desde:
+            sql += ' AND fecha >= ?'
+            params.append(desde)
+        if hasta:
+            sql += ' AND fecha <= ?'
+            params.append(hasta)
+        with self._lock:
+            return [f for (f,) in self._conn.execute(sql + ' ORDER BY fecha', params)]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM sorteos').fetchone()[0]
+
+    def entradas(self, desde=None, hasta=None):
+        """Entradas del histórico (más reciente primero), opcionalmente por rango de fechas."""
+        sql, params = 'SELECT entrada FROM sorteos WHERE 1 = 1', []
+        if desde:
+            sql += ' AND fecha >= ?'
+            params.append(desde)
+        if hasta:
+            sql += ' AND fecha <= ?'
+            params.append(hasta)
+        with self._lock:
+            rows = self._conn.execute(sql + ' ORDER BY fecha DESC', params).fetchall()
+        return [json.loads(entrada) for (entrada,) in rows]
+
+    def buscar(self, numeros=None, desde=None, hasta=None, limite=None, recientes_primero=True):
+        """Fechas de los sorteos en que salieron todos los números pedidos.
+
+        `numeros` es {tipo: [números]} con los tipos de TIPOS_BOLA, ej.
+        {'blancos': [7, 23], 'especial': [5]}; sin números devuelve todas las
+        fechas del rango. Cada tipo es una búsqueda en el índice (tipo,
+        número) agrupada por fecha, y los tipos se intersectan."""
+        rango, params_rango = '', []
+        if desde:
+            rango += ' AND fecha >= ?'
+            params_rango.append(desde)
+        if hasta:
+            rango += ' AND fecha <= ?'
+            params_rango.append(hasta)
+
+        consultas, params = [], []
+        for tipo, lista in (numeros or {}).items():
+            lista = sorted(set(lista))
+            if not lista:
+                continue
+            consultas.append(
+                f'SELECT fecha FROM bolas WHERE tipo = ? AND numero IN ({", ".join("?" * len(lista))}){rango}'
+                f' GROUP BY fecha HAVING COUNT(*) = ?')
+            params += [tipo, *lista, *params_rango, len(lista)]
+        if not consultas:
+            consultas, params = [f'SELECT fecha FROM sorteos WHERE 1 = 1{rango}'], params_rango
+
+        sql = f'SELECT fecha FROM ({" INTERSECT ".join(consultas)}) ORDER BY fecha {"DESC" if recientes_primero else "ASC"}'
+        if limite:
+            sql += ' LIMIT ?'
+            params.append(limite)
+        with self._lock:
+            return [f for (f,) in self._conn.execute(sql, params)]
+
+    def frecuencias(self, tipo='blancos', desde=None, hasta=None):
+        """{número: veces que salió} de un tipo de bola, desde el índice."""
+        sql, params = 'SELECT numero, COUNT(*) FROM bolas WHERE tipo = ?', [tipo]
+        if desde:
+            sql += ' AND fecha >= ?'
+            params.append(desde)
+        if hasta:
+            sql += ' AND fecha <= ?'
+            params.append(hasta)
+        with self._lock:
+            return dict(self._conn.execute(sql + ' GROUP BY numero ORDER BY numero', params).fetchall())
+
+    def entradas_de(self, fechas):
+        """Entradas de las fechas indicadas, en el mismo orden (las que no están se omiten)."""
+        fechas = list(fechas)
+        with self._lock:
+            rows = dict(self._conn.execute(
+                'SELECT fecha, entrada FROM sorteos WHERE fecha IN (SELECT value FROM json_each(?))',
+                (json.dumps(fechas),)).fetchall())
+        return [json.loads(rows[f]) for f in fechas if f in rows]
+
+    @contextmanager
+    def _transaccion(self):
+        with self._lock, self._conn:
+            yield self._conn
+
+    def agregar(self, entrada):
+        """Agrega un sorteo; devuelve False si la fecha ya estaba en el histórico."""
+        return self.agregar_varios([entrada]) == 1
+
+    def agregar_varios(self, entradas, meta=None):
+        """Agrega varios sorteos en una sola transacción; devuelve cuántos eran nuevos.
+
+        `meta` ({clave: valor}) se guarda en la misma transacción: sirve para
+        checkpoints que deben avanzar solo si las filas quedaron guardadas."""
+        self.sincronizar()
+        with self._transaccion() as conn:
+            antes = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO sorteos (fecha, entrada) VALUES (?, ?)',
+                ((e['sorteo']['fecha'], json.dumps(e, ensure_ascii=False)) for e in entradas),
+            )
+            nuevos = conn.total_changes - antes
+            if nuevos:
+                self._indexar(e['sorteo']['fecha'] for e in entradas)
+                self._meta('json_pendiente', 1)
+            for clave, valor in (meta or {}).items():
+                self._meta(clave, valor)
+            return nuevos
+
+    def leer_meta(self, clave):
+        with self._lock:
+            return self._meta(clave)
+
+    def escribir_meta(self, clave, valor):
+        with self._transaccion():
+            self._meta(clave, valor)
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def obtener_store(historic_file):
+    """Store compartido (uno por archivo de histórico) dentro del proceso."""
+    clave = os.path.abspath(historic_file)
+    with _stores_lock:
+        store = _stores.get(clave)
+        if store is None:
+            store = _stores[clave] = HistoricoStore(historic_file)
+        return store
+
+
+def cerrar_stores():
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.cerrar()
@@ -0,0 +1,107 @@
+"""Detector de huecos en el histórico según el calendario de sorteos.
+
+Con los `dias_sorteo` de cada juego (y calcular_proximo_sorteo) se generan
+las fechas en que debió haber sorteo entre dos fechas, se comparan con las
+guardadas en el histórico y se listan las que faltan. Con --rellenar, los
+faltantes de cada juego se piden a data.ny.gov en una sola consulta
+`$where=draw_date in (...)` (en lotes de SOCRATA_FECHAS_POR_CONSULTA fechas),
+no una petición por fecha. Los juegos sin fuente data.ny.gov (Lotto America,
+2by2) solo se informan.
+
+Uso:
+    python huecos.py                                   # todos, desde el sorteo más antiguo guardado
+    python huecos.py cash4life 2by2 --desde 2026-06-01
+    python huecos.py --desde 2026-01-01 --hasta 2026-06-30 --rellenar
+"""
+
+import argparse
+import logging
+from datetime import datetime
+
+from config import GAMES, SOCRATA_FECHAS_POR_CONSULTA
+from lottery_scraper import crear_scraper
+import historico_store
+import sesiones_http
+
+
+def fechas_esperadas(scraper, desde, hasta):
+    """Fechas de sorteo (YYYY-MM-DD) entre `desde` y `hasta`, inclusive."""
+    fechas = []
+    if datetime.strptime(desde, '%Y-%m-%d').weekday() in scraper.cfg['dias_sorteo']:
+        fecha = desde
+    else:
+        fecha = scraper.calcular_proximo_sorteo(desde)
+    while fecha and fecha <= hasta:
+        fechas.append(fecha)
+        fecha = scraper.calcular_proximo_sorteo(fecha)
+    return fechas
+
+
+def detectar_huecos(scraper, desde=None, hasta=None):
+    """Sorteos esperados que no están en el histórico (ascendentes)."""
+    desde = desde or scraper.historico.primera_fecha()
+    hasta = hasta or scraper.calcular_fecha_ultimo_sorteo()
+    if not desde:
+        return []
+    guardadas = set(scraper.historico.fechas(desde, hasta))
+    return [f for f in fechas_esperadas(scraper, desde, hasta) if f not in guardadas]
+
+
+def rellenar_huecos(scraper, faltantes, lote=SOCRATA_FECHAS_POR_CONSULTA):
+    """Pide a data.ny.gov solo las fechas faltantes y las guarda en una escritura.
+
+    Devuelve cuántos sorteos se agregaron."""
+    entradas = []
+    for i in range(0, len(faltantes), lote):
+        fechas = ', '.join(f"'{f}T00:00:00.000'" for f in faltantes[i:i + lote])
+        for _offset, filas in scraper.iterar_socrata(where=f'draw_date in ({fechas})'):
+            for fila in filas:
+                results = scraper.parse_socrata_row(fila)
+                if results.get('_success'):
+                    entradas.append(scraper.entrada_historico(results))
+
+    nuevos = scraper.historico.agregar_varios(entradas) if entradas else 0
+    scraper.historico.exportar_pendiente()
+    return nuevos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detecta (y rellena) sorteos faltantes en el histórico')
+    parser.add_argument('juegos', nargs='*', metavar='JUEGO',
+                        help=f"juegos a revisar ({', '.join(GAMES)}; por defecto todos)")
+    parser.add_argument('--desde', help='YYYY-MM-DD (por defecto, el sorteo más antiguo guardado)')
+    parser.add_argument('--hasta', help='YYYY-MM-DD (por defecto, el último sorteo según el calendario)')
+    parser.add_argument('--rellenar', action='store_true',
+                        help='traer los faltantes desde data.ny.gov cuando el juego lo permite')
+    args = parser.parse_args(argv)
+    desconocidos = [j for j in args.juegos if j not in GAMES]
+    if desconocidos:
+        parser.error(f"juegos desconocidos: {', '.join(desconocidos)}")
+
+    total = 0
+    for game_key in args.juegos or list(GAMES):
+        scraper = crear_scraper(game_key, GAMES[game_key])
+        faltantes = detectar_huecos(scraper, args.desde, args.hasta)
+        total += len(faltantes)
+        print(f"{scraper.nombre}: {len(faltantes)} sorteos faltantes")
+        for fecha in faltantes:
+            print(f"  {fecha}")
+
+        if args.rellenar and faltantes:
+            if not scraper.cfg.get('socrata_url'):
+                print("  (sin fuente data.ny.gov: no se pueden rellenar)")
+                continue
+            try:
+                nuevos = rellenar_huecos(scraper, faltantes)
+            except Exception as e:
+                logging.error(f"[{scraper.nombre}] No se pudieron rellenar los huecos: {e}")
+                continue
+            print(f"  Rellenados: {nuevos}; siguen faltando: {len(faltantes) - nuevos}")
+
+    sesiones_http.cerrar_sesiones()
+    historico_store.cerrar_stores()
+    return total
+
+
+if __name__ == '__main__':
+    main()
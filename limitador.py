@@ -0,0 +1,88 @@
+"""Limitador de peticiones por host (cubeta de tokens).
+
+Powerball, Lotto America, 2by2 y la página del Double Play van a
+www.powerball.com, y tres juegos comparten data.ny.gov. Con los juegos en
+paralelo (o corridas más frecuentes) eso son ráfagas contra el mismo origen,
+así que toda petición de sesiones_http.py (y del motor asíncrono) pide antes
+un turno a la cubeta de su host: se permiten ráfagas de hasta `rafaga`
+peticiones y, sostenido, `tasa` peticiones por segundo. Los límites se
+configuran en LIMITES_POR_HOST (y LIMITE_POR_DEFECTO para el resto).
+
+Los turnos se reservan en orden de llegada: quien pide cuando la cubeta está
+vacía recibe el tiempo que le toca esperar, y ese tiempo se acumula en las
+estadísticas del host (se registran al final de cada corrida).
+"""
+
+import threading
+import time
+
+from config import LIMITE_POR_DEFECTO, LIMITES_POR_HOST
+
+
+class CubetaTokens:
+    def __init__(self, host, tasa, rafaga, reloj=time.monotonic):
+        self.host = host
+        self.tasa = tasa
+        self.rafaga = rafaga
+        self.reloj = reloj
+        self.tokens = float(rafaga)
+        self.ultimo = reloj()
+        self.estadisticas = {'peticiones': 0, 'esperas': 0, 'segundos_espera': 0.0, 'espera_maxima': 0.0}
+        self._lock = threading.Lock()
+
+    def reservar(self):
+        """Reserva un turno y devuelve cuántos segundos hay que esperar para usarlo."""
+        with self._lock:
+            ahora = self.reloj()
+            self.tokens = min(self.rafaga, self.tokens + (ahora - self.ultimo) * self.tasa)
+            self.ultimo = ahora
+            self.tokens -= 1
+            espera = -self.tokens / self.tasa if self.tokens < 0 else 0.0
+
+            e = self.estadisticas
+            e['peticiones'] += 1
+            if espera:
+                e['esperas'] += 1
+                e['segundos_espera'] += espera
+                e['espera_maxima'] = max(e['espera_maxima'], espera)
+            return espera
+
+    def esperar_turno(self):
+        espera = self.reservar()
+        if espera:
+            time.sleep(espera)
+        return espera
+
+
+_cubetas = {}
+_lock = threading.Lock()
+
+
+def cubeta_de(host):
+    """Cubeta compartida del host, o None si el host no tiene límite."""
+    with _lock:
+        if host not in _cubetas:
+            limite = LIMITES_POR_HOST.get(host, LIMITE_POR_DEFECTO)
+            _cubetas[host] = CubetaTokens(host, limite['tasa'], limite['rafaga']) if limite else None
+        return _cubetas[host]
+
+
+def esperar_turno(host):
+    cubeta = cubeta_de(host)
+    return cubeta.esperar_turno() if cubeta else 0.0
+
+
+def resumen():
+    with _lock:
+        cubetas = [c for c in _cubetas.values() if c]
+    partes = [
+        f"{c.host}: {c.estadisticas['peticiones']} peticiones, {c.estadisticas['esperas']} esperas "
+        f"({c.estadisticas['segundos_espera']:.2f}s, máx {c.estadisticas['espera_maxima']:.2f}s)"
+        for c in cubetas
+    ]
+    return 'Limitador: ' + ('; '.join(partes) if partes else 'sin peticiones')
+
+
+def reiniciar():
+    with _lock:
+        _cubetas.clear()
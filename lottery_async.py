@@ -0,0 +1,398 @@
+"""Motor asíncrono del scraper multi-juego (alternativa a los scrapers bloqueantes).
+
+Replica BaseScraper, MuslSiteScraper, PowerballScraper, MegaMillionsScraper y
+SocrataScraper con las descargas como corrutinas; los parsers (parse_html,
+parse_api, parse_socrata_row, parse_doble_jugada) son los mismos de
+lottery_scraper.py. Todos los juegos, la página del Double Play y los
+respaldos de data.ny.gov corren en un único event loop, sin un hilo por
+petición, así que el scraper puede integrarse en servicios asyncio:
+
+    async with ClienteHTTPAsync() as cliente:
+        resumen = await procesar_juegos_async(GAMES, cliente)
+
+Requiere aiohttp (opcional: `pip install aiohttp`).
+"""
+
+import asyncio
+import json
+import logging
+
+import requests
+
+from config import (
+    CACHE_HTTP_ACTIVO,
+    GAMES,
+    HEDGE_GRACIA_SEGUNDOS,
+    HEDGE_LATENCIA_SEGUNDOS,
+    HTTP_POOL_MAXSIZE,
+    MEMO_PARSEO_ACTIVO,
+    REQUEST_TIMEOUT,
+)
+from lottery_scraper import (
+    MegaMillionsScraper,
+    MuslSiteScraper,
+    PowerballScraper,
+    SocrataScraper,
+    guardar_combinado,
+    imprimir_resumen,
+)
+import cache_http
+import historico_store
+import limitador
+import memo_parseo
+import reintentos
+import sesiones_http
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class RespuestaAsync:
+    """Respuesta ya leída, con la misma interfaz mínima que requests.Response."""
+
+    def __init__(self, status_code, content, headers=None, url=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'HTTP {self.status_code} en {self.url}', response=self)
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ClienteHTTPAsync:
+    """Cliente aiohttp compartido por todos los juegos (pool por host)."""
+
+    def __init__(self, limite_por_host=HTTP_POOL_MAXSIZE, timeout=REQUEST_TIMEOUT):
+        if aiohttp is None:
+            raise RuntimeError('El motor asíncrono requiere aiohttp (pip install aiohttp)')
+        self.limite_por_host = limite_por_host
+        self.timeout = timeout
+        self._sesion = None
+
+    async def __aenter__(self):
+        self._sesion = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=self.limite_por_host),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': sesiones_http.USER_AGENT},
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._sesion.close()
+
+    async def request(self, method, url, **kwargs):
+        # Mismo circuit breaker y limitador por host que el motor bloqueante
+        host = sesiones_http.host_de(url)
+        circuito = reintentos.circuito_de(host)
+        circuito.permitir()
+        try:
+            cubeta = limitador.cubeta_de(host)
+            espera = cubeta.reservar() if cubeta else 0
+            if espera:
+                await asyncio.sleep(espera)
+            async with self._sesion.request(method, url, **kwargs) as r:
+                content = await r.read()
+                respuesta = RespuestaAsync(r.status, content, dict(r.headers), str(r.url))
+        except Exception as e:
+            # Incluye asyncio.TimeoutError del timeout total de aiohttp
+            sesiones_http.registrar_resultado(circuito, error=e)
+            raise
+        except BaseException:
+            # CancelledError: la carrera con cobertura canceló esta fuente
+            circuito.liberar_prueba()
+            raise
+        sesiones_http.registrar_resultado(circuito, respuesta.status_code)
+        return respuesta
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+
+async def carrera_con_cobertura_async(nombre, primaria, respaldo, latencia=HEDGE_LATENCIA_SEGUNDOS,
+                                      gracia=HEDGE_GRACIA_SEGUNDOS):
+    """Versión asíncrona de carrera_con_cobertura: `primaria` y `respaldo` son
+    funciones que devuelven corrutinas. La fuente que pierde se cancela."""
+    tareas = {asyncio.ensure_future(primaria()): 'principal'}
+    respaldo_lanzado = False
+    ultimo, error = None, None
+
+    def lanzar_respaldo():
+        nonlocal respaldo_lanzado
+        respaldo_lanzado = True
+        tarea = asyncio.ensure_future(respaldo())
+        tareas[tarea] = 'respaldo'
+        return tarea
+
+    async def esperar_principal(pendientes, results):
+        hechas, _ = await asyncio.wait(pendientes, timeout=gracia)
+        for tarea in hechas:
+            if not tarea.cancelled() and tarea.exception() is None and tarea.result().get('_success'):
+                logging.info(f"[{nombre}] La fuente {tareas[tarea]} llegó dentro de la gracia; se usa esa")
+                return tarea.result()
+        logging.info(f"[{nombre}] Gana la fuente respaldo; se cancela la otra")
+        return results
+
+    try:
+        pendientes = set(tareas)
+        hechas, _ = await asyncio.wait(pendientes, timeout=latencia)
+        if not hechas:
+            logging.info(f"[{nombre}] Sin respuesta en {latencia}s, se lanza el respaldo en paralelo")
+            pendientes.add(lanzar_respaldo())
+        while pendientes:
+            hechas, pendientes = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+            for tarea in hechas:
+                etiqueta = tareas[tarea]
+                try:
+                    results = tarea.result()
+                except Exception as e:
+                    logging.warning(f"[{nombre}] Fuente {etiqueta} falló ({e})")
+                    error = e
+                else:
+                    if results.get('_success'):
+                        if pendientes and etiqueta == 'respaldo' and gracia:
+                            return await esperar_principal(pendientes, results)
+                        if pendientes:
+                            logging.info(f"[{nombre}] Gana la fuente {etiqueta}; se cancela la otra")
+                        return results
+                    logging.warning(f"[{nombre}] Fuente {etiqueta} devolvió un resultado incompleto")
+                    ultimo = results
+                if not respaldo_lanzado:
+                    pendientes.add(lanzar_respaldo())
+    finally:
+        for tarea in tareas:
+            if not tarea.done():
+                tarea.cancel()
+
+    if ultimo is not None:
+        return ultimo
+    raise error
+
+
+class AsyncScraperMixin:
+    """Versión asíncrona del ciclo de BaseScraper (descarga, respaldo y reintentos)."""
+
+    def __init__(self, game_key, cfg, cliente):
+        super().__init__(game_key, cfg)
+        self.cliente = cliente
+
+    async def http_get_async(self, url, **kwargs):
+        kwargs.setdefault('headers', self.headers)
+        return await self.cliente.get(url, **kwargs)
+
+    async def http_post_async(self, url, **kwargs):
+        kwargs.setdefault('headers', self.headers)
+        return await self.cliente.post(url, **kwargs)
+
+    async def scrape_socrata_async(self):
+        url = self.cfg.get('socrata_url')
+        if not url:
+            raise RuntimeError('Este juego no tiene fuente Socrata configurada')
+
+        logging.info(f"[{self.nombre}] Consultando respaldo data.ny.gov")
+        response = await self.http_get_async(url, params={'$order': 'draw_date DESC', '$limit': 1})
+        response.raise_for_status()
+        rows = response.json()
+        if not rows:
+            raise RuntimeError('data.ny.gov no devolvió filas')
+        return self.parse_socrata_row(rows[0])
+
+    async def scrape_async(self):
+        raise NotImplementedError
+
+    async def scrape_with_retry_async(self, politica=None):
+        politica = politica or reintentos.PoliticaReintentos()
+        results = self.build_error('sin intentos')
+        for attempt in range(1, politica.max_intentos + 1):
+            logging.info(f"[{self.nombre}] Intento {attempt} de {politica.max_intentos}")
+            try:
+                results = await self.scrape_async()
+                clase = 'parseo'
+            except Exception as e:
+                logging.error(f"[{self.nombre}] Scraping falló: {e}")
+                results = self.build_error(e)
+                clase = reintentos.clasificar_error(e)
+            if results.get('_success'):
+                return results
+            espera = politica.espera(attempt, clase)
+            if espera is None:
+                break
+            logging.info(f"[{self.nombre}] Error {clase}; esperando {espera:.1f}s...")
+            await asyncio.sleep(espera)
+        logging.error(f"[{self.nombre}] Todos los intentos fallaron")
+        return results
+
+
+class AsyncMuslSiteScraper(AsyncScraperMixin, MuslSiteScraper):
+    async def scrape_async(self):
+        if not self.cfg.get('socrata_url'):
+            return await self.scrape_sitio_async()
+        return await carrera_con_cobertura_async(self.nombre, self.scrape_sitio_async,
+                                                 self.scrape_socrata_async)
+
+    async def scrape_sitio_async(self):
+        logging.info(f"[{self.nombre}] Iniciando scraping de {self.cfg['url']}")
+        response = await self.http_get_async(self.cfg['url'])
+        response.raise_for_status()
+        # BeautifulSoup bloquea: el parseo corre en un hilo. El memo guarda
+        # el resultado ya completado (ej. con el Double Play de otra página).
+        clave, results = await asyncio.to_thread(self.buscar_en_memo, response.content)
+        if results is None:
+            results = await self.completar_async(await asyncio.to_thread(self.parse_html, response.content))
+            self.guardar_en_memo(clave, results)
+        return results
+
+    async def completar_async(self, results):
+        """Datos que requieren otra descarga después de parsear la página."""
+        return results
+
+
+class AsyncPowerballScraper(AsyncMuslSiteScraper, PowerballScraper):
+    def extra_sorteo(self, pagina, jackpot_ganado, ganador_estado):
+        # La página dedicada del Double Play se descarga de forma asíncrona
+        # en completar_async; aquí solo se busca en la misma página.
+        extra = MuslSiteScraper.extra_sorteo(self, pagina, jackpot_ganado, ganador_estado)
+        extra['doble_jugada'] = self._doble_jugada_de(pagina)
+        return extra
+
+    async def completar_async(self, results):
+        if results.get('_success') and not results['sorteo'].get('doble_jugada'):
+            results['sorteo']['doble_jugada'] = await self._doble_jugada_pagina_dedicada_async()
+        return results
+
+    async def _doble_jugada_pagina_dedicada_async(self, fecha_esperada=None):
+        url = self.cfg.get('double_play_url')
+        if not url:
+            return None
+        for intento in range(2):
+            try:
+                response = await self.http_get_async(url)
+                response.raise_for_status()
+                completo, dp = await asyncio.to_thread(self.parse_doble_jugada, response.content, fecha_esperada)
+                if completo:
+                    return dp
+                logging.warning(f"[{self.nombre}] Double Play incompleto (intento {intento + 1})")
+            except reintentos.CircuitoAbierto as e:
+                logging.warning(f"[{self.nombre}] Double Play no disponible: {e}")
+                break
+            except Exception as e:
+                logging.warning(f"[{self.nombre}] Error Double Play (página dedicada, intento {intento + 1}): {e}")
+        return None
+
+    async def scrape_socrata_async(self):
+        results = await super().scrape_socrata_async()
+        if results.get('_success') and not results['sorteo'].get('doble_jugada'):
+            dp = await self._doble_jugada_pagina_dedicada_async(
+                fecha_esperada=results['sorteo'].get('fecha')
+            )
+            if dp:
+                results['sorteo']['doble_jugada'] = dp
+        return results
+
+
+class AsyncMegaMillionsScraper(AsyncScraperMixin, MegaMillionsScraper):
+    async def scrape_async(self):
+        return await carrera_con_cobertura_async(self.nombre, self.scrape_api_async,
+                                                 self.scrape_socrata_async)
+
+    async def scrape_api_async(self):
+        return self.parse_api(await self._fetch_api_async())
+
+    async def _fetch_api_async(self):
+        url = self.cfg['api_url']
+        logging.info(f"[{self.nombre}] Consultando API {url}")
+        headers = {**self.headers, 'Content-Type': 'application/json'}
+        try:
+            response = await self.http_post_async(url, json={}, headers=headers)
+            response.raise_for_status()
+        except Exception:
+            response = await self.http_get_async(url, headers=headers)
+            response.raise_for_status()
+        return response.json()
+
+
+class AsyncSocrataScraper(AsyncScraperMixin, SocrataScraper):
+    async def scrape_async(self):
+        return await self.scrape_socrata_async()
+
+
+def crear_scraper_async(game_key, cfg, cliente):
+    if game_key == 'powerball':
+        return AsyncPowerballScraper(game_key, cfg, cliente)
+    if game_key == 'megamillions':
+        return AsyncMegaMillionsScraper(game_key, cfg, cliente)
+    if cfg.get('url'):
+        return AsyncMuslSiteScraper(game_key, cfg, cliente)
+    return AsyncSocrataScraper(game_key, cfg, cliente)
+
+
+async def procesar_juego_async(game_key, cfg, cliente, forzar=False):
+    scraper = crear_scraper_async(game_key, cfg, cliente)
+    # SQLite y los archivos JSON bloquean: todo el acceso corre en hilos
+    if not forzar and await asyncio.to_thread(scraper.esta_al_dia):
+        results = await asyncio.to_thread(scraper.resultado_guardado)
+        logging.info(f"[{cfg['nombre']}] Histórico al día ({results['sorteo']['fecha']}): se omite")
+        return results
+    results = await scraper.scrape_with_retry_async()
+    if results.get('_success'):
+        fecha_calculada = scraper.calcular_fecha_ultimo_sorteo()
+        fecha_scrapeada = results['sorteo']['fecha']
+        if fecha_scrapeada < fecha_calculada:
+            logging.warning(
+                f"[{cfg['nombre']}] Posible desfase: scrapeada {fecha_scrapeada} "
+                f"vs esperada {fecha_calculada} (se conserva la scrapeada)"
+            )
+        await asyncio.to_thread(scraper.save_results, results)
+        await asyncio.to_thread(scraper.exportar_historico)
+    return results
+
+
+async def procesar_juegos_async(games, cliente, forzar=False):
+    """Extrae todos los juegos en el mismo event loop; devuelve {game_key: results}."""
+    tareas = [procesar_juego_async(game_key, cfg, cliente, forzar=forzar)
+              for game_key, cfg in games.items()]
+    resultados = await asyncio.gather(*tareas, return_exceptions=True)
+
+    resumen = {}
+    for (game_key, cfg), results in zip(games.items(), resultados):
+        if isinstance(results, BaseException):
+            logging.error(f"[{cfg['nombre']}] Error inesperado: {results}")
+            results = {'juego': game_key, 'nombre': cfg['nombre'], '_success': False, 'error': str(results)}
+        resumen[game_key] = results
+    return resumen
+
+
+async def main_async():
+    logging.info("=" * 60)
+    logging.info("LOTTERY SCRAPER MULTI-JUEGO (ASYNC) - INICIANDO")
+    logging.info("=" * 60)
+
+    try:
+        async with ClienteHTTPAsync() as cliente:
+            resumen = await procesar_juegos_async(GAMES, cliente)
+    finally:
+        historico_store.cerrar_stores()
+        if CACHE_HTTP_ACTIVO:
+            cache_http.cache.purgar()
+        if MEMO_PARSEO_ACTIVO:
+            memo_parseo.memo.persistir()
+    logging.info(limitador.resumen())
+    guardar_combinado(GAMES, resumen)
+    imprimir_resumen(resumen)
+    return resumen
+
+
+if __name__ == '__main__':
+    resumen = asyncio.run(main_async())
+    if not any(r.get('_success') for r in resumen.values()):
+        logging.error("Ningún juego pudo extraerse")
+        raise SystemExit(1)
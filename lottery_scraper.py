@@ -2,7 +2,8 @@
 
 Extrae los resultados de Powerball (incluyendo Double Play), Mega Millions,
 Lotto America y Cash4Life. Cada juego se extrae de forma independiente:
-si uno falla, los demás se guardan igual.
+si uno falla, los demás se guardan igual. Por defecto los juegos se extraen
+en paralelo (ver EJECUCION_CONCURRENTE en config.py).
 
 Fuentes:
   - Powerball / Lotto America: sitio oficial (powerball.com / lottoamerica.com,
@@ -11,14 +12,25 @@ Fuentes:
   - Cash4Life: datos abiertos de data.ny.gov.
 """
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
+from bs4.builder import builder_registry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+import argparse
 import json
+import queue
 import sys
+import threading
 import time
 import logging
 import re
+import cache_http
+import escritura
+import historico_store
+import limitador
+import memo_parseo
+import reintentos
+import sesiones_http
 from config import *
 
 try:
@@ -55,6 +67,137 @@ def ahora_et():
     return datetime.now(TZ_ET) if TZ_ET else datetime.now()
 
 
+# Backends de BeautifulSoup, del más rápido al más lento
+BACKENDS_HTML = ['lxml', 'html.parser', 'html5lib']
+
+
+def backends_disponibles():
+    return [b for b in BACKENDS_HTML if builder_registry.lookup(b) is not None]
+
+
+def resolver_backend_html(preferido=HTML_PARSER):
+    """Backend a usar: el configurado si está instalado; con 'auto', el más rápido."""
+    disponibles = backends_disponibles()
+    if preferido != 'auto':
+        if preferido in disponibles:
+            return preferido
+        logging.warning(f"Parser HTML '{preferido}' no disponible, se usa detección automática")
+    return disponibles[0]
+
+
+BACKEND_HTML = resolver_backend_html()
+
+
+def crear_soup(html, backend=None, parse_only=None):
+    """BeautifulSoup con el backend configurado; `parse_only` (SoupStrainer)
+    limita el árbol a las partes que interesan (html5lib no lo soporta)."""
+    backend = backend or BACKEND_HTML
+    if backend == 'html5lib':
+        parse_only = None
+    return BeautifulSoup(html, backend, parse_only=parse_only)
+
+
+# Secciones de las páginas de MUSL que usa el parser
+IDS_SECCIONES = ('numbers', 'winners', 'next-drawing')
+RE_ID_DOBLE_JUGADA = re.compile(r'(double|dbl)', re.IGNORECASE)
+RE_DOBLE_JUGADA = re.compile(r'Double\s*Play', re.IGNORECASE)
+RE_MULTIPLICADOR = re.compile(r'(Power\s*Play|All\s*Star\s*Bonus)', re.IGNORECASE)
+ESTRATO_SECCIONES = SoupStrainer(
+    id=lambda v: bool(v) and (v in IDS_SECCIONES or RE_ID_DOBLE_JUGADA.search(v) is not None))
+ESTRATO_NUMEROS = SoupStrainer(id='numbers')
+
+
+class FuenteDescartada(Exception):
+    """La carrera ya tiene ganador: la fuente que perdió no hace más peticiones."""
+
+
+# Evento de parada de la carrera que corre en cada hilo (ver carrera_con_cobertura)
+_carrera = threading.local()
+
+
+def verificar_carrera():
+    """Corta la fuente del hilo actual si su carrera ya terminó."""
+    detener = getattr(_carrera, 'detener', None)
+    if detener is not None and detener.is_set():
+        raise FuenteDescartada()
+
+
+def carrera_con_cobertura(nombre, primaria, respaldo, latencia=HEDGE_LATENCIA_SEGUNDOS,
+                          gracia=HEDGE_GRACIA_SEGUNDOS):
+    """Ejecuta `primaria()` y, si no terminó en `latencia` segundos (o falló
+    antes), lanza `respaldo()` en paralelo. Devuelve el primer resultado
+    completo ('_success'); si gana el respaldo, se espera todavía `gracia`
+    segundos a la principal, que trae más datos (ej. el Double Play). Si
+    ninguna da un resultado completo, se devuelve el último resultado
+    incompleto o se relanza el último error.
+
+    Cada fuente corre en su hilo con un Event de parada que http_get y
+    http_post revisan antes de cada petición: al terminar la carrera se
+    activa, y la que perdió se corta en su siguiente petición."""
+    llegadas = queue.Queue()
+    detener = threading.Event()
+
+    def lanzar(etiqueta, fuente):
+        def correr():
+            _carrera.detener = detener
+            try:
+                llegadas.put((etiqueta, fuente(), None))
+            except Exception as e:
+                llegadas.put((etiqueta, None, e))
+            finally:
+                _carrera.detener = None
+        # Hilo daemon: si pierde la carrera no retiene el fin del proceso
+        threading.Thread(target=correr, name=f'{nombre}-{etiqueta}', daemon=True).start()
+
+    def esperar_principal(results):
+        try:
+            etiqueta, principal, _ = llegadas.get(timeout=gracia)
+        except queue.Empty:
+            logging.info(f"[{nombre}] Gana la fuente respaldo; se descarta la otra")
+            return results
+        if principal is not None and principal.get('_success'):
+            logging.info(f"[{nombre}] La fuente {etiqueta} llegó dentro de la gracia; se usa esa")
+            return principal
+        return results
+
+    try:
+        lanzar('principal', primaria)
+        pendientes, respaldo_lanzado = 1, False
+        ultimo, error = None, None
+        while pendientes:
+            try:
+                espera = None if respaldo_lanzado else latencia
+                etiqueta, results, e = llegadas.get(timeout=espera)
+            except queue.Empty:
+                logging.info(f"[{nombre}] Sin respuesta en {latencia}s, se lanza el respaldo en paralelo")
+                lanzar('respaldo', respaldo)
+                pendientes, respaldo_lanzado = pendientes + 1, True
+                continue
+
+            pendientes -= 1
+            if results is not None and results.get('_success'):
+                if pendientes and etiqueta == 'respaldo' and gracia:
+                    return esperar_principal(results)
+                if pendientes:
+                    logging.info(f"[{nombre}] Gana la fuente {etiqueta}; se descarta la otra")
+                return results
+            if e is not None:
+                logging.warning(f"[{nombre}] Fuente {etiqueta} falló ({e})")
+                error = e
+            else:
+                logging.warning(f"[{nombre}] Fuente {etiqueta} devolvió un resultado incompleto")
+                ultimo = results
+            if not respaldo_lanzado:
+                lanzar('respaldo', respaldo)
+                pendientes, respaldo_lanzado = pendientes + 1, True
+    finally:
+        detener.set()
+
+    if ultimo is not None:
+        return ultimo
+    raise error
+
+
 class BaseScraper:
     """Lógica común a todos los juegos: fechas, montos, guardado e histórico."""
 
@@ -62,9 +205,53 @@ class BaseScraper:
         self.game_key = game_key
         self.cfg = cfg
         self.nombre = cfg['nombre']
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        self.headers = {'User-Agent': sesiones_http.USER_AGENT}
+
+    # ──────────────────────────────────────────────
+    # HTTP (sesiones compartidas por host)
+    # ──────────────────────────────────────────────
+    def http_get(self, url, **kwargs):
+        verificar_carrera()
+        kwargs.setdefault('headers', self.headers)
+        return sesiones_http.get(url, **kwargs)
+
+    def http_post(self, url, **kwargs):
+        verificar_carrera()
+        kwargs.setdefault('headers', self.headers)
+        return sesiones_http.post(url, **kwargs)
+
+    def http_get_condicional(self, url, parser, variante, params=None, cacheable=bool):
+        """GET con caché condicional (ETag / Last-Modified).
+
+        Devuelve parser(response). Si el servidor responde 304 se devuelve el
+        resultado guardado la vez anterior, sin descargar ni parsear. Solo se
+        guardan los resultados para los que cacheable(resultado) es verdadero."""
+        if not CACHE_HTTP_ACTIVO:
+            response = self.http_get(url, params=params)
+            response.raise_for_status()
+            return parser(response)
+
+        cache = cache_http.cache
+        clave = cache_http.clave(url, params, f'{self.game_key}:{variante}')
+        entrada = cache.leer(clave)
+        headers = {**self.headers, **cache.cabeceras_condicionales(entrada)}
+        response = self.http_get(url, params=params, headers=headers)
+        if response.status_code == 304:
+            if entrada is None:
+                raise RuntimeError(f'304 inesperado de {url}')
+            cache.hit(clave)
+            logging.info(f"[{self.nombre}] Sin cambios en {url} (304), se reutiliza el resultado")
+            resultado = entrada['resultado']
+            if isinstance(resultado, dict) and 'fecha_actualizacion' in resultado:
+                resultado['fecha_actualizacion'] = self.format_update_date()
+            return resultado
+
+        response.raise_for_status()
+        cache.miss()
+        resultado = parser(response)
+        if cacheable(resultado):
+            cache.guardar(clave, response, resultado)
+        return resultado
 
     # ──────────────────────────────────────────────
     # Utilidades de fechas y montos
@@ -260,18 +447,68 @@ class BaseScraper:
             raise RuntimeError('Este juego no tiene fuente Socrata configurada')
 
         logging.info(f"[{self.nombre}] Consultando respaldo data.ny.gov")
-        response = requests.get(
-            url,
+        return self.http_get_condicional(
+            url, self._parse_socrata_response, 'socrata',
             params={'$order': 'draw_date DESC', '$limit': 1},
-            headers=self.headers,
-            timeout=REQUEST_TIMEOUT,
+            cacheable=lambda r: r.get('_success'),
         )
-        response.raise_for_status()
+
+    def _parse_socrata_response(self, response):
         rows = response.json()
         if not rows:
             raise RuntimeError('data.ny.gov no devolvió filas')
         return self.parse_socrata_row(rows[0])
 
+    def iterar_socrata(self, where=None, offset=0, tam_pagina=SOCRATA_TAM_PAGINA, select=None):
+        """Recorre data.ny.gov por páginas ($limit/$offset), del sorteo más antiguo
+        al más reciente. Genera (offset_siguiente, filas) por cada página."""
+        url = self.cfg.get('socrata_url')
+        if not url:
+            raise RuntimeError('Este juego no tiene fuente Socrata configurada')
+
+        params = {'$order': 'draw_date ASC', '$limit': tam_pagina}
+        if where:
+            params['$where'] = where
+        if select:
+            params['$select'] = select
+        while True:
+            response = self.http_get(url, params={**params, '$offset': offset})
+            response.raise_for_status()
+            filas = response.json()
+            if not filas:
+                return
+            offset += len(filas)
+            yield offset, filas
+            if len(filas) < tam_pagina:
+                return
+
+    def entrada_historico(self, results):
+        """Entrada del histórico (sorteo + fecha de actualización) de un resultado."""
+        return {'sorteo': results['sorteo'], 'fecha_actualizacion': results['fecha_actualizacion']}
+
+    def sincronizar_socrata(self, tam_pagina=SOCRATA_TAM_PAGINA):
+        """Trae de data.ny.gov los sorteos posteriores al último del histórico.
+
+        Pide solo las filas con draw_date > última fecha guardada (en páginas)
+        y las agrega todas en una sola escritura. Devuelve cuántas eran nuevas."""
+        ultima = self.historico.ultima_fecha()
+        if not ultima:
+            logging.info(f"[{self.nombre}] Histórico vacío: nada que sincronizar (usar backfill.py)")
+            return 0
+
+        logging.info(f"[{self.nombre}] Sincronizando data.ny.gov desde {ultima}")
+        entradas = []
+        where = f"draw_date > '{ultima}T00:00:00.000'"
+        for _offset, filas in self.iterar_socrata(where=where, tam_pagina=tam_pagina):
+            for fila in filas:
+                results = self.parse_socrata_row(fila)
+                if results.get('_success'):
+                    entradas.append(self.entrada_historico(results))
+
+        nuevos = self.historico.agregar_varios(entradas) if entradas else 0
+        logging.info(f"[{self.nombre}] Sincronización: {nuevos} sorteos nuevos en el histórico")
+        return nuevos
+
     def parse_socrata_row(self, row):
         """Convierte una fila de data.ny.gov al formato estándar."""
         formato = self.cfg['socrata_formato']
@@ -304,58 +541,88 @@ class BaseScraper:
     def scrape(self):
         raise NotImplementedError
 
-    def scrape_with_retry(self, max_attempts=MAX_RETRY_ATTEMPTS, delay=RETRY_DELAY_SECONDS):
+    def scrape_with_retry(self, politica=None):
+        """Reintenta scrape() con backoff exponencial y jitter; cuántas veces
+        depende de la clase del error (ver reintentos.py)."""
+        politica = politica or reintentos.PoliticaReintentos()
         results = self.build_error('sin intentos')
-        for attempt in range(1, max_attempts + 1):
-            logging.info(f"[{self.nombre}] Intento {attempt} de {max_attempts}")
+        for attempt in range(1, politica.max_intentos + 1):
+            logging.info(f"[{self.nombre}] Intento {attempt} de {politica.max_intentos}")
             try:
                 results = self.scrape()
+                clase = 'parseo'
             except Exception as e:
                 logging.error(f"[{self.nombre}] Scraping falló: {e}")
                 results = self.build_error(e)
+                clase = reintentos.clasificar_error(e)
             if results.get('_success'):
                 return results
-            if attempt < max_attempts:
-                logging.info(f"[{self.nombre}] Esperando {delay}s...")
-                time.sleep(delay)
+            espera = politica.espera(attempt, clase)
+            if espera is None:
+                break
+            logging.info(f"[{self.nombre}] Error {clase}; esperando {espera:.1f}s...")
+            time.sleep(espera)
         logging.error(f"[{self.nombre}] Todos los intentos fallaron")
         return results
 
     # ──────────────────────────────────────────────
     # Guardado
     # ──────────────────────────────────────────────
-    def save_results(self, results):
-        """Guarda el resultado actual y lo agrega al histórico del juego."""
+    @property
+    def historico(self):
+        """Almacén indexado del histórico del juego (ver historico_store.py)."""
+        return historico_store.obtener_store(self.cfg['historic_file'])
+
+    def esta_al_dia(self):
+        """¿Ya está guardado (completo) el último sorteo según el calendario?
+
+        El histórico tiene que tener ese sorteo y el archivo de resultados
+        también, con todo lo que trae una extracción (ver resultado_completo):
+        si el archivo quedó atrás o incompleto, el juego se extrae igual. Sin
+        red ni parseo de HTML."""
+        ultima = self.historico.ultima_fecha()
+        if ultima is None or ultima < self.calcular_fecha_ultimo_sorteo():
+            return False
+        results = self._leer_resultado_actual()
+        return results is not None and results['sorteo']['fecha'] == ultima and self.resultado_completo(results)
+
+    def resultado_completo(self, results):
+        """¿El resultado trae todo lo que publica la fuente principal?"""
+        return bool(results.get('sorteo', {}).get('fecha'))
+
+    def _leer_resultado_actual(self):
         try:
-            results_to_save = {
-                'juego': results['juego'],
-                'nombre': results['nombre'],
-                'sorteo': results['sorteo'],
-                'proximo_sorteo': results['proximo_sorteo'],
-                'fecha_actualizacion': results['fecha_actualizacion'],
-            }
+            with open(self.cfg['results_file'], 'r', encoding='utf-8') as f:
+                results = json.load(f)
+            results['sorteo']['fecha']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+        return results
 
-            with open(self.cfg['results_file'], 'w', encoding='utf-8') as f:
-                json.dump(results_to_save, f, indent=2, ensure_ascii=False)
-            logging.info(f"[{self.nombre}] Guardado en {self.cfg['results_file']}")
+    def resultado_guardado(self):
+        """Último resultado ya guardado (del archivo de resultados actual, que
+        trae el próximo sorteo y el jackpot), para reportar un juego que se
+        omitió porque esta_al_dia()."""
+        results = self._leer_resultado_actual()
+        results.update({'_success': True, '_omitido': True})
+        return results
 
-            try:
-                with open(self.cfg['historic_file'], 'r', encoding='utf-8') as f:
-                    historico = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                historico = []
+    def save_results(self, results):
+        """Guarda el resultado actual y lo agrega al histórico del juego.
+
+        El JSON del histórico no se reescribe aquí sino una vez por corrida,
+        con exportar_historico."""
+        try:
+            results_to_save = resultado_publicable(results)
+            if escritura.escribir_json(self.cfg['results_file'], results_to_save):
+                logging.info(f"[{self.nombre}] Guardado en {self.cfg['results_file']}")
+            else:
+                logging.info(f"[{self.nombre}] Sin cambios en {self.cfg['results_file']}")
 
             fecha_sorteo = results['sorteo']['fecha']
-            ya_existe = any(r.get('sorteo', {}).get('fecha') == fecha_sorteo for r in historico)
-
-            if not ya_existe:
-                historico.insert(0, {
-                    'sorteo': results['sorteo'],
-                    'fecha_actualizacion': results['fecha_actualizacion'],
-                })
-                with open(self.cfg['historic_file'], 'w', encoding='utf-8') as f:
-                    json.dump(historico, f, indent=2, ensure_ascii=False)
-                logging.info(f"[{self.nombre}] Histórico: {len(historico)} sorteos")
+            nuevo = self.historico.agregar(self.entrada_historico(results))
+            if nuevo:
+                logging.info(f"[{self.nombre}] Histórico: {len(self.historico)} sorteos")
             else:
                 logging.info(f"[{self.nombre}] Sorteo {fecha_sorteo} ya existe en histórico")
 
@@ -364,29 +631,68 @@ class BaseScraper:
             logging.error(f"[{self.nombre}] Error al guardar: {e}")
             return False
 
+    def exportar_historico(self):
+        """Pasa al JSON del histórico los sorteos guardados desde la última exportación."""
+        try:
+            if self.historico.exportar_pendiente():
+                logging.info(f"[{self.nombre}] Histórico exportado a {self.cfg['historic_file']}")
+        except Exception as e:
+            logging.error(f"[{self.nombre}] Error al exportar el histórico: {e}")
+
 
 class MuslSiteScraper(BaseScraper):
     """Scraper para los sitios de MUSL (powerball.com y lottoamerica.com),
     que comparten la misma estructura HTML."""
 
+    # None = el backend global (BACKEND_HTML); se puede fijar por instancia
+    backend_html = None
+
     def scrape(self):
+        if not self.cfg.get('socrata_url'):
+            return self.scrape_sitio()
+        # Si el sitio tarda, data.ny.gov corre en paralelo y gana el primero
+        return carrera_con_cobertura(self.nombre, self.scrape_sitio, self.scrape_socrata)
+
+    def scrape_sitio(self):
         logging.info(f"[{self.nombre}] Iniciando scraping de {self.cfg['url']}")
-        try:
-            response = requests.get(self.cfg['url'], headers=self.headers, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            results = self.parse_html(response.content)
-            if not results.get('_success') and self.cfg.get('socrata_url'):
-                logging.warning(f"[{self.nombre}] Extracción incompleta del sitio, usando respaldo")
-                return self.scrape_socrata()
-            return results
-        except Exception as e:
-            if self.cfg.get('socrata_url'):
-                logging.warning(f"[{self.nombre}] Sitio oficial falló ({e}), usando respaldo")
-                return self.scrape_socrata()
-            raise
+        return self.http_get_condicional(
+            self.cfg['url'], lambda response: self.parse_html_memo(response.content), 'html',
+            cacheable=self._resultado_cacheable,
+        )
+
+    def parse_html_memo(self, html):
+        """parse_html, salvo que ya se haya parseado una página con el mismo contenido."""
+        clave, results = self.buscar_en_memo(html)
+        if results is None:
+            results = self.parse_html(html)
+            self.guardar_en_memo(clave, results)
+        return results
+
+    def buscar_en_memo(self, html):
+        """(clave, resultado ya parseado o None) de una página en el memo de parseo."""
+        if not MEMO_PARSEO_ACTIVO:
+            return None, None
+        clave = memo_parseo.clave(self.game_key, html)
+        results = memo_parseo.memo.obtener(clave)
+        if results is not None:
+            logging.info(f"[{self.nombre}] Página sin cambios de contenido, se reutiliza el parseo")
+            results['fecha_actualizacion'] = self.format_update_date()
+        return clave, results
+
+    def guardar_en_memo(self, clave, results):
+        if clave is not None and self._resultado_cacheable(results):
+            memo_parseo.memo.guardar(clave, results)
+
+    def _resultado_cacheable(self, results):
+        """¿Se puede reutilizar este resultado mientras la página no cambie?"""
+        return bool(results.get('_success')) and self.resultado_completo(results)
 
     def _extraer_bolas(self, contenedor):
-        """Devuelve (blancas, rojas, especial) dentro de un contenedor HTML.
+        """Devuelve (blancas, rojas, especial) dentro de un contenedor HTML."""
+        return self._clasificar_bolas(contenedor.find_all('div', class_='form-control'))
+
+    def _clasificar_bolas(self, elementos):
+        """Devuelve (blancas, rojas, especial) a partir de los 'form-control'.
 
         Las bolas principales llevan la clase 'white-balls' (o 'black-balls'
         en la página del Double Play); las rojas del 2by2 llevan 'red-balls'.
@@ -394,7 +700,7 @@ class MuslSiteScraper(BaseScraper):
         que no sea de los grupos anteriores, priorizando las clases
         configuradas (evita confundirla con el multiplicador, tipo '2X')."""
         blancas, rojas, candidatos = [], [], []
-        for c in contenedor.find_all('div', class_='form-control'):
+        for c in elementos:
             clases = c.get('class', [])
             texto = c.get_text(strip=True)
             num = re.sub(r'[^\d]', '', texto)
@@ -417,22 +723,60 @@ class MuslSiteScraper(BaseScraper):
             especial = candidatos[0][1]
         return blancas, rojas, especial
 
-    def parse_html(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
+    def _recolectar(self, soup):
+        """Recorre el documento una sola vez y junta todo lo que usa el parser:
+        las secciones por id, el primer título de sorteo, todas las bolas de la
+        página (para el fallback), los textos del multiplicador y las
+        candidatas a sección del Double Play."""
+        pagina = {
+            'soup': soup,
+            'secciones': {},
+            'primer_titulo': None,
+            'bolas': [],
+            'multiplicador': [],
+            'candidatas_doble': [],
+            'marcador_doble': None,
+        }
+        for nodo in soup.descendants:
+            if isinstance(nodo, NavigableString):
+                if RE_MULTIPLICADOR.search(nodo):
+                    pagina['multiplicador'].append(nodo)
+                if pagina['marcador_doble'] is None and RE_DOBLE_JUGADA.search(nodo):
+                    pagina['marcador_doble'] = nodo
+                continue
+            if not isinstance(nodo, Tag):
+                continue
+            clases = nodo.get('class') or []
+            id_nodo = nodo.get('id')
+            if nodo.name == 'div':
+                if 'form-control' in clases:
+                    pagina['bolas'].append(nodo)
+                if id_nodo in IDS_SECCIONES and 'col' in clases:
+                    pagina['secciones'].setdefault(id_nodo, nodo)
+            elif nodo.name == 'h5' and 'card-title' in clases and pagina['primer_titulo'] is None:
+                pagina['primer_titulo'] = nodo
+            if id_nodo and RE_ID_DOBLE_JUGADA.search(id_nodo):
+                pagina['candidatas_doble'].append(nodo)
+        return pagina
+
+    def _extraer_sorteo(self, pagina):
+        """Datos del sorteo actual y del próximo a partir de lo recolectado."""
+        datos = {'desde_seccion': False}
 
         # ── Sorteo actual (id="numbers") ──
-        numbers_section = soup.find('div', class_='col', id='numbers')
+        numbers_section = pagina['secciones'].get('numbers')
 
         draw_date = None
         if numbers_section:
             date_el = numbers_section.find('h5', class_='card-title')
             if date_el:
                 draw_date = self.format_date_iso(date_el.text.strip())
+        fecha_en_seccion = draw_date is not None
         if not draw_date:
-            date_el = soup.find('h5', class_='card-title')
+            date_el = pagina['primer_titulo']
             if date_el:
                 draw_date = self.format_date_iso(date_el.text.strip())
-                logging.info(f"[{self.nombre}] Fecha (fallback): {draw_date}")
+                datos['fecha_fallback'] = True
 
         # Bolas: primero dentro de la sección del sorteo; si no cuadra,
         # búsqueda en toda la página (comportamiento original)
@@ -440,8 +784,10 @@ class MuslSiteScraper(BaseScraper):
         blancas, rojas, especial = [], [], None
         if numbers_section:
             blancas, rojas, especial = self._extraer_bolas(numbers_section)
-        if len(blancas) != num_blancos or (self.cfg.get('bola_especial') and especial is None):
-            blancas_pg, rojas_pg, especial_pg = self._extraer_bolas(soup)
+        bolas_en_seccion = not (len(blancas) != num_blancos
+                                or (self.cfg.get('bola_especial') and especial is None))
+        if not bolas_en_seccion:
+            blancas_pg, rojas_pg, especial_pg = self._clasificar_bolas(pagina['bolas'])
             if len(blancas_pg) == num_blancos:
                 blancas = blancas_pg
                 rojas = rojas or rojas_pg
@@ -451,14 +797,12 @@ class MuslSiteScraper(BaseScraper):
         # las rojas SON las principales.
         if len(blancas) != num_blancos and not self.cfg.get('num_rojas') and len(rojas) == num_blancos:
             blancas, rojas = rojas, []
-        logging.info(f"[{self.nombre}] Blancas: {blancas} | Rojas: {rojas} | Especial: {especial}")
 
         # Multiplicador (Power Play / All Star Bonus)
         multiplicador = None
         try:
-            for pp in soup.find_all(string=re.compile(r'(Power\s*Play|All\s*Star\s*Bonus)', re.IGNORECASE)):
-                src = pp if isinstance(pp, str) else pp.text
-                m = re.search(r'(\d+)\s*x', src, re.IGNORECASE)
+            for pp in pagina['multiplicador']:
+                m = re.search(r'(\d+)\s*x', pp, re.IGNORECASE)
                 if not m and getattr(pp, 'parent', None) is not None:
                     m = re.search(r'(\d+)\s*x', pp.parent.text, re.IGNORECASE)
                 if m:
@@ -471,7 +815,7 @@ class MuslSiteScraper(BaseScraper):
         jackpot_ganado = False
         ganador_estado = None
         try:
-            winners_section = soup.find('div', class_='col', id='winners')
+            winners_section = pagina['secciones'].get('winners')
             if winners_section:
                 texto = winners_section.get_text()
                 if re.search(r'nadie|none|no\s+winner', texto, re.IGNORECASE):
@@ -481,14 +825,13 @@ class MuslSiteScraper(BaseScraper):
                     if m:
                         jackpot_ganado = True
                         ganador_estado = m.group(1)
-                        logging.info(f"[{self.nombre}] Jackpot GANADO en: {ganador_estado}")
         except Exception as e:
             logging.warning(f"[{self.nombre}] Error al leer ganadores: {e}")
 
         # ── Próximo sorteo (id="next-drawing") ──
         proximo = {'fecha': None, 'premio_estimado': None, 'premio_efectivo': None}
         try:
-            next_section = soup.find('div', class_='col', id='next-drawing')
+            next_section = pagina['secciones'].get('next-drawing')
             if next_section:
                 next_date_el = next_section.find('h5', class_='card-title')
                 if next_date_el:
@@ -522,8 +865,41 @@ class MuslSiteScraper(BaseScraper):
         except Exception as e:
             logging.warning(f"[{self.nombre}] Error próximo sorteo: {e}")
 
-        extra = self.extra_sorteo(soup, jackpot_ganado, ganador_estado)
-        results = self.build_results(draw_date, blancas, especial, multiplicador,
+        datos.update({
+            'fecha': draw_date, 'blancas': blancas, 'rojas': rojas, 'especial': especial,
+            'multiplicador': multiplicador, 'jackpot_ganado': jackpot_ganado,
+            'ganador_estado': ganador_estado, 'proximo': proximo,
+        })
+        # ¿Todo salió de la sección del sorteo? Entonces no hace falta mirar
+        # el resto de la página.
+        datos['desde_seccion'] = (
+            fecha_en_seccion and bolas_en_seccion
+            and len(rojas) == self.cfg.get('num_rojas', 0)
+            and (not self.cfg.get('multiplicador') or multiplicador is not None)
+        )
+        return datos
+
+    def parse_html(self, html):
+        # Primero se construye solo el árbol de las secciones que interesan
+        # (SoupStrainer); si con eso no alcanza, se parsea la página entera
+        # y se aplican los fallbacks de siempre.
+        pagina = self._recolectar(crear_soup(html, self.backend_html, parse_only=ESTRATO_SECCIONES))
+        datos = self._extraer_sorteo(pagina)
+        if not self._alcanza_con_secciones(pagina, datos):
+            pagina = self._recolectar(crear_soup(html, self.backend_html))
+            datos = self._extraer_sorteo(pagina)
+
+        blancas, rojas, especial = datos['blancas'], datos['rojas'], datos['especial']
+        num_blancos = self.cfg.get('num_blancos', 5)
+        if datos.get('fecha_fallback'):
+            logging.info(f"[{self.nombre}] Fecha (fallback): {datos['fecha']}")
+        logging.info(f"[{self.nombre}] Blancas: {blancas} | Rojas: {rojas} | Especial: {especial}")
+        if datos['jackpot_ganado']:
+            logging.info(f"[{self.nombre}] Jackpot GANADO en: {datos['ganador_estado']}")
+
+        extra = self.extra_sorteo(pagina, datos['jackpot_ganado'], datos['ganador_estado'])
+        proximo = datos['proximo']
+        results = self.build_results(datos['fecha'], blancas, especial, datos['multiplicador'],
                                      extra_sorteo=extra, proximo=proximo, rojas=rojas)
 
         if results['_success']:
@@ -531,34 +907,58 @@ class MuslSiteScraper(BaseScraper):
         else:
             logging.warning(
                 f"[{self.nombre}] [ADVERTENCIA] Incompleto — blancas:{len(blancas)}/{num_blancos}, "
-                f"rojas:{len(rojas)}, especial:{especial}, fecha:{draw_date}"
+                f"rojas:{len(rojas)}, especial:{especial}, fecha:{datos['fecha']}"
             )
         return results
 
-    def extra_sorteo(self, soup, jackpot_ganado, ganador_estado):
-        """Campos adicionales del sorteo; las subclases pueden ampliarlo."""
+    def _alcanza_con_secciones(self, pagina, datos):
+        """¿Basta con las secciones o hay que parsear la página entera?"""
+        return datos['desde_seccion']
+
+    def extra_sorteo(self, pagina, jackpot_ganado, ganador_estado):
+        """Campos adicionales del sorteo; las subclases pueden ampliarlo.
+
+        `pagina` es lo recolectado por _recolectar (incluye el 'soup')."""
         return {'jackpot_ganado': jackpot_ganado, 'ganador_estado': ganador_estado}
 
 
 class PowerballScraper(MuslSiteScraper):
     """Powerball: sitio oficial + extracción de Double Play."""
 
-    def extra_sorteo(self, soup, jackpot_ganado, ganador_estado):
-        extra = super().extra_sorteo(soup, jackpot_ganado, ganador_estado)
-        extra['doble_jugada'] = (self._extraer_doble_jugada(soup)
+    def extra_sorteo(self, pagina, jackpot_ganado, ganador_estado):
+        extra = super().extra_sorteo(pagina, jackpot_ganado, ganador_estado)
+        extra['doble_jugada'] = (self._doble_jugada_de(pagina)
                                  or self._doble_jugada_pagina_dedicada())
         return extra
 
-    def _extraer_doble_jugada(self, soup):
+    def _alcanza_con_secciones(self, pagina, datos):
+        # El Double Play puede estar fuera de las secciones con id (se ubica
+        # por el texto "Double Play"): sin él hay que mirar la página entera.
+        return (super()._alcanza_con_secciones(pagina, datos)
+                and self._doble_jugada_de(pagina) is not None)
+
+    def resultado_completo(self, results):
+        # Sin Double Play no se guarda en caché ni se omite la extracción:
+        # en la próxima corrida se reintenta
+        return super().resultado_completo(results) and bool(results['sorteo'].get('doble_jugada'))
+
+    def _doble_jugada_de(self, pagina):
+        """_extraer_doble_jugada una sola vez por página recolectada (lo usan
+        _alcanza_con_secciones y después extra_sorteo)."""
+        if 'doble_jugada' not in pagina:
+            pagina['doble_jugada'] = self._extraer_doble_jugada(pagina)
+        return pagina['doble_jugada']
+
+    def _extraer_doble_jugada(self, pagina):
         """Extrae los números del Double Play si aparecen en la misma página."""
         try:
             seccion = None
-            for candidata in soup.find_all(id=re.compile(r'(double|dbl)', re.IGNORECASE)):
-                if re.search(r'double\s*play', candidata.get_text(), re.IGNORECASE):
+            for candidata in pagina['candidatas_doble']:
+                if RE_DOBLE_JUGADA.search(candidata.get_text()):
                     seccion = candidata
                     break
             if not seccion:
-                marcador = soup.find(string=re.compile(r'Double\s*Play', re.IGNORECASE))
+                marcador = pagina['marcador_doble']
                 if marcador and getattr(marcador, 'parent', None) is not None:
                     seccion = (marcador.find_parent('div', class_='card')
                                or marcador.find_parent('div', class_='col'))
@@ -587,29 +987,48 @@ class PowerballScraper(MuslSiteScraper):
         # un segundo intento suele bastar.
         for intento in range(2):
             try:
-                response = requests.get(url, headers=self.headers, timeout=REQUEST_TIMEOUT)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                seccion = soup.find('div', class_='col', id='numbers') or soup
-                fecha_dp = None
-                date_el = seccion.find('h5', class_='card-title')
-                if date_el:
-                    fecha_dp = self.format_date_iso(date_el.text.strip())
-                blancas, _rojas, especial = self._extraer_bolas(seccion)
-                if len(blancas) == 5 and especial is not None:
-                    if fecha_esperada and fecha_dp and fecha_dp != fecha_esperada:
-                        logging.warning(
-                            f"[{self.nombre}] Double Play descartado: fecha {fecha_dp} "
-                            f"no coincide con el sorteo {fecha_esperada}"
-                        )
-                        return None
-                    logging.info(f"[{self.nombre}] Double Play (página dedicada): {sorted(blancas)} + {especial}")
-                    return {'blancos': sorted(blancas), 'powerball': especial}
+                completo, dp = self.http_get_condicional(
+                    url, lambda response: self.parse_doble_jugada(response.content, fecha_esperada),
+                    f'doble_jugada:{fecha_esperada}', cacheable=lambda r: r[0],
+                )
+                if completo:
+                    return dp
                 logging.warning(f"[{self.nombre}] Double Play incompleto (intento {intento + 1})")
+            except reintentos.CircuitoAbierto as e:
+                logging.warning(f"[{self.nombre}] Double Play no disponible: {e}")
+                break
             except Exception as e:
                 logging.warning(f"[{self.nombre}] Error Double Play (página dedicada, intento {intento + 1}): {e}")
         return None
 
+    def parse_doble_jugada(self, html, fecha_esperada=None):
+        """Parsea la página dedicada del Double Play.
+
+        Devuelve (completo, doble_jugada): `completo` es False cuando la
+        página no trae las 6 bolas (vale la pena reintentar); doble_jugada
+        es None si está incompleta o si su fecha no coincide con
+        `fecha_esperada`."""
+        # Basta el árbol de la sección del sorteo; sin ella, la página entera
+        seccion = crear_soup(html, self.backend_html, parse_only=ESTRATO_NUMEROS).find(
+            'div', class_='col', id='numbers')
+        if seccion is None:
+            seccion = crear_soup(html, self.backend_html)
+        fecha_dp = None
+        date_el = seccion.find('h5', class_='card-title')
+        if date_el:
+            fecha_dp = self.format_date_iso(date_el.text.strip())
+        blancas, _rojas, especial = self._extraer_bolas(seccion)
+        if len(blancas) != 5 or especial is None:
+            return False, None
+        if fecha_esperada and fecha_dp and fecha_dp != fecha_esperada:
+            logging.warning(
+                f"[{self.nombre}] Double Play descartado: fecha {fecha_dp} "
+                f"no coincide con el sorteo {fecha_esperada}"
+            )
+            return True, None
+        logging.info(f"[{self.nombre}] Double Play (página dedicada): {sorted(blancas)} + {especial}")
+        return True, {'blancos': sorted(blancas), 'powerball': especial}
+
     def scrape_socrata(self):
         """El respaldo de data.ny.gov no trae Double Play: se completa desde
         la página dedicada cuando la fecha coincide."""
@@ -627,25 +1046,20 @@ class MegaMillionsScraper(BaseScraper):
     """Mega Millions: API oficial del sitio, con respaldo en data.ny.gov."""
 
     def scrape(self):
-        try:
-            payload = self._fetch_api()
-            results = self.parse_api(payload)
-            if results.get('_success'):
-                return results
-            logging.warning(f"[{self.nombre}] Respuesta de API incompleta, usando respaldo")
-        except Exception as e:
-            logging.warning(f"[{self.nombre}] API oficial falló ({e}), usando respaldo")
-        return self.scrape_socrata()
+        return carrera_con_cobertura(self.nombre, self.scrape_api, self.scrape_socrata)
+
+    def scrape_api(self):
+        return self.parse_api(self._fetch_api())
 
     def _fetch_api(self):
         url = self.cfg['api_url']
         logging.info(f"[{self.nombre}] Consultando API {url}")
         headers = {**self.headers, 'Content-Type': 'application/json'}
         try:
-            response = requests.post(url, json={}, headers=headers, timeout=REQUEST_TIMEOUT)
+            response = self.http_post(url, json={}, headers=headers)
             response.raise_for_status()
         except Exception:
-            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            response = self.http_get(url, headers=headers)
             response.raise_for_status()
         return response.json()
 
@@ -713,22 +1127,65 @@ def crear_scraper(game_key, cfg):
     return SocrataScraper(game_key, cfg)
 
 
-def guardar_combinado(games):
-    """Escribe un único JSON con el último resultado de todos los juegos."""
-    combinado = {'juegos': {}, 'fecha_actualizacion': None}
-    for game_key, cfg in games.items():
+def resultado_publicable(results):
+    """Lo que se guarda de un resultado (sin los campos internos '_...')."""
+    return {
+        'juego': results['juego'],
+        'nombre': results['nombre'],
+        'sorteo': results['sorteo'],
+        'proximo_sorteo': results['proximo_sorteo'],
+        'fecha_actualizacion': results['fecha_actualizacion'],
+    }
+
+
+class Combinado:
+    """Archivo combinado con el último resultado de todos los juegos.
+
+    Se arma en memoria con los resultados de la corrida, sin volver a leer
+    los archivos de cada juego. Los juegos que no se pudieron extraer
+    conservan su entrada anterior del propio archivo combinado."""
+
+    def __init__(self, games, archivo=COMBINED_FILE):
+        self.games = games
+        self.archivo = archivo
+        self.juegos = self._anteriores()
+        self._lock = threading.Lock()
+
+    def _anteriores(self):
         try:
-            with open(cfg['results_file'], 'r', encoding='utf-8') as f:
-                combinado['juegos'][game_key] = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            continue
-    if not combinado['juegos']:
-        return
-    fechas = [g.get('fecha_actualizacion') for g in combinado['juegos'].values()]
-    combinado['fecha_actualizacion'] = next((f for f in fechas if f), None)
-    with open(COMBINED_FILE, 'w', encoding='utf-8') as f:
-        json.dump(combinado, f, indent=2, ensure_ascii=False)
-    logging.info(f"Archivo combinado guardado en {COMBINED_FILE}")
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                juegos = json.load(f).get('juegos', {})
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            return {}
+        return {k: v for k, v in juegos.items() if k in self.games}
+
+    def agregar(self, game_key, results):
+        if results.get('_success'):
+            with self._lock:
+                self.juegos[game_key] = resultado_publicable(results)
+
+    def guardar(self):
+        with self._lock:
+            juegos = {k: self.juegos[k] for k in self.games if k in self.juegos}
+        if not juegos:
+            return False
+        fechas = [g.get('fecha_actualizacion') for g in juegos.values()]
+        combinado = {'juegos': juegos, 'fecha_actualizacion': next((f for f in fechas if f), None)}
+        escrito = escritura.escribir_json(self.archivo, combinado)
+        if escrito:
+            logging.info(f"Archivo combinado guardado en {self.archivo} ({len(juegos)} juegos)")
+        else:
+            logging.info(f"Archivo combinado sin cambios ({self.archivo})")
+        return escrito
+
+
+def guardar_combinado(games, resumen):
+    """Escribe un único JSON con el último resultado de todos los juegos
+    a partir de `resumen` ({game_key: results} de la corrida)."""
+    combinado = Combinado(games)
+    for game_key, results in resumen.items():
+        combinado.agregar(game_key, results)
+    return combinado.guardar()
 
 
 def imprimir_resumen(resumen):
@@ -737,6 +1194,8 @@ def imprimir_resumen(resumen):
         print("\n" + "=" * 60)
         print(f"  {nombre.upper()}")
         print("=" * 60)
+        if results.get('_omitido'):
+            print("  (histórico al día: no se consultó la red)")
         if not results.get('_success'):
             print("  ❌ No se pudieron obtener los resultados")
             if results.get('error'):
@@ -770,30 +1229,130 @@ def imprimir_resumen(resumen):
             print(f"  Premio      : {proximo['premio_descripcion']}")
 
 
-def main():
-    logging.info("=" * 60)
-    logging.info("LOTTERY SCRAPER MULTI-JUEGO - INICIANDO")
-    logging.info("=" * 60)
+def procesar_juego(game_key, cfg, sincronizar=SINCRONIZAR_SOCRATA, forzar=False):
+    """Extrae un juego (con reintentos) y guarda su resultado si es válido.
+
+    Si el histórico ya tiene el último sorteo del calendario, el juego se
+    omite sin hacer ninguna petición (salvo con `forzar`).
+
+    Con `sincronizar`, después se completan desde data.ny.gov los sorteos que
+    falten entre el último del histórico y hoy. Va después del guardado para
+    que el sorteo más reciente quede con los datos del sitio oficial (ej. el
+    Double Play, que data.ny.gov no publica). Al final, todo lo nuevo pasa al
+    JSON del histórico en una sola exportación."""
+    scraper = crear_scraper(game_key, cfg)
+    if not forzar and scraper.esta_al_dia():
+        logging.info(f"[{cfg['nombre']}] Histórico al día ({scraper.historico.ultima_fecha()}): "
+                     f"se omite (--forzar para extraer igual)")
+        return scraper.resultado_guardado()
+
+    results = scraper.scrape_with_retry()
+
+    if results.get('_success'):
+        # La fecha scrapeada es la fuente de verdad; solo se avisa si
+        # parece atrasada respecto al calendario de sorteos.
+        fecha_calculada = scraper.calcular_fecha_ultimo_sorteo()
+        fecha_scrapeada = results['sorteo']['fecha']
+        if fecha_scrapeada < fecha_calculada:
+            logging.warning(
+                f"[{cfg['nombre']}] Posible desfase: scrapeada {fecha_scrapeada} "
+                f"vs esperada {fecha_calculada} (se conserva la scrapeada)"
+            )
+        scraper.save_results(results)
+
+    if sincronizar and cfg.get('socrata_url'):
+        try:
+            scraper.sincronizar_socrata()
+        except Exception as e:
+            logging.error(f"[{cfg['nombre']}] Sincronización con data.ny.gov falló: {e}")
+    scraper.exportar_historico()
+    return results
+
+
+def procesar_juegos(games, concurrente=EJECUCION_CONCURRENTE, max_workers=MAX_WORKERS,
+                    sincronizar=SINCRONIZAR_SOCRATA, forzar=False, al_terminar=None):
+    """Extrae todos los juegos y devuelve {game_key: results} en el orden de `games`.
+
+    En modo concurrente cada juego corre en su propio hilo de un pool acotado:
+    el tiempo total se acerca al del juego más lento en lugar de la suma.
+    Si se pasa `al_terminar(game_key, results)`, se llama (desde el hilo que
+    llamó a esta función) a medida que termina cada juego."""
+    if not concurrente or len(games) <= 1:
+        resumen = {}
+        for game_key, cfg in games.items():
+            resumen[game_key] = procesar_juego(game_key, cfg, sincronizar=sincronizar, forzar=forzar)
+            if al_terminar:
+                al_terminar(game_key, resumen[game_key])
+        return resumen
 
     resumen = {}
-    for game_key, cfg in GAMES.items():
-        scraper = crear_scraper(game_key, cfg)
-        results = scraper.scrape_with_retry()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(games)))) as pool:
+        futuros = {pool.submit(procesar_juego, game_key, cfg,
+                               sincronizar=sincronizar, forzar=forzar): game_key
+                   for game_key, cfg in games.items()}
+        for futuro in as_completed(futuros):
+            game_key = futuros[futuro]
+            try:
+                resumen[game_key] = futuro.result()
+            except Exception as e:
+                logging.error(f"[{games[game_key]['nombre']}] Error inesperado: {e}")
+                resumen[game_key] = {
+                    'juego': game_key,
+                    'nombre': games[game_key]['nombre'],
+                    '_success': False,
+                    'error': str(e),
+                }
+            if al_terminar:
+                al_terminar(game_key, resumen[game_key])
+    return {game_key: resumen[game_key] for game_key in games}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scraper multi-juego de loterías de EE.UU.')
+    parser.add_argument('--secuencial', action='store_true',
+                        help='extraer los juegos uno a uno en lugar de en paralelo')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f'hilos del modo concurrente (por defecto {MAX_WORKERS})')
+    parser.add_argument('--sincronizar', action=argparse.BooleanOptionalAction, default=SINCRONIZAR_SOCRATA,
+                        help='completar desde data.ny.gov los sorteos que falten en el histórico')
+    parser.add_argument('--combinado-incremental', action=argparse.BooleanOptionalAction,
+                        default=COMBINADO_INCREMENTAL,
+                        help=f'reescribir {COMBINED_FILE} a medida que termina cada juego')
+    parser.add_argument('--forzar', '--force', action='store_true',
+                        help='extraer también los juegos cuyo histórico ya tiene el último sorteo')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
 
-        if results.get('_success'):
-            # La fecha scrapeada es la fuente de verdad; solo se avisa si
-            # parece atrasada respecto al calendario de sorteos.
-            fecha_calculada = scraper.calcular_fecha_ultimo_sorteo()
-            fecha_scrapeada = results['sorteo']['fecha']
-            if fecha_scrapeada < fecha_calculada:
-                logging.warning(
-                    f"[{cfg['nombre']}] Posible desfase: scrapeada {fecha_scrapeada} "
-                    f"vs esperada {fecha_calculada} (se conserva la scrapeada)"
-                )
-            scraper.save_results(results)
-        resumen[game_key] = results
+    logging.info("=" * 60)
+    logging.info("LOTTERY SCRAPER MULTI-JUEGO - INICIANDO")
+    logging.info("=" * 60)
 
-    guardar_combinado(GAMES)
+    concurrente = EJECUCION_CONCURRENTE and not args.secuencial
+    combinado = Combinado(GAMES)
+    al_terminar = None
+    if args.combinado_incremental:
+        # Cada juego que termina queda publicado en el combinado sin esperar al resto
+        def al_terminar(game_key, results):
+            combinado.agregar(game_key, results)
+            combinado.guardar()
+    resumen = procesar_juegos(GAMES, concurrente=concurrente, max_workers=args.workers,
+                              sincronizar=args.sincronizar, forzar=args.forzar, al_terminar=al_terminar)
+
+    sesiones_http.cerrar_sesiones()
+    historico_store.cerrar_stores()
+    if CACHE_HTTP_ACTIVO:
+        cache_http.cache.purgar()
+        logging.info(cache_http.cache.resumen())
+    if MEMO_PARSEO_ACTIVO:
+        memo_parseo.memo.persistir()
+        logging.info(memo_parseo.memo.resumen())
+    logging.info(limitador.resumen())
+    for game_key, results in resumen.items():
+        combinado.agregar(game_key, results)
+    combinado.guardar()
     imprimir_resumen(resumen)
 
     exitosos = [k for k, r in resumen.items() if r.get('_success')]
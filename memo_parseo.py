@@ -0,0 +1,103 @@
+"""Memoización del parseo de páginas por hash del contenido.
+
+Entre sorteos powerball.com sirve la misma página una y otra vez, pero no
+siempre con un ETag/Last-Modified estable (ver cache_http.py), así que la
+página se descarga y se vuelve a parsear. Aquí se guarda el resultado de
+parse_html indexado por un hash del cuerpo: si la página no cambió, se
+devuelve el resultado guardado sin construir ningún árbol.
+
+El hash ignora los bloques <script> y los comentarios HTML, que es donde el
+sitio y la CDN meten marcas de tiempo y tokens que cambian en cada respuesta
+sin que cambie el sorteo. La clave incluye el juego y VERSION_PARSEO (se sube
+cuando cambia lo que extrae el parser, para invalidar lo guardado).
+
+Las entradas se guardan en memoria con desalojo LRU (a lo sumo
+MEMO_PARSEO_MAX_ENTRADAS) y se persisten en MEMO_PARSEO_ARCHIVO al final de
+cada corrida.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+import escritura
+from config import MEMO_PARSEO_ARCHIVO, MEMO_PARSEO_MAX_ENTRADAS
+
+VERSION_PARSEO = 1
+
+RE_VOLATIL = re.compile(rb'<script\b.*?</script\s*>|<!--.*?-->', re.S | re.I)
+
+
+def clave(game_key, html):
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    digest = hashlib.blake2b(RE_VOLATIL.sub(b'', html), digest_size=16).hexdigest()
+    return f'{game_key}:{VERSION_PARSEO}:{digest}'
+
+
+class MemoParseo:
+    def __init__(self, archivo=MEMO_PARSEO_ARCHIVO, max_entradas=MEMO_PARSEO_MAX_ENTRADAS):
+        self.archivo = archivo
+        self.max_entradas = max_entradas
+        self._entradas = None  # se carga del disco la primera vez que se usa
+        self._modificado = False
+        self._lock = threading.Lock()
+        self.estadisticas = {'hits': 0, 'misses': 0, 'evicciones': 0}
+
+    def _cargar(self):
+        if self._entradas is not None:
+            return
+        self._entradas = OrderedDict()
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                guardadas = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if isinstance(guardadas, list):
+            self._entradas.update((c, r) for c, r in guardadas[-self.max_entradas:])
+
+    def obtener(self, clave):
+        """Copia del resultado guardado para la clave (o None); la marca como reciente."""
+        with self._lock:
+            self._cargar()
+            resultado = self._entradas.get(clave)
+            if resultado is None:
+                self.estadisticas['misses'] += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.estadisticas['hits'] += 1
+            return copy.deepcopy(resultado)
+
+    def guardar(self, clave, resultado):
+        with self._lock:
+            self._cargar()
+            self._entradas[clave] = copy.deepcopy(resultado)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.estadisticas['evicciones'] += 1
+            self._modificado = True
+
+    def persistir(self):
+        """Escribe las entradas en disco (de la menos a la más reciente), si cambiaron."""
+        with self._lock:
+            if not self._modificado:
+                return
+            try:
+                escritura.escribir_atomico(self.archivo, json.dumps(list(self._entradas.items()),
+                                                                    ensure_ascii=False))
+            except OSError as e:
+                logging.warning(f"No se pudo guardar la memo de parseo: {e}")
+                return
+            self._modificado = False
+
+    def resumen(self):
+        e = self.estadisticas
+        return f"Memo de parseo: {e['hits']} hits, {e['misses']} misses, {e['evicciones']} evicciones"
+
+
+memo = MemoParseo()
@@ -0,0 +1,56 @@
+"""Páginas de ejemplo con la estructura HTML de powerball.com / lottoamerica.com.
+
+Las usan los tests (test_scraper.py) y el benchmark del parser
+(bench_parser.py) cuando no se le pasan páginas reales.
+"""
+
+HTML_POWERBALL = """
+<html><body>
+<div class="col" id="numbers">
+  <h5 class="card-title">Wed, Jul 15, 2026</h5>
+  <div class="form-control col white-balls item-powerball">2</div>
+  <div class="form-control col white-balls item-powerball">7</div>
+  <div class="form-control col white-balls item-powerball">18</div>
+  <div class="form-control col white-balls item-powerball">29</div>
+  <div class="form-control col white-balls item-powerball">38</div>
+  <div class="form-control col powerball item-powerball">16</div>
+  <span class="multiplier">Power Play 2X</span>
+</div>
+<div class="col" id="winners">
+  <p>Jackpot Winners: None</p>
+</div>
+<div class="col" id="dbl-numbers">
+  <h5 class="card-title">Double Play</h5>
+  <div class="form-control col white-balls">5</div>
+  <div class="form-control col white-balls">11</div>
+  <div class="form-control col white-balls">22</div>
+  <div class="form-control col white-balls">33</div>
+  <div class="form-control col white-balls">44</div>
+  <div class="form-control col powerball">9</div>
+</div>
+<div class="col" id="next-drawing">
+  <h5 class="card-title">Sat, Jul 18, 2026</h5>
+  <span class="game-jackpot-number">$526 Million</span>
+  <div class="cash-value"><span>Cash Value:</span> <span>$233.6 Million</span></div>
+</div>
+</body></html>
+"""
+
+HTML_LOTTO_AMERICA = """
+<html><body>
+<div class="col" id="numbers">
+  <h5 class="card-title">Wed, Jul 15, 2026</h5>
+  <div class="form-control col white-balls">3</div>
+  <div class="form-control col white-balls">14</div>
+  <div class="form-control col white-balls">25</div>
+  <div class="form-control col white-balls">36</div>
+  <div class="form-control col white-balls">47</div>
+  <div class="form-control col star-ball">8</div>
+  <span class="multiplier">All Star Bonus 3X</span>
+</div>
+<div class="col" id="next-drawing">
+  <h5 class="card-title">Sat, Jul 18, 2026</h5>
+  <span class="game-jackpot-number">$3.15 Million</span>
+</div>
+</body></html>
+"""
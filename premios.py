@@ -0,0 +1,115 @@
+"""Evaluación de premios por nivel, en lote sobre arreglos NumPy.
+
+A partir de los aciertos (blancas y bola especial, o blancas y rojas en 2by2)
+se obtiene el nivel de premio y el monto, aplicando el multiplicador del
+sorteo (powerplay, megaplier, all_star_bonus) o el fijo por día (martes de
+2by2). Las tablas están en config.PREMIOS.
+
+Todo se resuelve con dos búsquedas en tablas precalculadas, sin bucles en
+Python: `indice[blancas, segundo]` da el nivel y
+`montos[multiplicador, blancas, segundo]` el premio ya multiplicado, así que
+cualquier matriz de aciertos (ej. boletos × sorteos del verificador) se evalúa
+de una vez:
+
+    premios = PremiosJuego('powerball')
+    nivel, premio = premios.principal.evaluar(blancas, especial, multiplicadores)
+
+Los premios no fijos (pozo, rentas vitalicias de Cash4Life) tienen monto 0:
+su descripción sale de TablaPremios.descripcion(nivel).
+"""
+
+import numpy as np
+
+from config import GAMES, PREMIOS
+
+# Multiplicador más alto que puede tener un sorteo (Power Play 10x)
+MULTIPLICADOR_MAXIMO = 10
+SIN_PREMIO = -1
+
+
+def dia_semana(dias):
+    """Día de la semana (0=Lunes) de días desde 1970-01-01, que fue jueves."""
+    return (np.asarray(dias, dtype=np.int64) + 3) % 7
+
+
+class TablaPremios:
+    """Niveles de premio de un juego (o de su Double Play)."""
+
+    def __init__(self, niveles, con_multiplicador=None):
+        con_multiplicador = con_multiplicador or {}
+        self.claves = list(niveles)
+        self.premios = [niveles[c] for c in self.claves]
+        filas = max(b for b, _ in self.claves) + 1
+        columnas = max(s for _, s in self.claves) + 1
+
+        self.indice = np.full((filas, columnas), SIN_PREMIO, dtype=np.int8)
+        self.montos = np.zeros((MULTIPLICADOR_MAXIMO + 1, filas, columnas), dtype=np.int64)
+        factores = np.arange(MULTIPLICADOR_MAXIMO + 1)
+        for nivel, ((blancas, segundo), premio) in enumerate(zip(self.claves, self.premios)):
+            self.indice[blancas, segundo] = nivel
+            if isinstance(premio, str):
+                continue
+            # Sin multiplicador (0 o 1) paga el premio base
+            self.montos[:, blancas, segundo] = premio * np.maximum(factores, 1)
+            if (blancas, segundo) in con_multiplicador:
+                self.montos[2:, blancas, segundo] = con_multiplicador[(blancas, segundo)]
+
+    def evaluar(self, blancas, segundo, multiplicador=1):
+        """(nivel, premio) para arreglos de aciertos (se combinan con broadcasting).
+
+        nivel es SIN_PREMIO (-1) si no hay premio; premio está en dólares
+        (0 si no hay premio o no es fijo)."""
+        blancas = np.asarray(blancas, dtype=np.intp)
+        segundo = np.asarray(segundo, dtype=np.intp)
+        multiplicador = np.clip(np.asarray(multiplicador, dtype=np.intp), 0, MULTIPLICADOR_MAXIMO)
+        return self.indice[blancas, segundo], self.montos[multiplicador, blancas, segundo]
+
+    def descripcion(self, nivel):
+        """Texto del nivel: '3+1' (aciertos) o el premio no fijo ('Jackpot')."""
+        premio = self.premios[nivel]
+        return premio if isinstance(premio, str) else '+'.join(map(str, self.claves[nivel]))
+
+    def es_fijo(self, nivel):
+        return not isinstance(self.premios[nivel], str)
+
+
+class PremiosJuego:
+    def __init__(self, game_key, cfg=None, tablas=None):
+        self.game_key = game_key
+        self.cfg = cfg or GAMES[game_key]
+        self.opciones = tablas or PREMIOS[game_key]
+        self.precio = self.opciones.get('precio')
+        self.principal = TablaPremios(self.opciones['niveles'], self.opciones.get('con_multiplicador'))
+        self.doble = (TablaPremios(self.opciones['doble_jugada'])
+                      if self.opciones.get('doble_jugada') else None)
+
+    def multiplicadores(self, tabla, con_multiplicador=True):
+        """Multiplicador de cada sorteo de una TablaSorteos (1 = ninguno).
+
+        `con_multiplicador` indica si el boleto compró el multiplicador
+        opcional (Power Play, All Star Bonus, el Megaplier de antes de 2025);
+        los incluidos en el juego (desde 'multiplicador_incluido') y los fijos
+        por día se aplican siempre."""
+        factores = np.ones(len(tabla), dtype=np.intp)
+        if self.cfg.get('multiplicador'):
+            # 0 = sin dato; Mega Millions tiene -1 en entradas viejas
+            del_sorteo = np.maximum(tabla.multiplicador.astype(np.intp), 1)
+            incluido = self.opciones.get('multiplicador_incluido')
+            if con_multiplicador:
+                factores = del_sorteo
+            elif incluido:
+                desde = np.datetime64(incluido, 'D').astype(np.int64)
+                factores = np.where(tabla.dias >= desde, del_sorteo, 1)
+        dias = dia_semana(tabla.dias)
+        for dia, factor in self.opciones.get('multiplicador_por_dia', {}).items():
+            factores = np.where(dias == dia, factores * factor, factores)
+        return factores
+
+
+_premios = {}
+
+
+def de_juego(game_key):
+    if game_key not in _premios:
+        _premios[game_key] = PremiosJuego(game_key)
+    return _premios[game_key]
@@ -0,0 +1,164 @@
+"""Política de reintentos y circuit breakers por host.
+
+Los reintentos de cada juego esperan con backoff exponencial y jitter
+("full jitter": un tiempo al azar entre 0 y base·2^(n-1), con tope), así los
+juegos que fallan a la vez no vuelven a golpear el host todos juntos. Cuántas
+veces se reintenta depende de la clase del error:
+
+- 'transitorio': timeouts, errores de conexión, HTTP 5xx/408/429.
+- 'permanente': el resto de los 4xx (reintentar no cambia la respuesta).
+- 'parseo': la página llegó pero no se pudo extraer el sorteo completo.
+- 'circuito': el host tiene el circuito abierto (ver abajo).
+
+Cada host tiene un circuito compartido por todos los juegos: tras
+CIRCUITO_UMBRAL_FALLOS fallos seguidos (errores de red o 5xx) se abre y las
+peticiones a ese host fallan al instante con CircuitoAbierto, sin tocar la
+red, lo que hace que el juego pase directo a su respaldo. Pasados
+CIRCUITO_ENFRIAMIENTO_SEGUNDOS se deja pasar una petición de prueba
+(semiabierto): si sale bien el circuito se cierra, si no vuelve a abrirse.
+Cualquier excepción durante la petición cuenta como fallo; una interrupción
+(KeyboardInterrupt, la cancelación de la fuente que pierde una carrera) solo
+libera la prueba, para que el circuito no quede semiabierto para siempre.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import requests
+
+from config import (
+    CIRCUITO_ENFRIAMIENTO_SEGUNDOS,
+    CIRCUITO_UMBRAL_FALLOS,
+    MAX_RETRY_ATTEMPTS,
+    REINTENTOS_POR_CLASE,
+    RETRY_BACKOFF_MAX_SEGUNDOS,
+    RETRY_DELAY_SECONDS,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# asyncio.TimeoutError es un alias de TimeoutError recién desde Python 3.11
+ERRORES_RED = (requests.Timeout, requests.ConnectionError, TimeoutError, asyncio.TimeoutError, ConnectionError)
+if aiohttp is not None:
+    ERRORES_RED += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+
+class CircuitoAbierto(Exception):
+    """El host tuvo demasiados fallos seguidos; no se le hacen peticiones."""
+
+    def __init__(self, host, reintentar_en):
+        super().__init__(f'circuito abierto para {host} (se reintenta en {reintentar_en:.0f}s)')
+        self.host = host
+        self.reintentar_en = reintentar_en
+
+
+def status_de(error):
+    respuesta = getattr(error, 'response', None)
+    return getattr(respuesta, 'status_code', None) or getattr(error, 'status', None)
+
+
+def status_es_transitorio(status):
+    return status >= 500 or status in (408, 429)
+
+
+def clasificar_error(error):
+    """Clase de un error: 'circuito', 'transitorio', 'permanente' o 'parseo'."""
+    if isinstance(error, CircuitoAbierto):
+        return 'circuito'
+    status = status_de(error)
+    if isinstance(status, int):
+        return 'transitorio' if status_es_transitorio(status) else 'permanente'
+    if isinstance(error, ERRORES_RED):
+        return 'transitorio'
+    return 'parseo'
+
+
+class PoliticaReintentos:
+    """Decide si se reintenta y cuánto se espera antes del siguiente intento."""
+
+    def __init__(self, max_intentos=MAX_RETRY_ATTEMPTS, base=RETRY_DELAY_SECONDS,
+                 tope=RETRY_BACKOFF_MAX_SEGUNDOS, por_clase=REINTENTOS_POR_CLASE, azar=random.random):
+        self.max_intentos = max_intentos
+        self.base = base
+        self.tope = tope
+        self.por_clase = por_clase
+        self.azar = azar
+
+    def espera(self, intento, clase):
+        """Segundos a esperar tras el intento `intento` (desde 1) fallido con
+        un error de clase `clase`, o None si no hay que reintentar."""
+        limite = min(self.max_intentos, self.por_clase.get(clase, self.max_intentos))
+        if intento >= limite:
+            return None
+        return self.azar() * min(self.tope, self.base * 2 ** (intento - 1))
+
+
+class Circuito:
+    """Circuit breaker de un host: cerrado → abierto → semiabierto → cerrado."""
+
+    def __init__(self, host, umbral=CIRCUITO_UMBRAL_FALLOS, enfriamiento=CIRCUITO_ENFRIAMIENTO_SEGUNDOS,
+                 reloj=time.monotonic):
+        self.host = host
+        self.umbral = umbral
+        self.enfriamiento = enfriamiento
+        self.reloj = reloj
+        self.estado = 'cerrado'
+        self.fallos = 0
+        self.abierto_desde = None
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        """Lanza CircuitoAbierto si no se debe hacer la petición."""
+        with self._lock:
+            if self.estado == 'cerrado':
+                return
+            restante = self.abierto_desde + self.enfriamiento - self.reloj()
+            if self.estado == 'abierto' and restante <= 0:
+                # Solo la primera petición tras el enfriamiento sale como prueba
+                self.estado = 'semiabierto'
+                return
+            raise CircuitoAbierto(self.host, max(restante, 0))
+
+    def registrar_exito(self):
+        with self._lock:
+            self.estado, self.fallos, self.abierto_desde = 'cerrado', 0, None
+
+    def registrar_fallo(self):
+        """Devuelve True si este fallo abrió el circuito."""
+        with self._lock:
+            self.fallos += 1
+            if self.estado == 'semiabierto' or (self.estado == 'cerrado' and self.fallos >= self.umbral):
+                self.estado, self.abierto_desde = 'abierto', self.reloj()
+                return True
+            return False
+
+    def liberar_prueba(self):
+        """La petición de prueba se interrumpió (cancelación, Ctrl+C) sin decir
+        nada del host: el circuito vuelve a abierto sin contar un fallo y la
+        próxima petición sale como nueva prueba."""
+        with self._lock:
+            if self.estado == 'semiabierto':
+                self.estado = 'abierto'
+
+
+_circuitos = {}
+_lock = threading.Lock()
+
+
+def circuito_de(host):
+    """Circuito compartido del host (se crea la primera vez)."""
+    with _lock:
+        circuito = _circuitos.get(host)
+        if circuito is None:
+            circuito = _circuitos[host] = Circuito(host)
+        return circuito
+
+
+def reiniciar_circuitos():
+    with _lock:
+        _circuitos.clear()
@@ -0,0 +1,105 @@
+"""Capa HTTP compartida por todos los scrapers.
+
+Mantiene una sesión de `requests` por host con su propio pool de conexiones
+keep-alive: los cuatro accesos a powerball.com (Powerball, Lotto America,
+2by2 y la página del Double Play) y los tres a data.ny.gov reutilizan la
+conexión TCP+TLS en lugar de abrir una nueva en cada petición. Las sesiones
+negocian compresión (gzip/deflate, y br/zstd si urllib3 puede decodificarlos).
+
+Cada petición pasa además por el circuit breaker del host (reintentos.py),
+que con el circuito abierto lanza CircuitoAbierto sin tocar la red, y por el
+limitador de peticiones del host (limitador.py).
+"""
+
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, REQUEST_TIMEOUT
+import limitador
+import reintentos
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+_sesiones = {}
+_lock = threading.Lock()
+
+
+def host_de(url):
+    """Host (con puerto, si lo hay) de una URL, en minúsculas."""
+    return urlsplit(url).netloc.lower()
+
+
+def _crear_sesion():
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS,
+                            pool_maxsize=HTTP_POOL_MAXSIZE)
+    sesion.mount('https://', adaptador)
+    sesion.mount('http://', adaptador)
+    sesion.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+    })
+    return sesion
+
+
+def obtener_sesion(url):
+    """Sesión compartida para el host de la URL (se crea la primera vez)."""
+    host = host_de(url)
+    with _lock:
+        sesion = _sesiones.get(host)
+        if sesion is None:
+            sesion = _sesiones[host] = _crear_sesion()
+        return sesion
+
+
+def registrar_resultado(circuito, status=None, error=None):
+    """Cuenta la respuesta en el circuito del host: los errores de red y los
+    5xx/429 son fallos del host; cualquier otra respuesta es un éxito."""
+    if error is not None or reintentos.status_es_transitorio(status):
+        if circuito.registrar_fallo():
+            logging.warning(f"Circuito abierto para {circuito.host} tras {circuito.fallos} fallos seguidos")
+    else:
+        circuito.registrar_exito()
+
+
+def request(method, url, **kwargs):
+    """Como `requests.request`, pero usando la sesión, el circuito y el
+    limitador del host."""
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    host = host_de(url)
+    circuito = reintentos.circuito_de(host)
+    circuito.permitir()
+    try:
+        limitador.esperar_turno(host)
+        response = obtener_sesion(url).request(method, url, **kwargs)
+    except Exception as e:
+        registrar_resultado(circuito, error=e)
+        raise
+    except BaseException:
+        circuito.liberar_prueba()
+        raise
+    registrar_resultado(circuito, response.status_code)
+    return response
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def cerrar_sesiones():
+    """Cierra todas las sesiones (y sus conexiones) abiertas."""
+    with _lock:
+        sesiones = list(_sesiones.values())
+        _sesiones.clear()
+    for sesion in sesiones:
+        sesion.close()
@@ -0,0 +1,250 @@
+"""Simulador Monte Carlo de probabilidades y valor esperado por juego.
+
+Genera boletos al azar (quick pick) y un sorteo al azar para cada uno con las
+reglas de GAMES (bolas blancas, rojas de 2by2, bola especial), cuenta los
+aciertos y evalúa los premios con premios.py. El resultado es la frecuencia de cada nivel (junto a la
+probabilidad exacta, para comparar) y el valor esperado del boleto, con el
+pozo tomado de proximo_sorteo.premio_estimado (o premio_efectivo) del último
+resultado guardado.
+
+Cada bloque de SIMULADOR_BLOQUE boletos se genera y evalúa vectorizado. Los
+boletos se reparten en tareas de SIMULADOR_BOLETOS_POR_TAREA entre un pool de
+procesos (uno por núcleo); cada tarea tiene su propio flujo aleatorio
+derivado de la semilla con SeedSequence.spawn, así una misma semilla da el
+mismo resultado con cualquier cantidad de procesos.
+
+Uso:
+    python simulador.py powerball --boletos 1000000000
+    python simulador.py megamillions --efectivo --semilla 42
+    python simulador.py powerball --multiplicador 2      # con Power Play 2x
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import GAMES, SIMULADOR_BLOQUE, SIMULADOR_BOLETOS_POR_TAREA
+import premios as premios_juego
+
+
+def _repetidas(bolas):
+    """Columnas con alguna bola repetida en una matriz (bolas × n)."""
+    repetidas = np.zeros(bolas.shape[1], dtype=bool)
+    for i in range(len(bolas)):
+        for j in range(i + 1, len(bolas)):
+            repetidas |= bolas[i] == bolas[j]
+    return repetidas
+
+
+def bolas_distintas(rng, n, k, maximo):
+    """Matriz (k × n, uint8) con k bolas distintas entre 1 y maximo por columna.
+
+    Va traspuesta (una fila por posición de bola) para que las comparaciones
+    recorran memoria contigua. Las columnas con repetidos se vuelven a sortear
+    (rechazo), lo que deja cada combinación con la misma probabilidad."""
+    bolas = rng.integers(1, maximo + 1, size=(k, n), dtype=np.uint8)
+    pendientes = np.flatnonzero(_repetidas(bolas))
+    while len(pendientes):
+        nuevas = rng.integers(1, maximo + 1, size=(k, len(pendientes)), dtype=np.uint8)
+        bolas[:, pendientes] = nuevas
+        pendientes = pendientes[_repetidas(nuevas)]
+    return bolas
+
+
+def aciertos_por_columna(boletos, sorteos):
+    """Bolas en común entre cada boleto y el sorteo de la misma columna.
+
+    Con 5 bolas son 25 comparaciones de arreglos contiguos, más rápido que
+    armar conjuntos de bits para un solo sorteo por boleto."""
+    aciertos = np.zeros(boletos.shape[1], dtype=np.uint8)
+    for bola in boletos:
+        for otra in sorteos:
+            aciertos += bola == otra
+    return aciertos
+
+
+def factores_y_pesos(multiplicador):
+    """(factores, probabilidades) de un multiplicador fijo (int) o de uno al
+    azar ({factor: casos}, ver config.PREMIOS['multiplicadores'])."""
+    if isinstance(multiplicador, dict):
+        factores = np.array(list(multiplicador), dtype=np.intp)
+        casos = np.array(list(multiplicador.values()), dtype=float)
+        return factores, casos / casos.sum()
+    return np.array([multiplicador], dtype=np.intp), np.ones(1)
+
+
+def simular_bloque(rng, n, cfg, tabla, multiplicador=1):
+    """Niveles y premios de n boletos contra n sorteos al azar.
+
+    `multiplicador` es un factor fijo o {factor: casos}: en ese caso cada
+    sorteo simulado sortea el suyo."""
+    k = cfg.get('num_blancos', 5)
+    blancas = aciertos_por_columna(bolas_distintas(rng, n, k, cfg['max_blancos']),
+                                   bolas_distintas(rng, n, k, cfg['max_blancos']))
+    if cfg.get('num_rojas'):
+        r = cfg['num_rojas']
+        segundo = aciertos_por_columna(bolas_distintas(rng, n, r, cfg['max_rojos']),
+                                       bolas_distintas(rng, n, r, cfg['max_rojos']))
+    elif cfg.get('bola_especial'):
+        segundo = (rng.integers(1, cfg['max_especial'] + 1, size=n, dtype=np.uint8)
+                   == rng.integers(1, cfg['max_especial'] + 1, size=n, dtype=np.uint8))
+    else:
+        segundo = np.zeros(n, dtype=np.uint8)
+    if isinstance(multiplicador, dict):
+        factores, pesos = factores_y_pesos(multiplicador)
+        multiplicador = rng.choice(factores, size=n, p=pesos)
+    return tabla.evaluar(blancas, segundo, multiplicador)
+
+
+def _simular_tarea(game_key, boletos, semilla, bloque, multiplicador):
+    """Una tarea del pool: cuenta por nivel (el último lugar = sin premio) y
+    suma de premios fijos."""
+    cfg = GAMES[game_key]
+    tabla = premios_juego.de_juego(game_key).principal
+    rng = np.random.default_rng(semilla)
+    veces = np.zeros(len(tabla.claves) + 1, dtype=np.int64)
+    total = 0
+    for inicio in range(0, boletos, bloque):
+        nivel, premio = simular_bloque(rng, min(bloque, boletos - inicio), cfg, tabla, multiplicador)
+        # SIN_PREMIO (-1) cae en el último lugar
+        veces += np.bincount(nivel.astype(np.intp) % len(veces), minlength=len(veces))
+        total += int(premio.sum())
+    return veces, total
+
+
+def probabilidad_exacta(cfg, aciertos):
+    """Probabilidad de un nivel (blancas, segundo) para un boleto al azar."""
+    def hipergeometrica(aciertos, k, maximo):
+        return math.comb(k, aciertos) * math.comb(maximo - k, k - aciertos) / math.comb(maximo, k)
+
+    blancas, segundo = aciertos
+    probabilidad = hipergeometrica(blancas, cfg.get('num_blancos', 5), cfg['max_blancos'])
+    if cfg.get('num_rojas'):
+        return probabilidad * hipergeometrica(segundo, cfg['num_rojas'], cfg['max_rojos'])
+    if cfg.get('bola_especial'):
+        especial = 1 / cfg['max_especial']
+        return probabilidad * (especial if segundo else 1 - especial)
+    return probabilidad
+
+
+def pozo_actual(game_key, efectivo=False):
+    """premio_estimado (o premio_efectivo) del próximo sorteo según el último
+    resultado guardado; None si no figura."""
+    try:
+        with open(GAMES[game_key]['results_file'], 'r', encoding='utf-8') as f:
+            proximo = json.load(f).get('proximo_sorteo') or {}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return proximo.get('premio_efectivo' if efectivo else 'premio_estimado')
+
+
+def simular(game_key, boletos, semilla=None, workers=None, multiplicador=None, jackpot=None,
+            bloque=SIMULADOR_BLOQUE, por_tarea=SIMULADOR_BOLETOS_POR_TAREA):
+    """Simula `boletos` boletos y devuelve el resumen (dict).
+
+    `semilla` None usa entropía del sistema (el resumen la incluye, para
+    repetir la corrida). `multiplicador` None es el del juego: al azar con
+    sus probabilidades si viene incluido en el boleto (Mega Millions), si no
+    1. `jackpot` es el valor del pozo en dólares para el valor esperado
+    (None = no se cuenta). Con workers=1 no se usa el pool."""
+    cfg = GAMES[game_key]
+    juego = premios_juego.de_juego(game_key)
+    if multiplicador is None:
+        multiplicador = juego.opciones.get('multiplicadores', 1) if juego.opciones.get('multiplicador_incluido') else 1
+    factores, pesos = factores_y_pesos(multiplicador)
+    semillas = np.random.SeedSequence(semilla)
+    tamanios = [min(por_tarea, boletos - i) for i in range(0, boletos, por_tarea)]
+    tareas = [(game_key, n, s, bloque, multiplicador) for n, s in zip(tamanios, semillas.spawn(len(tamanios)))]
+
+    inicio = time.monotonic()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tareas) == 1:
+        resultados = [_simular_tarea(*t) for t in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tareas))) as pool:
+            resultados = list(pool.map(_simular_tarea, *zip(*tareas)))
+    veces = sum((v for v, _ in resultados), np.zeros(len(juego.principal.claves) + 1, dtype=np.int64))
+    total_fijos = sum(t for _, t in resultados)
+
+    niveles, valor_no_fijo = [], 0
+    for nivel, (clave, premio) in enumerate(zip(juego.principal.claves, juego.principal.premios)):
+        niveles.append({
+            'nivel': '+'.join(map(str, clave)),
+            'premio': premio,
+            # Con el multiplicador y sus topes (ej. 5+0 de Powerball: $2M con Power Play);
+            # con multiplicador al azar, el promedio
+            'monto': None if isinstance(premio, str) else
+                     round(float(juego.principal.evaluar(*clave, factores)[1] @ pesos)),
+            'veces': int(veces[nivel]),
+            'frecuencia': veces[nivel] / boletos if boletos else 0.0,
+            'probabilidad': probabilidad_exacta(cfg, clave),
+        })
+        if premio == 'Jackpot' and jackpot:
+            valor_no_fijo += int(veces[nivel]) * jackpot
+
+    valor_esperado = (total_fijos + valor_no_fijo) / boletos if boletos else 0.0
+    return {
+        'juego': game_key,
+        'boletos': boletos,
+        'semilla': semillas.entropy,
+        'multiplicador': multiplicador,
+        'jackpot': jackpot,
+        'niveles': niveles,
+        'premiados': int(veces[:-1].sum()),
+        'premios_fijos': total_fijos,
+        'valor_esperado': valor_esperado,
+        'precio': juego.precio,
+        'retorno': valor_esperado / juego.precio if juego.precio else None,
+        'segundos': time.monotonic() - inicio,
+    }
+
+
+def imprimir(resumen):
+    cfg = GAMES[resumen['juego']]
+    print(f"{cfg['nombre']}: {resumen['boletos']:,} boletos en {resumen['segundos']:.1f}s "
+          f"({resumen['boletos'] / max(resumen['segundos'], 1e-9):,.0f} boletos/s), semilla {resumen['semilla']}")
+    if isinstance(resumen['multiplicador'], dict):
+        print(f"  Multiplicador al azar en cada sorteo ({', '.join(f'{f}x' for f in resumen['multiplicador'])}); "
+              f"premios promedio")
+    print(f"\n  {'Nivel':<6} {'Premio':>32} {'Veces':>14} {'Simulada':>14} {'Exacta':>14}")
+    for n in resumen['niveles']:
+        premio = n['premio'] if n['monto'] is None else f"${n['monto']:,}"
+        simulada = f"1 en {1 / n['frecuencia']:,.1f}" if n['frecuencia'] else '-'
+        exacta = f"1 en {1 / n['probabilidad']:,.1f}"
+        print(f"  {n['nivel']:<6} {premio:>32} {n['veces']:>14,} {simulada:>14} {exacta:>14}")
+    print(f"\n  Premiados: {resumen['premiados']:,} (1 en {resumen['boletos'] / max(resumen['premiados'], 1):,.2f})")
+    pozo = f"pozo ${resumen['jackpot']:,}" if resumen['jackpot'] else 'sin contar el pozo'
+    print(f"  Valor esperado: ${resumen['valor_esperado']:.4f} por boleto ({pozo})")
+    if resumen['retorno'] is not None:
+        print(f"  Retorno: {resumen['retorno']:.1%} de ${resumen['precio']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulación Monte Carlo de probabilidades y valor esperado')
+    parser.add_argument('juego', choices=list(GAMES))
+    parser.add_argument('--boletos', type=int, default=10_000_000, help='boletos a simular (por defecto 10 millones)')
+    parser.add_argument('--semilla', type=int, help='semilla (por defecto al azar; se informa para repetir)')
+    parser.add_argument('--workers', type=int, help='procesos (por defecto uno por núcleo)')
+    parser.add_argument('--multiplicador', type=int,
+                        help='multiplicador fijo para los premios fijos (Power Play, All Star Bonus...); por '
+                             'defecto ninguno, o al azar si el juego lo incluye (Mega Millions)')
+    parser.add_argument('--jackpot', type=int, help='valor del pozo en dólares (por defecto el del último resultado)')
+    parser.add_argument('--efectivo', action='store_true', help='usar premio_efectivo (pago en efectivo) como pozo')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    jackpot = args.jackpot or pozo_actual(args.juego, args.efectivo)
+    if jackpot is None and 'Jackpot' in premios_juego.de_juego(args.juego).principal.premios:
+        logging.warning(f"[{GAMES[args.juego]['nombre']}] Sin pozo en el último resultado: "
+                        f"el valor esperado no lo incluye (usar --jackpot)")
+    imprimir(simular(args.juego, args.boletos, args.semilla, args.workers, args.multiplicador, jackpot))
+
+
+if __name__ == '__main__':
+    main()
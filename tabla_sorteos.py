@@ -0,0 +1,187 @@
+"""Histórico de un juego en columnas NumPy de ancho fijo.
+
+El histórico se guarda como una lista de diccionarios anidados por sorteo
+(cómodo para el JSON, lento y pesado para analizar miles de sorteos).
+TablaSorteos carga las mismas entradas en arreglos de ancho fijo, ordenados
+del sorteo más antiguo al más reciente:
+
+- dias: int32, días desde 1970-01-01 (`fechas` las da como datetime64[D])
+- blancos / rojos: matrices uint8 (sorteos × bolas)
+- especial: uint8, 0 = sin dato
+- multiplicador: int8, 0 = sin dato (entradas viejas de Mega Millions
+  guardaron el -1 de la API: se conserva)
+- jackpot: int8 (-1 = no figura, 0 = no, 1 = sí)
+- ganador: int16, índice en `estados` (-1 = no figura, 0 = None)
+- doble: int8 (-1 = no figura, 0 = None, 1 = hay Double Play), con
+  doble_blancos (uint8, sorteos × 5) y doble_especial (uint8)
+- actualizado: el texto de fecha_actualizacion (objeto; opcional)
+
+La conversión es de ida y vuelta: a_entradas() devuelve las mismas entradas
+que se cargaron (del más reciente al más antiguo, como el JSON).
+
+    tabla = TablaSorteos.desde_json('powerball')
+    frecuencias = np.bincount(tabla.blancos.ravel(), minlength=70)
+"""
+
+import json
+
+import numpy as np
+
+from config import GAMES
+import historico_store
+
+SIN_DATO = 0
+NO_FIGURA = -1
+BOLAS_DOBLE_JUGADA = 5
+
+
+def _dias(fechas):
+    return np.array(fechas, dtype='datetime64[D]').astype(np.int32)
+
+
+class TablaSorteos:
+    COLUMNAS = ('dias', 'blancos', 'rojos', 'especial', 'multiplicador', 'jackpot', 'ganador',
+                'doble', 'doble_blancos', 'doble_especial', 'actualizado')
+
+    def __init__(self, game_key, estados=(), cfg=None, **columnas):
+        self.game_key = game_key
+        self.cfg = cfg or GAMES[game_key]
+        self.estados = list(estados)
+        for nombre in self.COLUMNAS:
+            setattr(self, nombre, columnas[nombre])
+
+    # ──────────────────────────────────────────────
+    # Carga
+    # ──────────────────────────────────────────────
+    @classmethod
+    def desde_entradas(cls, game_key, entradas, cfg=None, con_actualizacion=True):
+        """Tabla a partir de entradas del histórico ({'sorteo', 'fecha_actualizacion'})."""
+        cfg = cfg or GAMES[game_key]
+        clave_especial = cfg.get('bola_especial')
+        clave_multiplicador = cfg.get('multiplicador')
+        entradas = sorted(entradas, key=lambda e: e['sorteo']['fecha'])
+
+        estados, codigos_estado = [], {}
+        fechas, blancos, rojos, especial, multiplicador = [], [], [], [], []
+        jackpot, ganador, doble, doble_blancos, doble_especial, actualizado = [], [], [], [], [], []
+        for entrada in entradas:
+            sorteo = entrada['sorteo']
+            fechas.append(sorteo['fecha'])
+            blancos.append(sorteo['blancos'])
+            rojos.append(sorteo.get('rojos', []))
+            especial.append((sorteo.get(clave_especial) if clave_especial else None) or SIN_DATO)
+            multiplicador.append((sorteo.get(clave_multiplicador) if clave_multiplicador else None) or SIN_DATO)
+
+            jackpot.append(int(sorteo['jackpot_ganado']) if 'jackpot_ganado' in sorteo else NO_FIGURA)
+            if 'ganador_estado' not in sorteo:
+                ganador.append(NO_FIGURA)
+            elif sorteo['ganador_estado'] is None:
+                ganador.append(SIN_DATO)
+            else:
+                nombre = sorteo['ganador_estado']
+                if nombre not in codigos_estado:
+                    estados.append(nombre)
+                    codigos_estado[nombre] = len(estados)
+                ganador.append(codigos_estado[nombre])
+
+            dp = sorteo.get('doble_jugada')
+            doble.append(NO_FIGURA if 'doble_jugada' not in sorteo else (1 if dp else SIN_DATO))
+            doble_blancos.append(dp['blancos'] if dp else [SIN_DATO] * BOLAS_DOBLE_JUGADA)
+            doble_especial.append(dp['powerball'] if dp else SIN_DATO)
+            actualizado.append(entrada.get('fecha_actualizacion'))
+
+        n = len(entradas)
+        return cls(
+            game_key, estados, cfg,
+            dias=_dias(fechas),
+            blancos=np.array(blancos, dtype=np.uint8).reshape(n, cfg.get('num_blancos', 5)),
+            rojos=np.array(rojos, dtype=np.uint8).reshape(n, cfg.get('num_rojas', 0)),
+            especial=np.array(especial, dtype=np.uint8),
+            multiplicador=np.array(multiplicador, dtype=np.int8),
+            jackpot=np.array(jackpot, dtype=np.int8),
+            ganador=np.array(ganador, dtype=np.int16),
+            doble=np.array(doble, dtype=np.int8),
+            doble_blancos=np.array(doble_blancos, dtype=np.uint8).reshape(n, BOLAS_DOBLE_JUGADA),
+            doble_especial=np.array(doble_especial, dtype=np.uint8),
+            actualizado=np.array(actualizado, dtype=object) if con_actualizacion else None,
+        )
+
+    @classmethod
+    def desde_json(cls, game_key, ruta=None, cfg=None, con_actualizacion=True):
+        """Tabla a partir de un historico_*.json (por defecto, el del juego)."""
+        cfg = cfg or GAMES[game_key]
+        with open(ruta or cfg['historic_file'], 'r', encoding='utf-8') as f:
+            return cls.desde_entradas(game_key, json.load(f), cfg, con_actualizacion)
+
+    @classmethod
+    def desde_store(cls, game_key, cfg=None, desde=None, hasta=None, con_actualizacion=True):
+        """Tabla a partir del histórico indexado (ver historico_store.py)."""
+        cfg = cfg or GAMES[game_key]
+        store = historico_store.obtener_store(cfg['historic_file'])
+        return cls.desde_entradas(game_key, store.entradas(desde, hasta), cfg, con_actualizacion)
+
+    # ──────────────────────────────────────────────
+    # Acceso
+    # ──────────────────────────────────────────────
+    def __len__(self):
+        return len(self.dias)
+
+    @property
+    def fechas(self):
+        return self.dias.astype('datetime64[D]')
+
+    @property
+    def nbytes(self):
+        """Bytes de los arreglos numéricos (sin el texto de `actualizado`)."""
+        return sum(getattr(self, c).nbytes for c in self.COLUMNAS if c != 'actualizado')
+
+    def __getitem__(self, filas):
+        """Subtabla con las filas indicadas (slice, índices o máscara booleana)."""
+        if isinstance(filas, (int, np.integer)):
+            filas = slice(filas, filas + 1 or None)
+        columnas = {c: getattr(self, c) for c in self.COLUMNAS}
+        return TablaSorteos(self.game_key, self.estados, self.cfg,
+                            **{c: v[filas] if v is not None else None for c, v in columnas.items()})
+
+    def entre(self, desde=None, hasta=None):
+        """Subtabla de los sorteos entre dos fechas YYYY-MM-DD (inclusive)."""
+        mascara = np.ones(len(self), dtype=bool)
+        if desde:
+            mascara &= self.dias >= _dias(desde)
+        if hasta:
+            mascara &= self.dias <= _dias(hasta)
+        return self[mascara]
+
+    # ──────────────────────────────────────────────
+    # Vuelta al formato de diccionarios
+    # ──────────────────────────────────────────────
+    def sorteo(self, i):
+        """El diccionario 'sorteo' de la fila i, con el formato de build_results."""
+        cfg = self.cfg
+        sorteo = {'fecha': str(self.fechas[i]), 'blancos': self.blancos[i].tolist()}
+        if self.rojos.shape[1]:
+            sorteo['rojos'] = self.rojos[i].tolist()
+        if cfg.get('bola_especial'):
+            sorteo[cfg['bola_especial']] = int(self.especial[i]) or None
+        if cfg.get('multiplicador'):
+            sorteo[cfg['multiplicador']] = int(self.multiplicador[i]) or None
+        if self.jackpot[i] != NO_FIGURA:
+            sorteo['jackpot_ganado'] = bool(self.jackpot[i])
+        if self.ganador[i] != NO_FIGURA:
+            sorteo['ganador_estado'] = self.estados[self.ganador[i] - 1] if self.ganador[i] else None
+        if self.doble[i] != NO_FIGURA:
+            sorteo['doble_jugada'] = {
+                'blancos': self.doble_blancos[i].tolist(),
+                'powerball': int(self.doble_especial[i]),
+            } if self.doble[i] else None
+        return sorteo
+
+    def entrada(self, i):
+        entrada = {'sorteo': self.sorteo(i)}
+        if self.actualizado is not None:
+            entrada['fecha_actualizacion'] = self.actualizado[i]
+        return entrada
+
+    def a_entradas(self):
+        """Entradas del histórico, del sorteo más reciente al más antiguo."""
+        return [self.entrada(i) for i in range(len(self) - 1, -1, -1)]
@@ -3,72 +3,52 @@
 Ejecutar con: python test_scraper.py
 """
 
+import argparse
+import asyncio
+import gzip
 import json
 import os
+import re
 import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+import requests
 
 from config import GAMES
+import api_resultados
+import backfill
+import cache_http
+import consultar
+import demonio
+import escritura
+import estadisticas
+import historico_store
+import huecos
+import limitador
+import memo_parseo
+import premios
+import lottery_async
+import lottery_scraper
+import reintentos
+import sesiones_http
+import simulador
+import verificador
+from paginas_ejemplo import HTML_LOTTO_AMERICA, HTML_POWERBALL
+from tabla_sorteos import TablaSorteos
 from lottery_scraper import (
+    Combinado,
     PowerballScraper,
     MegaMillionsScraper,
     MuslSiteScraper,
     SocrataScraper,
     crear_scraper,
+    procesar_juegos,
 )
 
-# HTML con la estructura de powerball.com / lottoamerica.com
-HTML_POWERBALL = """
-<html><body>
-<div class="col" id="numbers">
-  <h5 class="card-title">Wed, Jul 15, 2026</h5>
-  <div class="form-control col white-balls item-powerball">2</div>
-  <div class="form-control col white-balls item-powerball">7</div>
-  <div class="form-control col white-balls item-powerball">18</div>
-  <div class="form-control col white-balls item-powerball">29</div>
-  <div class="form-control col white-balls item-powerball">38</div>
-  <div class="form-control col powerball item-powerball">16</div>
-  <span class="multiplier">Power Play 2X</span>
-</div>
-<div class="col" id="winners">
-  <p>Jackpot Winners: None</p>
-</div>
-<div class="col" id="dbl-numbers">
-  <h5 class="card-title">Double Play</h5>
-  <div class="form-control col white-balls">5</div>
-  <div class="form-control col white-balls">11</div>
-  <div class="form-control col white-balls">22</div>
-  <div class="form-control col white-balls">33</div>
-  <div class="form-control col white-balls">44</div>
-  <div class="form-control col powerball">9</div>
-</div>
-<div class="col" id="next-drawing">
-  <h5 class="card-title">Sat, Jul 18, 2026</h5>
-  <span class="game-jackpot-number">$526 Million</span>
-  <div class="cash-value"><span>Cash Value:</span> <span>$233.6 Million</span></div>
-</div>
-</body></html>
-"""
-
-HTML_LOTTO_AMERICA = """
-<html><body>
-<div class="col" id="numbers">
-  <h5 class="card-title">Wed, Jul 15, 2026</h5>
-  <div class="form-control col white-balls">3</div>
-  <div class="form-control col white-balls">14</div>
-  <div class="form-control col white-balls">25</div>
-  <div class="form-control col white-balls">36</div>
-  <div class="form-control col white-balls">47</div>
-  <div class="form-control col star-ball">8</div>
-  <span class="multiplier">All Star Bonus 3X</span>
-</div>
-<div class="col" id="next-drawing">
-  <h5 class="card-title">Sat, Jul 18, 2026</h5>
-  <span class="game-jackpot-number">$3.15 Million</span>
-</div>
-</body></html>
-"""
-
 MEGAMILLIONS_API_PAYLOAD = {
     "d": json.dumps({
         "Drawing": {
@@ -139,6 +119,13 @@ class TestPowerball(unittest.TestCase):
         self.assertEqual(len(r['sorteo']['blancos']), 5)
         self.assertNotIn(44, r['sorteo']['blancos'])
 
+    def test_double_play_se_extrae_una_sola_vez(self):
+        with mock.patch.object(self.scraper, '_extraer_doble_jugada',
+                               wraps=self.scraper._extraer_doble_jugada) as extraer:
+            r = self.scraper.parse_html(HTML_POWERBALL)
+        self.assertEqual(r['sorteo']['doble_jugada']['blancos'], [5, 11, 22, 33, 44])
+        extraer.assert_called_once()
+
     def test_socrata_fallback(self):
         r = self.scraper.parse_socrata_row(SOCRATA_POWERBALL_ROW)
         self.assertTrue(r['_success'])
@@ -149,6 +136,27 @@ class TestPowerball(unittest.TestCase):
         # Próximo sorteo calculado: el sábado siguiente al miércoles
         self.assertEqual(r['proximo_sorteo']['fecha'], '2026-07-18')
 
+    def test_parseo_limitado_a_secciones(self):
+        html = HTML_POWERBALL.replace('<body>', '<body><nav>' + '<a href="#">menu</a>' * 50 + '</nav>')
+        with mock.patch.object(lottery_scraper, 'crear_soup', wraps=lottery_scraper.crear_soup) as soup:
+            r = self.scraper.parse_html(html)
+        self.assertTrue(r['_success'])
+        # Con todo dentro de las secciones alcanza con un solo árbol parcial
+        self.assertEqual(soup.call_count, 1)
+        self.assertIs(soup.call_args.kwargs['parse_only'], lottery_scraper.ESTRATO_SECCIONES)
+        parcial = lottery_scraper.crear_soup(html, parse_only=lottery_scraper.ESTRATO_SECCIONES)
+        self.assertIsNone(parcial.find('nav'))
+
+    def test_fuera_de_secciones_se_parsea_la_pagina_entera(self):
+        # Double Play sin id reconocible: se ubica por el texto "Double Play"
+        html = HTML_POWERBALL.replace('id="dbl-numbers"', 'id="otra"')
+        r = self.scraper.parse_html(html)
+        self.assertEqual(r['sorteo']['doble_jugada'], {'blancos': [5, 11, 22, 33, 44], 'powerball': 9})
+        # Multiplicador fuera de la sección del sorteo
+        html = HTML_POWERBALL.replace('<span class="multiplier">Power Play 2X</span>', '').replace(
+            '</body>', '<p>Power Play 3X</p></body>')
+        self.assertEqual(self.scraper.parse_html(html)['sorteo']['powerplay'], 3)
+
 
 class TestLottoAmerica(unittest.TestCase):
     def test_parse_html(self):
@@ -246,6 +254,8 @@ class TestGuardado(unittest.TestCase):
             self.assertTrue(scraper.save_results(r))
             # Guardar dos veces el mismo sorteo no debe duplicar el histórico
             self.assertTrue(scraper.save_results(r))
+            self.assertFalse(os.path.exists(cfg['historic_file']))
+            scraper.exportar_historico()
 
             with open(cfg['historic_file'], encoding='utf-8') as f:
                 historico = json.load(f)
@@ -257,6 +267,1248 @@ class TestGuardado(unittest.TestCase):
             self.assertEqual(actual['juego'], 'powerball')
             self.assertNotIn('_success', actual)
 
+    def test_sorteo_sin_cambios_no_reescribe(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, 'actual.json')
+            datos = {'sorteo': {'fecha': '2026-07-15', 'blancos': [2, 7]}, 'fecha_actualizacion': 'a'}
+            self.assertTrue(escritura.escribir_json(ruta, datos))
+            with mock.patch.object(escritura, 'escribir_atomico') as escribir:
+                self.assertFalse(escritura.escribir_json(ruta, dict(datos, fecha_actualizacion='b')))
+                escribir.assert_not_called()
+            datos['sorteo']['blancos'] = [2, 8]
+            self.assertTrue(escritura.escribir_json(ruta, datos))
+            with open(ruta, encoding='utf-8') as f:
+                self.assertEqual(f.read(), json.dumps(datos, indent=2, ensure_ascii=False))
+
+    def test_escritura_cortada_conserva_el_archivo_anterior(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, 'historico.json')
+            escritura.escribir_atomico(ruta, '[1, 2]')
+            with self.assertRaises(RuntimeError):
+                with escritura.abrir_atomico(ruta) as f:
+                    f.write('[1, 2, ')
+                    raise RuntimeError('corte')
+            with open(ruta, encoding='utf-8') as f:
+                self.assertEqual(f.read(), '[1, 2]')
+            self.assertEqual(os.listdir(tmp), ['historico.json'])
+
+
+class TestBackendsHtml(unittest.TestCase):
+    def test_todos_los_backends_extraen_lo_mismo(self):
+        backends = lottery_scraper.backends_disponibles()
+        self.assertIn('html.parser', backends)
+        for key, html in (('powerball', HTML_POWERBALL), ('lottoamerica', HTML_LOTTO_AMERICA)):
+            esperado = None
+            for backend in backends:
+                scraper = crear_scraper(key, GAMES[key])
+                scraper.backend_html = backend
+                r = scraper.parse_html(html)
+                r.pop('fecha_actualizacion')
+                self.assertTrue(r['_success'], msg=backend)
+                if esperado is None:
+                    esperado = r
+                self.assertEqual(r, esperado, msg=f'{key} con {backend}')
+
+    def test_backend_no_instalado_usa_automatico(self):
+        self.assertEqual(lottery_scraper.resolver_backend_html('no-existe'),
+                         lottery_scraper.backends_disponibles()[0])
+        self.assertEqual(lottery_scraper.resolver_backend_html('html.parser'), 'html.parser')
+
+
+class TestHistoricoStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archivo = os.path.join(self.tmp.name, 'historico.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def entrada(fecha):
+        return {'sorteo': {'fecha': fecha, 'blancos': [1, 2, 3, 4, 5], 'cash_ball': 1},
+                'fecha_actualizacion': 'Lunes, 1 de Enero de 2024 - 11:00 PM ET'}
+
+    def test_importa_json_existente_y_exporta_mismo_formato(self):
+        historico = [self.entrada('2026-07-17'), self.entrada('2026-07-16')]
+        with open(self.archivo, 'w', encoding='utf-8') as f:
+            json.dump(historico, f, indent=2, ensure_ascii=False)
+        with open(self.archivo, encoding='utf-8') as f:
+            original = f.read()
+
+        store = historico_store.HistoricoStore(self.archivo)
+        self.assertEqual(len(store), 2)
+        self.assertTrue(store.contiene('2026-07-16'))
+        self.assertEqual(store.ultima_fecha(), '2026-07-17')
+
+        self.assertFalse(store.agregar(self.entrada('2026-07-16')))
+        self.assertTrue(store.agregar(self.entrada('2026-07-18')))
+        store.exportar_json()
+        with open(self.archivo, encoding='utf-8') as f:
+            exportado = json.load(f)
+        self.assertEqual([e['sorteo']['fecha'] for e in exportado],
+                         ['2026-07-18', '2026-07-17', '2026-07-16'])
+
+        # Sin cambios nuevos, la exportación es idéntica a json.dump(indent=2)
+        store.exportar_json(self.archivo + '.copia')
+        with open(self.archivo + '.copia', encoding='utf-8') as f:
+            copia = f.read()
+        self.assertEqual(copia, json.dumps(exportado, indent=2, ensure_ascii=False))
+        self.assertNotEqual(copia, original)
+        store.cerrar()
+
+    def test_reimporta_json_modificado_externamente(self):
+        store = historico_store.HistoricoStore(self.archivo)
+        store.agregar(self.entrada('2026-07-16'))
+        store.exportar_json()
+
+        # Otro proceso (ej. git pull) trae un sorteo nuevo en el JSON
+        with open(self.archivo, 'w', encoding='utf-8') as f:
+            json.dump([self.entrada('2026-07-17'), self.entrada('2026-07-16')], f)
+        os.utime(self.archivo, ns=(0, os.stat(self.archivo).st_mtime_ns + 1))
+
+        self.assertEqual(store.agregar_varios([self.entrada('2026-07-18')]), 1)
+        self.assertEqual(len(store), 3)
+        store.cerrar()
+
+    def test_exportacion_pendiente_agrega_al_principio(self):
+        store = historico_store.HistoricoStore(self.archivo)
+        self.addCleanup(store.cerrar)
+        self.assertFalse(store.exportar_pendiente())
+        store.agregar_varios([self.entrada('2026-07-16'), self.entrada('2026-07-17')])
+        self.assertTrue(store.exportar_pendiente())
+        self.assertFalse(store.exportar_pendiente())
+
+        # Sorteos posteriores: se escriben delante sin regenerar el resto
+        store.agregar_varios([self.entrada('2026-07-18'), self.entrada('2026-07-19')])
+        with mock.patch.object(store, 'exportar_json') as completa:
+            self.assertTrue(store.exportar_pendiente())
+        completa.assert_not_called()
+        store.exportar_json(self.archivo + '.copia')
+        with open(self.archivo, encoding='utf-8') as f, open(self.archivo + '.copia', encoding='utf-8') as g:
+            self.assertEqual(f.read(), g.read())
+
+        # El hash anotado es el del archivo escrito: el mismo contenido no se reimporta
+        importaciones = store.importaciones
+        os.utime(self.archivo, ns=(0, os.stat(self.archivo).st_mtime_ns + 1))
+        store.sincronizar()
+        self.assertEqual(store.importaciones, importaciones)
+
+        # Un sorteo más viejo que el último exportado obliga a regenerarlo entero
+        store.agregar(self.entrada('2026-07-10'))
+        with mock.patch.object(store, 'exportar_json', wraps=store.exportar_json) as completa:
+            self.assertTrue(store.exportar_pendiente())
+        completa.assert_called_once_with()
+        with open(self.archivo, encoding='utf-8') as f:
+            self.assertEqual([e['sorteo']['fecha'] for e in json.load(f)],
+                             ['2026-07-19', '2026-07-18', '2026-07-17', '2026-07-16', '2026-07-10'])
+
+    def test_json_corregido_reemplaza_filas_y_mismo_contenido_no_reimporta(self):
+        store = historico_store.HistoricoStore(self.archivo)
+        self.addCleanup(store.cerrar)
+        store.agregar_varios([self.entrada('2026-07-16'), self.entrada('2026-07-17')])
+        store.exportar_json()
+        importaciones = store.importaciones
+
+        # Checkout nuevo: mismo contenido, otro mtime
+        os.utime(self.archivo, ns=(0, os.stat(self.archivo).st_mtime_ns + 1))
+        store.sincronizar()
+        self.assertEqual(store.importaciones, importaciones)
+
+        # Llega una corrección del 16 y el 17 se borró
+        corregido = self.entrada('2026-07-16')
+        corregido['sorteo']['blancos'] = [6, 7, 8, 9, 10]
+        with open(self.archivo, 'w', encoding='utf-8') as f:
+            json.dump([corregido], f)
+        os.utime(self.archivo, ns=(0, os.stat(self.archivo).st_mtime_ns + 2))
+        store.sincronizar()
+        self.assertEqual(store.fechas(), ['2026-07-16'])
+        self.assertEqual(store.entradas()[0]['sorteo']['blancos'], [6, 7, 8, 9, 10])
+        self.assertEqual(store.buscar({'blancos': [1]}), [])
+        self.assertEqual(store.buscar({'blancos': [6]}), ['2026-07-16'])
+
+    def test_indice_invertido_de_bolas(self):
+        store = historico_store.HistoricoStore(self.archivo)
+        self.addCleanup(store.cerrar)
+        pb = lambda fecha, blancos, especial, dp=None: {'sorteo': {
+            'fecha': fecha, 'blancos': blancos, 'powerball': especial,
+            'doble_jugada': {'blancos': dp, 'powerball': 9} if dp else None}}
+        store.agregar_varios([pb('2026-07-11', [7, 9, 23, 40, 50], 5),
+                              pb('2026-07-13', [1, 7, 23, 30, 60], 6, dp=[2, 7, 11, 12, 13]),
+                              pb('2026-07-15', [7, 8, 10, 11, 12], 5)])
+        self.assertEqual(store.buscar({'blancos': [7, 23]}), ['2026-07-13', '2026-07-11'])
+        self.assertEqual(store.buscar({'blancos': [7, 23]}, limite=1), ['2026-07-13'])
+        self.assertEqual(store.buscar({'blancos': [7], 'especial': [5]}, desde='2026-07-12'), ['2026-07-15'])
+        self.assertEqual(store.buscar({'doble_blancos': [7, 11], 'doble_especial': [9]}), ['2026-07-13'])
+        self.assertEqual(store.buscar(hasta='2026-07-12'), ['2026-07-11'])
+        self.assertEqual(store.frecuencias('especial'), {5: 2, 6: 1})
+
+        # Se actualiza con cada alta y se reconstruye si falta (base vieja)
+        store.agregar(pb('2026-07-18', [7, 23, 24, 25, 26], 1))
+        self.assertEqual(store.buscar({'blancos': [7, 23]}, limite=1), ['2026-07-18'])
+        with store._conn:
+            store._conn.execute('DELETE FROM bolas')
+            store._meta('version_indice', 0)
+        store.cerrar()
+        store = historico_store.HistoricoStore(self.archivo)
+        self.addCleanup(store.cerrar)
+        self.assertEqual(len(store.buscar({'blancos': [7]})), 4)
+        self.assertEqual([e['sorteo']['fecha'] for e in store.entradas_de(['2026-07-15', '2026-07-01', '2026-07-11'])],
+                         ['2026-07-15', '2026-07-11'])
+
+    def test_consultar_criterios(self):
+        args = argparse.Namespace(numeros=[7, 23], rojos=None, especial=5, doble=True)
+        self.assertEqual(consultar.criterios(args), {'doble_blancos': [7, 23], 'doble_especial': [5]})
+        sorteo = {'fecha': '2026-07-15', 'blancos': [3, 9], 'rojos': [1, 26]}
+        self.assertEqual(consultar.formatear(sorteo, GAMES['2by2']), '2026-07-15   3  9  | rojas  1 26')
+
+
+class RespuestaFalsa:
+    """Respuesta HTTP mínima para simular la red en los tests."""
+
+    def __init__(self, payload=None, status_code=200, content=b'', headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+    def json(self):
+        return self.payload
+
+
+class TestSincronizacionSocrata(unittest.TestCase):
+    def test_opcion_de_linea_de_comandos_anula_la_configuracion(self):
+        with mock.patch.object(lottery_scraper, 'SINCRONIZAR_SOCRATA', True):
+            self.assertTrue(lottery_scraper.parse_args([]).sincronizar)
+            self.assertFalse(lottery_scraper.parse_args(['--no-sincronizar']).sincronizar)
+        self.assertTrue(lottery_scraper.parse_args(['--sincronizar']).sincronizar)
+
+    def test_trae_solo_sorteos_nuevos_en_una_escritura(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = dict(GAMES['cash4life'])
+            cfg['results_file'] = os.path.join(tmp, 'actual.json')
+            cfg['historic_file'] = os.path.join(tmp, 'historico.json')
+            scraper = SocrataScraper('cash4life', cfg)
+            scraper.save_results(scraper.parse_socrata_row(SOCRATA_CASH4LIFE_ROW))
+
+            filas = [dict(SOCRATA_CASH4LIFE_ROW, draw_date=f'2026-07-{d}T00:00:00.000')
+                     for d in range(18, 23)]
+            paginas = [RespuestaFalsa(filas[:2]), RespuestaFalsa(filas[2:4]), RespuestaFalsa(filas[4:])]
+            with mock.patch.object(scraper, 'http_get', side_effect=paginas) as get, \
+                    mock.patch.object(scraper.historico, 'exportar_json',
+                                      wraps=scraper.historico.exportar_json) as exportar:
+                nuevos = scraper.sincronizar_socrata(tam_pagina=2)
+                self.assertEqual(exportar.call_count, 0)
+                scraper.exportar_historico()
+
+            self.assertEqual(nuevos, 5)
+            self.assertEqual(exportar.call_count, 1)
+            params = get.call_args_list[0].kwargs['params']
+            self.assertEqual(params['$where'], "draw_date > '2026-07-17T00:00:00.000'")
+            self.assertEqual([c.kwargs['params']['$offset'] for c in get.call_args_list], [0, 2, 4])
+            with open(cfg['historic_file'], encoding='utf-8') as f:
+                fechas = [e['sorteo']['fecha'] for e in json.load(f)]
+            self.assertEqual(fechas, [f'2026-07-{d}' for d in range(22, 16, -1)])
+
+
+class TestBackfill(unittest.TestCase):
+    def test_carga_paginada_y_retomable(self):
+        filas = [dict(SOCRATA_MEGAMILLIONS_ROW, draw_date=f'2026-07-{d:02d}T00:00:00.000')
+                 for d in range(1, 8)]
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = dict(GAMES['megamillions'])
+            cfg['historic_file'] = os.path.join(tmp, 'historico.json')
+            scraper = MegaMillionsScraper('megamillions', cfg)
+
+            # La segunda página falla: queda guardada solo la primera
+            with mock.patch.object(scraper, 'http_get',
+                                   side_effect=[RespuestaFalsa(filas[:3]), RuntimeError('timeout')]):
+                with self.assertRaises(RuntimeError):
+                    backfill.backfill_juego(scraper, tam_pagina=3)
+            self.assertEqual(len(scraper.historico), 3)
+            self.assertFalse(os.path.exists(cfg['historic_file']))
+
+            with mock.patch.object(scraper, 'http_get',
+                                   side_effect=[RespuestaFalsa(filas[3:6]), RespuestaFalsa(filas[6:])]) as get:
+                nuevos = backfill.backfill_juego(scraper, tam_pagina=3)
+
+            self.assertEqual(nuevos, 4)
+            params = get.call_args_list[0].kwargs['params']
+            self.assertEqual(params['$offset'], 3)
+            self.assertEqual(params['$select'], 'draw_date,winning_numbers,mega_ball,multiplier')
+            with open(cfg['historic_file'], encoding='utf-8') as f:
+                self.assertEqual(len(json.load(f)), 7)
+
+
+class TestHuecos(unittest.TestCase):
+    def test_fechas_esperadas_segun_dias_de_sorteo(self):
+        scraper = PowerballScraper('powerball', GAMES['powerball'])
+        # Lunes, miércoles y sábado
+        self.assertEqual(huecos.fechas_esperadas(scraper, '2026-07-12', '2026-07-20'),
+                         ['2026-07-13', '2026-07-15', '2026-07-18', '2026-07-20'])
+        self.assertEqual(huecos.fechas_esperadas(scraper, '2026-07-15', '2026-07-15'), ['2026-07-15'])
+
+    def test_detecta_y_rellena_en_una_consulta(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = dict(GAMES['cash4life'])
+            cfg['historic_file'] = os.path.join(tmp, 'historico.json')
+            scraper = SocrataScraper('cash4life', cfg)
+            for dia in (10, 13, 15):
+                fila = dict(SOCRATA_CASH4LIFE_ROW, draw_date=f'2026-07-{dia}T00:00:00.000')
+                scraper.historico.agregar(scraper.entrada_historico(scraper.parse_socrata_row(fila)))
+
+            faltantes = huecos.detectar_huecos(scraper, hasta='2026-07-15')
+            self.assertEqual(faltantes, ['2026-07-11', '2026-07-12', '2026-07-14'])
+
+            filas = [dict(SOCRATA_CASH4LIFE_ROW, draw_date=f'{f}T00:00:00.000') for f in faltantes]
+            with mock.patch.object(scraper, 'http_get', return_value=RespuestaFalsa(filas)) as get:
+                self.assertEqual(huecos.rellenar_huecos(scraper, faltantes), 3)
+            self.assertEqual(get.call_count, 1)
+            self.assertEqual(get.call_args.kwargs['params']['$where'],
+                             "draw_date in ('2026-07-11T00:00:00.000', '2026-07-12T00:00:00.000', "
+                             "'2026-07-14T00:00:00.000')")
+            self.assertEqual(huecos.detectar_huecos(scraper, hasta='2026-07-15'), [])
+
+
+class TestSesionesHttp(unittest.TestCase):
+    def tearDown(self):
+        sesiones_http.cerrar_sesiones()
+
+    def test_una_sesion_por_host(self):
+        a = sesiones_http.obtener_sesion('https://www.powerball.com/')
+        b = sesiones_http.obtener_sesion('https://www.powerball.com/2by2')
+        c = sesiones_http.obtener_sesion('https://data.ny.gov/resource/d6yy-54nr.json')
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        self.assertIn('gzip', a.headers['Accept-Encoding'])
+        self.assertEqual(a.get_adapter('https://www.powerball.com/')._pool_maxsize,
+                         sesiones_http.HTTP_POOL_MAXSIZE)
+
+    def test_scrapers_usan_la_sesion_compartida(self):
+        scraper = SocrataScraper('cash4life', GAMES['cash4life'])
+        sesion = sesiones_http.obtener_sesion(GAMES['cash4life']['socrata_url'])
+        with mock.patch.object(sesion, 'request',
+                               return_value=RespuestaFalsa([SOCRATA_CASH4LIFE_ROW])) as req:
+            r = scraper.scrape()
+        self.assertTrue(r['_success'])
+        self.assertEqual(r['sorteo']['cash_ball'], 3)
+        self.assertEqual(req.call_args.args[:2], ('GET', GAMES['cash4life']['socrata_url']))
+
+
+class ClienteAsyncFalso:
+    """Cliente HTTP asíncrono que responde desde un diccionario {url: respuesta}."""
+
+    def __init__(self, respuestas):
+        self.respuestas = respuestas
+        self.pedidas = []
+
+    async def get(self, url, **kwargs):
+        self.pedidas.append(url)
+        await asyncio.sleep(0)
+        r = self.respuestas.get(url)
+        if r is None:
+            return lottery_async.RespuestaAsync(404, b'', url=url)
+        if isinstance(r, (dict, list)):
+            return lottery_async.RespuestaAsync(200, json.dumps(r).encode(), url=url)
+        return lottery_async.RespuestaAsync(200, r.encode(), url=url)
+
+    async def post(self, url, **kwargs):
+        return await self.get(url, **kwargs)
+
+
+class TestMotorAsync(unittest.TestCase):
+    def test_todos_los_juegos_en_un_event_loop(self):
+        # Portada sin Double Play: debe completarse con la página dedicada
+        portada = re.sub(r'<div class="col" id="dbl-numbers">.*?</div>\s*</div>', '',
+                         HTML_POWERBALL, flags=re.S)
+        pagina_dp = HTML_POWERBALL.replace('id="numbers"', 'id="otro"').replace(
+            'id="dbl-numbers"', 'id="numbers"')
+        cliente = ClienteAsyncFalso({
+            GAMES['powerball']['url']: portada,
+            GAMES['powerball']['double_play_url']: pagina_dp,
+            GAMES['lottoamerica']['url']: HTML_LOTTO_AMERICA,
+            # La API de Mega Millions falla: se usa el respaldo de data.ny.gov
+            GAMES['megamillions']['socrata_url']: [SOCRATA_MEGAMILLIONS_ROW],
+            GAMES['cash4life']['socrata_url']: [SOCRATA_CASH4LIFE_ROW],
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            games = {}
+            for key in ('powerball', 'lottoamerica', 'megamillions', 'cash4life'):
+                cfg = dict(GAMES[key])
+                cfg['results_file'] = os.path.join(tmp, f'{key}.json')
+                cfg['historic_file'] = os.path.join(tmp, f'historico_{key}.json')
+                games[key] = cfg
+            memo = memo_parseo.MemoParseo(os.path.join(tmp, 'memo.json'))
+            with mock.patch.object(memo_parseo, 'memo', memo):
+                resumen = asyncio.run(lottery_async.procesar_juegos_async(games, cliente))
+            self.assertTrue(os.path.exists(games['cash4life']['historic_file']))
+
+        # Al memo llega el resultado ya completado con la página dedicada
+        memorizado = memo.obtener(memo_parseo.clave('powerball', portada.encode()))
+        self.assertEqual(memorizado['sorteo']['doble_jugada'], resumen['powerball']['sorteo']['doble_jugada'])
+
+        self.assertTrue(all(r['_success'] for r in resumen.values()))
+        self.assertEqual(resumen['powerball']['sorteo']['doble_jugada'],
+                         {'blancos': [5, 11, 22, 33, 44], 'powerball': 9})
+        self.assertEqual(resumen['megamillions']['sorteo']['megaball'], 7)
+        self.assertEqual(resumen['cash4life']['sorteo']['cash_ball'], 3)
+        self.assertIn(GAMES['megamillions']['api_url'], cliente.pedidas)
+
+
+class TestCacheHttp(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = cache_http.CacheHTTP(directorio=self.tmp.name, ttl=3600, max_bytes=10**6)
+        self.patch = mock.patch.object(cache_http, 'cache', self.cache)
+        self.patch.start()
+        self.scraper = MuslSiteScraper('lottoamerica', GAMES['lottoamerica'])
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def test_304_reutiliza_resultado_sin_parsear(self):
+        primera = RespuestaFalsa(content=HTML_LOTTO_AMERICA.encode(), headers={'ETag': '"v1"'})
+        with mock.patch.object(self.scraper, 'http_get', return_value=primera):
+            r1 = self.scraper.scrape()
+
+        with mock.patch.object(self.scraper, 'http_get',
+                               return_value=RespuestaFalsa(status_code=304)) as get, \
+                mock.patch.object(self.scraper, 'parse_html') as parse:
+            r2 = self.scraper.scrape()
+        parse.assert_not_called()
+        self.assertEqual(get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+        self.assertEqual(r2['sorteo'], r1['sorteo'])
+        self.assertEqual(self.cache.estadisticas['hits'], 1)
+        self.assertEqual(self.cache.estadisticas['misses'], 1)
+
+    def test_sin_validadores_no_se_guarda(self):
+        respuesta = RespuestaFalsa(content=HTML_LOTTO_AMERICA.encode())
+        with mock.patch.object(self.scraper, 'http_get', return_value=respuesta) as get:
+            self.scraper.scrape()
+            self.scraper.scrape()
+        self.assertNotIn('If-None-Match', get.call_args.kwargs['headers'])
+        self.assertEqual(self.cache.estadisticas['escrituras'], 0)
+
+    def test_desalojo_por_ttl_y_tamano(self):
+        respuesta = RespuestaFalsa(headers={'ETag': '"x"'})
+        for i in range(5):
+            self.cache.guardar(f'url{i}', respuesta, {'relleno': 'x' * 200})
+            os.utime(self.cache._ruta(f'url{i}'), (1000 + i, time.time() - 100 + i))
+        # Entrada sin uso desde hace más del TTL
+        os.utime(self.cache._ruta('url0'), (0, time.time() - 7200))
+        self.cache.max_bytes = sum(os.path.getsize(self.cache._ruta(k)) for k in ('url3', 'url4'))
+        self.cache.purgar()
+        restantes = [k for k in ('url0', 'url1', 'url2', 'url3', 'url4') if self.cache.leer(k)]
+        self.assertEqual(restantes, ['url3', 'url4'])
+
+    def test_entrada_vencida_o_de_otro_parser_no_se_usa(self):
+        respuesta = RespuestaFalsa(headers={'ETag': '"x"'})
+        self.cache.guardar('url', respuesta, {})
+        self.assertIsNotNone(self.cache.leer('url'))
+        with mock.patch.object(cache_http, 'VERSION_PARSEO', cache_http.VERSION_PARSEO + 1):
+            self.assertIsNone(self.cache.leer('url'))
+
+        # leer y purgar vencen con el mismo reloj (el último uso)
+        self.cache.guardar('url', respuesta, {})
+        os.utime(self.cache._ruta('url'), (0, time.time() - 7200))
+        self.assertIsNone(self.cache.leer('url'))
+
+
+class TestCobertura(unittest.TestCase):
+    OK = {'_success': True, 'fuente': None}
+
+    def fuente(self, nombre, demora=0.0, exito=True, error=None):
+        def correr():
+            time.sleep(demora)
+            if error:
+                raise error
+            return {'_success': exito, 'fuente': nombre}
+        return mock.Mock(side_effect=correr)
+
+    def test_principal_rapida_no_lanza_respaldo(self):
+        principal, respaldo = self.fuente('principal'), self.fuente('respaldo')
+        r = lottery_scraper.carrera_con_cobertura('X', principal, respaldo, latencia=0.5)
+        self.assertEqual(r['fuente'], 'principal')
+        respaldo.assert_not_called()
+
+    def test_principal_lenta_gana_el_respaldo(self):
+        principal = self.fuente('principal', demora=1.0)
+        respaldo = self.fuente('respaldo', demora=0.05)
+        inicio = time.monotonic()
+        r = lottery_scraper.carrera_con_cobertura('X', principal, respaldo, latencia=0.05, gracia=0.05)
+        self.assertEqual(r['fuente'], 'respaldo')
+        self.assertLess(time.monotonic() - inicio, 0.5)
+
+    def test_la_fuente_que_pierde_no_hace_mas_peticiones(self):
+        scraper = SocrataScraper('cash4life', GAMES['cash4life'])
+        peticiones = []
+
+        def principal():
+            time.sleep(0.2)
+            peticiones.append('antes')
+            scraper.http_get('https://ejemplo.invalid/')
+            peticiones.append('despues')
+
+        with mock.patch.object(lottery_scraper.sesiones_http, 'get') as get:
+            r = lottery_scraper.carrera_con_cobertura('X', principal, self.fuente('respaldo'),
+                                                      latencia=0.01, gracia=0.05)
+            self.assertEqual(r['fuente'], 'respaldo')
+            time.sleep(0.4)
+        self.assertEqual(peticiones, ['antes'])
+        get.assert_not_called()
+
+    def test_principal_dentro_de_la_gracia_gana_al_respaldo(self):
+        principal = self.fuente('principal', demora=0.1)
+        respaldo = self.fuente('respaldo', demora=0.02)
+        r = lottery_scraper.carrera_con_cobertura('X', principal, respaldo, latencia=0.01, gracia=1)
+        self.assertEqual(r['fuente'], 'principal')
+
+    def test_principal_falla_rapido_se_usa_respaldo(self):
+        principal = self.fuente('principal', error=RuntimeError('503'))
+        respaldo = self.fuente('respaldo')
+        r = lottery_scraper.carrera_con_cobertura('X', principal, respaldo, latencia=10)
+        self.assertEqual(r['fuente'], 'respaldo')
+
+    def test_ambas_fallan(self):
+        principal = self.fuente('principal', exito=False)
+        respaldo = self.fuente('respaldo', error=RuntimeError('timeout'))
+        r = lottery_scraper.carrera_con_cobertura('X', principal, respaldo, latencia=10)
+        self.assertFalse(r['_success'])
+        with self.assertRaises(RuntimeError):
+            lottery_scraper.carrera_con_cobertura(
+                'X', self.fuente('p', error=ValueError('a')), self.fuente('r', error=RuntimeError('b')))
+
+    def test_async_cancela_la_fuente_lenta(self):
+        cancelada = []
+
+        async def lenta():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelada.append(True)
+                raise
+
+        async def rapida():
+            await asyncio.sleep(0.01)
+            return {'_success': True, 'fuente': 'respaldo'}
+
+        async def correr():
+            r = await lottery_async.carrera_con_cobertura_async('X', lenta, rapida, latencia=0.01, gracia=0.01)
+            await asyncio.sleep(0)
+            return r
+
+        r = asyncio.run(correr())
+        self.assertEqual(r['fuente'], 'respaldo')
+        self.assertEqual(cancelada, [True])
+
+
+class TestReintentos(unittest.TestCase):
+    def setUp(self):
+        reintentos.reiniciar_circuitos()
+
+    def tearDown(self):
+        reintentos.reiniciar_circuitos()
+        sesiones_http.cerrar_sesiones()
+
+    def test_clasificacion_de_errores(self):
+        def http(status):
+            return requests.HTTPError(f'HTTP {status}', response=RespuestaFalsa(None, status_code=status))
+        self.assertEqual(reintentos.clasificar_error(requests.Timeout()), 'transitorio')
+        self.assertEqual(reintentos.clasificar_error(http(503)), 'transitorio')
+        self.assertEqual(reintentos.clasificar_error(http(429)), 'transitorio')
+        self.assertEqual(reintentos.clasificar_error(http(404)), 'permanente')
+        self.assertEqual(reintentos.clasificar_error(ValueError('sin bolas')), 'parseo')
+        self.assertEqual(reintentos.clasificar_error(reintentos.CircuitoAbierto('x', 10)), 'circuito')
+
+    def test_backoff_exponencial_con_tope(self):
+        politica = reintentos.PoliticaReintentos(max_intentos=6, base=10, tope=60,
+                                                 por_clase={'parseo': 2, 'permanente': 1},
+                                                 azar=lambda: 1.0)
+        self.assertEqual([politica.espera(n, 'transitorio') for n in range(1, 7)],
+                         [10, 20, 40, 60, 60, None])
+        self.assertEqual(politica.espera(1, 'parseo'), 10)
+        self.assertIsNone(politica.espera(2, 'parseo'))
+        self.assertIsNone(politica.espera(1, 'permanente'))
+
+    def test_circuito_abre_y_prueba_tras_enfriamiento(self):
+        ahora = [0.0]
+        circuito = reintentos.Circuito('x', umbral=2, enfriamiento=30, reloj=lambda: ahora[0])
+        circuito.registrar_fallo()
+        circuito.permitir()
+        self.assertTrue(circuito.registrar_fallo())
+        with self.assertRaises(reintentos.CircuitoAbierto):
+            circuito.permitir()
+        ahora[0] = 31
+        circuito.permitir()  # petición de prueba
+        with self.assertRaises(reintentos.CircuitoAbierto):
+            circuito.permitir()
+        circuito.registrar_exito()
+        circuito.permitir()
+        self.assertEqual(circuito.estado, 'cerrado')
+
+    def test_host_caido_no_se_consulta_y_se_usa_el_respaldo(self):
+        url = GAMES['powerball']['url']
+        sesion = sesiones_http.obtener_sesion(url)
+        with mock.patch.object(sesion, 'request', side_effect=requests.ConnectionError('caído')) as req:
+            for _ in range(reintentos.CIRCUITO_UMBRAL_FALLOS):
+                with self.assertRaises(requests.ConnectionError):
+                    sesiones_http.get(url)
+            with self.assertRaises(reintentos.CircuitoAbierto):
+                sesiones_http.get(url)
+        self.assertEqual(req.call_count, reintentos.CIRCUITO_UMBRAL_FALLOS)
+
+        scraper = PowerballScraper('powerball', GAMES['powerball'])
+        respaldo = {'_success': True, 'fuente': 'respaldo'}
+        with mock.patch.object(scraper, 'scrape_socrata', return_value=respaldo) as socrata:
+            self.assertEqual(scraper.scrape(), respaldo)
+        socrata.assert_called_once()
+
+    def test_prueba_interrumpida_no_deja_el_circuito_semiabierto(self):
+        url = GAMES['powerball']['url']
+        circuito = reintentos.circuito_de(sesiones_http.host_de(url))
+        circuito.estado, circuito.abierto_desde = 'abierto', -circuito.enfriamiento
+        sesion = sesiones_http.obtener_sesion(url)
+        with mock.patch.object(sesion, 'request', side_effect=requests.exceptions.ChunkedEncodingError()):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                sesiones_http.get(url)
+        self.assertEqual(circuito.estado, 'abierto')
+
+        circuito.abierto_desde = -circuito.enfriamiento
+        with mock.patch.object(sesion, 'request', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                sesiones_http.get(url)
+        with mock.patch.object(sesion, 'request', return_value=RespuestaFalsa(None)):
+            sesiones_http.get(url)  # la siguiente sale como prueba
+        self.assertEqual(circuito.estado, 'cerrado')
+
+    def test_prueba_async_cancelada_libera_el_circuito(self):
+        url = GAMES['powerball']['url']
+        circuito = reintentos.circuito_de(sesiones_http.host_de(url))
+        circuito.estado, circuito.abierto_desde = 'abierto', -circuito.enfriamiento
+
+        class SesionLenta:
+            def request(self, *args, **kwargs):
+                return self
+
+            async def __aenter__(self):
+                await asyncio.sleep(60)
+
+            async def __aexit__(self, *exc):
+                return False
+
+        async def correr():
+            cliente = lottery_async.ClienteHTTPAsync()
+            cliente._sesion = SesionLenta()
+            tarea = asyncio.ensure_future(cliente.get(url))
+            await asyncio.sleep(0)
+            tarea.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await tarea
+
+        asyncio.run(correr())
+        self.assertEqual(circuito.estado, 'abierto')
+        circuito.permitir()  # la siguiente petición vuelve a salir como prueba
+        self.assertEqual(circuito.estado, 'semiabierto')
+
+    def test_error_permanente_no_se_reintenta(self):
+        scraper = SocrataScraper('cash4life', GAMES['cash4life'])
+        error = requests.HTTPError('HTTP 404', response=RespuestaFalsa(None, status_code=404))
+        with mock.patch.object(scraper, 'scrape', side_effect=error) as scrape, \
+                mock.patch.object(lottery_scraper.time, 'sleep') as sleep:
+            r = scraper.scrape_with_retry()
+        self.assertFalse(r['_success'])
+        scrape.assert_called_once()
+        sleep.assert_not_called()
+
+
+class TestLimitador(unittest.TestCase):
+    def setUp(self):
+        limitador.reiniciar()
+
+    def tearDown(self):
+        limitador.reiniciar()
+        sesiones_http.cerrar_sesiones()
+
+    def test_cubeta_permite_rafaga_y_luego_espacia(self):
+        ahora = [0.0]
+        cubeta = limitador.CubetaTokens('x', tasa=2.0, rafaga=2, reloj=lambda: ahora[0])
+        self.assertEqual([cubeta.reservar() for _ in range(4)], [0.0, 0.0, 0.5, 1.0])
+        ahora[0] = 10.0
+        self.assertEqual(cubeta.reservar(), 0.0)
+        self.assertEqual(cubeta.estadisticas['peticiones'], 5)
+        self.assertEqual(cubeta.estadisticas['esperas'], 2)
+        self.assertAlmostEqual(cubeta.estadisticas['segundos_espera'], 1.5)
+        self.assertAlmostEqual(cubeta.estadisticas['espera_maxima'], 1.0)
+
+    def test_juegos_del_mismo_host_comparten_cubeta(self):
+        pb, la = GAMES['powerball']['url'], GAMES['lottoamerica']['url']
+        sesion = sesiones_http.obtener_sesion(pb)
+        with mock.patch.dict(limitador.LIMITES_POR_HOST, {'www.powerball.com': {'tasa': 1.0, 'rafaga': 1}}), \
+                mock.patch.object(sesion, 'request', return_value=RespuestaFalsa()), \
+                mock.patch.object(limitador.time, 'sleep') as sleep:
+            sesiones_http.get(pb)
+            sesiones_http.get(la)
+        sleep.assert_called_once()
+        self.assertAlmostEqual(sleep.call_args.args[0], 1.0, delta=0.1)
+        self.assertIn('www.powerball.com: 2 peticiones, 1 esperas', limitador.resumen())
+
+
+class TestDemonio(unittest.TestCase):
+    def et(self, texto):
+        return demonio.momento_sorteo(self.scraper, texto[:10]).replace(
+            hour=int(texto[11:13]), minute=int(texto[14:16]))
+
+    def test_sorteo_pendiente(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = dict(GAMES['powerball'], historic_file=os.path.join(tmp, 'historico.json'))
+            self.scraper = PowerballScraper('powerball', cfg)
+            # Lunes 13/07: antes del sorteo se espera el de hoy; hasta que se guarde, sigue siendo ese
+            self.assertEqual(demonio.sorteo_pendiente(self.scraper, self.et('2026-07-13 20:00')), '2026-07-13')
+            self.assertEqual(demonio.sorteo_pendiente(self.scraper, self.et('2026-07-14 10:00')), '2026-07-13')
+            self.scraper.historico.agregar({'sorteo': {'fecha': '2026-07-13'}})
+            self.assertEqual(demonio.sorteo_pendiente(self.scraper, self.et('2026-07-14 10:00')), '2026-07-15')
+            # Un sorteo sin publicar hace más de DEMONIO_ABANDONO_HORAS se deja para huecos.py
+            self.assertEqual(demonio.sorteo_pendiente(self.scraper, self.et('2026-07-18 21:00')), '2026-07-18')
+
+    def test_sondea_hasta_guardar_y_pasa_al_siguiente_sorteo(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = dict(GAMES['cash4life'], results_file=os.path.join(tmp, 'actual.json'),
+                       historic_file=os.path.join(tmp, 'historico.json'))
+            d = demonio.Demonio({'cash4life': cfg}, max_workers=1)
+            self.scraper = d.scrapers['cash4life']
+            anterior = self.scraper.parse_socrata_row(dict(SOCRATA_CASH4LIFE_ROW, draw_date='2026-07-16T00:00:00.000'))
+            nuevo = self.scraper.parse_socrata_row(SOCRATA_CASH4LIFE_ROW)
+
+            d.programar('cash4life', self.et('2026-07-17 21:00'))
+            self.assertEqual(d.objetivos['cash4life']['fecha'], '2026-07-17')
+            primer = self.et('2026-07-17 21:00').timestamp() + demonio.DEMONIO_RETRASO_PRIMER_SONDEO
+            self.assertEqual(d.agenda, [(primer, 'cash4life')])
+
+            with ThreadPoolExecutor(max_workers=1) as ejecutor, \
+                    mock.patch.object(self.scraper, 'scrape_with_retry', side_effect=[anterior, nuevo]) as scrape, \
+                    mock.patch.object(d.combinado, 'guardar') as combinado:
+                d.paso(ejecutor, self.et('2026-07-17 21:02'))  # todavía no toca
+                scrape.assert_not_called()
+                d.paso(ejecutor, self.et('2026-07-17 21:03'))
+                self.assertEqual(d.agenda[0][0], self.et('2026-07-17 21:03').timestamp()
+                                 + demonio.DEMONIO_INTERVALO_INICIAL)
+                d.paso(ejecutor, self.et('2026-07-17 21:05'))
+
+            self.assertEqual(scrape.call_count, 2)
+            combinado.assert_called_once()
+            self.assertTrue(self.scraper.historico.contiene('2026-07-17'))
+            self.assertEqual(d.objetivos['cash4life'], {'fecha': '2026-07-18', 'sondeos': 0})
+            self.assertEqual(len(d.agenda), 1)
+
+    def test_sondeo_con_error_se_reprograma(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = dict(GAMES['cash4life'], results_file=os.path.join(tmp, 'actual.json'),
+                       historic_file=os.path.join(tmp, 'historico.json'))
+            d = demonio.Demonio({'cash4life': cfg}, max_workers=1)
+            self.scraper = d.scrapers['cash4life']
+            d.programar('cash4life', self.et('2026-07-17 21:00'))
+            with ThreadPoolExecutor(max_workers=1) as ejecutor, \
+                    mock.patch.object(self.scraper, 'scrape_with_retry', side_effect=RuntimeError('boom')):
+                d.paso(ejecutor, self.et('2026-07-17 21:03'))
+            self.assertEqual(d.agenda, [(self.et('2026-07-17 21:03').timestamp()
+                                         + demonio.DEMONIO_INTERVALO_INICIAL, 'cash4life')])
+
+
+class TestJuegoAlDia(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cfg = dict(GAMES['cash4life'], results_file=os.path.join(self.tmp.name, 'actual.json'),
+                        historic_file=os.path.join(self.tmp.name, 'historico.json'))
+        self.scraper = SocrataScraper('cash4life', self.cfg)
+        self.ultimo = self.scraper.calcular_fecha_ultimo_sorteo()
+
+    def tearDown(self):
+        historico_store.cerrar_stores()
+        self.tmp.cleanup()
+
+    def guardar(self, fecha):
+        fila = dict(SOCRATA_CASH4LIFE_ROW, draw_date=f'{fecha}T00:00:00.000')
+        self.scraper.save_results(self.scraper.parse_socrata_row(fila))
+
+    def test_juego_al_dia_se_omite_sin_red(self):
+        self.guardar(self.ultimo)
+        self.assertTrue(self.scraper.esta_al_dia())
+        with mock.patch.object(sesiones_http, 'request') as req:
+            r = lottery_scraper.procesar_juego('cash4life', self.cfg)
+        req.assert_not_called()
+        self.assertTrue(r['_success'])
+        self.assertTrue(r['_omitido'])
+        self.assertEqual(r['sorteo']['fecha'], self.ultimo)
+        self.assertEqual(r['sorteo']['cash_ball'], 3)
+
+    def test_archivo_de_resultados_atrasado_o_incompleto_extrae(self):
+        anterior = self.scraper.calcular_proximo_sorteo('2026-01-01')
+        self.guardar(anterior)
+        fila = dict(SOCRATA_CASH4LIFE_ROW, draw_date=f'{self.ultimo}T00:00:00.000')
+        self.scraper.historico.agregar(self.scraper.entrada_historico(self.scraper.parse_socrata_row(fila)))
+        self.assertFalse(self.scraper.esta_al_dia())
+        with mock.patch.object(SocrataScraper, 'scrape_with_retry',
+                               return_value={'_success': False}) as scrape:
+            lottery_scraper.procesar_juego('cash4life', self.cfg)
+        scrape.assert_called_once()
+
+        powerball = PowerballScraper('powerball', GAMES['powerball'])
+        sin_doble = {'sorteo': {'fecha': self.ultimo, 'blancos': [1, 2, 3, 4, 5]}}
+        self.assertFalse(powerball.resultado_completo(sin_doble))
+        sin_doble['sorteo']['doble_jugada'] = {'blancos': [6, 7, 8, 9, 10], 'powerball': 1}
+        self.assertTrue(powerball.resultado_completo(sin_doble))
+
+    def test_forzar_o_historico_atrasado_extraen(self):
+        anterior = self.scraper.calcular_proximo_sorteo('2026-01-01')
+        self.guardar(anterior)
+        self.assertFalse(self.scraper.esta_al_dia())
+        with mock.patch.object(SocrataScraper, 'scrape_with_retry',
+                               return_value={'_success': False}) as scrape:
+            lottery_scraper.procesar_juego('cash4life', self.cfg)
+            self.guardar(self.ultimo)
+            lottery_scraper.procesar_juego('cash4life', self.cfg, forzar=True)
+        self.assertEqual(scrape.call_count, 2)
+
+
+class TestMemoParseo(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.memo = memo_parseo.MemoParseo(os.path.join(self.tmp.name, 'memo.json'), max_entradas=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_clave_ignora_scripts_y_comentarios(self):
+        clave = memo_parseo.clave('powerball', HTML_POWERBALL)
+        volatil = HTML_POWERBALL.replace('</body>', '<script>var t = 1721090000;</script><!-- 0.42s --></body>')
+        self.assertEqual(memo_parseo.clave('powerball', volatil.encode('utf-8')), clave)
+        self.assertNotEqual(memo_parseo.clave('lottoamerica', HTML_POWERBALL), clave)
+        self.assertNotEqual(memo_parseo.clave('powerball', HTML_POWERBALL.replace('>7<', '>8<')), clave)
+
+    def test_lru_y_persistencia(self):
+        self.memo.guardar('a', {'n': 1})
+        self.memo.guardar('b', {'n': 2})
+        self.memo.obtener('a')
+        self.memo.guardar('c', {'n': 3})  # desaloja 'b', la menos usada
+        self.assertIsNone(self.memo.obtener('b'))
+        self.assertEqual(self.memo.estadisticas['evicciones'], 1)
+        self.memo.persistir()
+
+        otra = memo_parseo.MemoParseo(self.memo.archivo, max_entradas=2)
+        self.assertEqual(otra.obtener('a'), {'n': 1})
+        self.assertEqual(otra.obtener('c'), {'n': 3})
+
+    def test_pagina_sin_cambios_no_se_vuelve_a_parsear(self):
+        scraper = PowerballScraper('powerball', GAMES['powerball'])
+        paginas = [RespuestaFalsa(content=HTML_POWERBALL.encode('utf-8')),
+                   RespuestaFalsa(content=(HTML_POWERBALL + '<!-- generado 22:41 -->').encode('utf-8'))]
+        with mock.patch.object(memo_parseo, 'memo', self.memo), \
+                mock.patch.object(lottery_scraper, 'CACHE_HTTP_ACTIVO', False), \
+                mock.patch.object(scraper, 'http_get', side_effect=paginas), \
+                mock.patch.object(scraper, 'parse_html', wraps=scraper.parse_html) as parse:
+            primera = scraper.scrape_sitio()
+            segunda = scraper.scrape_sitio()
+        parse.assert_called_once()
+        self.assertTrue(segunda['_success'])
+        self.assertEqual(segunda['sorteo'], primera['sorteo'])
+        self.assertEqual(self.memo.estadisticas['hits'], 1)
+
+
+class TestTablaSorteos(unittest.TestCase):
+    def entradas_powerball(self):
+        scraper = PowerballScraper('powerball', GAMES['powerball'])
+        web = scraper.entrada_historico(scraper.parse_html(HTML_POWERBALL))
+        # Del respaldo de data.ny.gov: sin jackpot_ganado ni Double Play
+        socrata = scraper.entrada_historico(scraper.parse_socrata_row(
+            {'draw_date': '2026-07-13T00:00:00.000', 'winning_numbers': '01 02 03 04 05 06', 'multiplier': '3'}))
+        sin_dp = json.loads(json.dumps(web))
+        sin_dp['sorteo'].update(fecha='2026-07-11', doble_jugada=None, jackpot_ganado=True, ganador_estado='Texas')
+        return [web, socrata, sin_dp]
+
+    def test_ida_y_vuelta_con_el_formato_de_diccionarios(self):
+        entradas = self.entradas_powerball()
+        tabla = TablaSorteos.desde_entradas('powerball', entradas)
+        self.assertEqual(tabla.blancos.dtype, np.uint8)
+        self.assertEqual(tabla.blancos.shape, (3, 5))
+        self.assertEqual(str(tabla.fechas[0]), '2026-07-11')
+        self.assertEqual(tabla.estados, ['Texas'])
+        self.assertEqual(tabla.a_entradas(), entradas)
+
+        scraper = MuslSiteScraper('2by2', GAMES['2by2'])
+        dos = [scraper.entrada_historico(scraper.build_results('2026-07-15', [3, 9], None, rojas=[1, 26]))]
+        tabla = TablaSorteos.desde_entradas('2by2', dos)
+        self.assertEqual(tabla.rojos.tolist(), [[1, 26]])
+        self.assertEqual(tabla.a_entradas(), dos)
+
+    def test_subtablas(self):
+        tabla = TablaSorteos.desde_entradas('powerball', self.entradas_powerball(), con_actualizacion=False)
+        self.assertEqual(len(tabla.entre(desde='2026-07-12')), 2)
+        self.assertEqual(tabla[-1].sorteo(0)['fecha'], '2026-07-15')
+        self.assertNotIn('fecha_actualizacion', tabla.entrada(0))
+        self.assertEqual(tabla[tabla.especial == 6].sorteo(0)['powerplay'], 3)
+
+
+class TestEstadisticas(unittest.TestCase):
+    @staticmethod
+    def entrada(fecha, blancos, especial):
+        return {'sorteo': {'fecha': fecha, 'blancos': blancos, 'cash_ball': especial}}
+
+    def entradas(self, n=30, semilla=7):
+        azar = np.random.default_rng(semilla)
+        return [self.entrada(f'2026-06-{dia:02d}', sorted(azar.choice(np.arange(1, 61), 5, replace=False).tolist()),
+                             int(azar.integers(1, 5)))
+                for dia in range(1, n + 1)]
+
+    def assertMismosContadores(self, a, b):
+        for nombre in a.grupos:
+            for campo in ('frecuencia', 'ultimo', 'pares', 'trios', 'en_ventana'):
+                x, y = getattr(a.grupos[nombre], campo), getattr(b.grupos[nombre], campo)
+                if x is None:
+                    self.assertIsNone(y)
+                else:
+                    np.testing.assert_array_equal(x, y, err_msg=f'{nombre}.{campo}')
+
+    def test_incremental_igual_que_calcular_todo(self):
+        entradas = self.entradas()
+        completo = estadisticas.EstadisticasJuego.desde_tabla(
+            TablaSorteos.desde_entradas('cash4life', entradas), ventana=10)
+        incremental = estadisticas.EstadisticasJuego.desde_tabla(
+            TablaSorteos.desde_entradas('cash4life', entradas[:12]), ventana=10)
+        incremental.agregar_entradas(entradas[:11:-1])  # llegan en cualquier orden
+        self.assertMismosContadores(completo, incremental)
+        self.assertFalse(incremental.desactualizado)
+
+        blancos = completo.grupos['blancos']
+        self.assertEqual(blancos.frecuencia.sum(), 5 * 30)
+        self.assertEqual(blancos.en_ventana.sum(), 5 * 10)
+        self.assertEqual(blancos.trios.sum(), 10 * 30)
+        ultimo = entradas[-1]['sorteo']['blancos'][0]
+        self.assertEqual(blancos.ausencia()[ultimo], 0)
+
+        # Un sorteo anterior al último contado obliga a recalcular
+        incremental.agregar(entradas[0]['sorteo'])
+        self.assertTrue(incremental.desactualizado)
+
+    def test_historico_vacio(self):
+        vacio = estadisticas.EstadisticasJuego.desde_tabla(TablaSorteos.desde_entradas('cash4life', []))
+        self.assertEqual(vacio.resumen(3)['sorteos'], 0)
+        self.assertEqual(vacio.grupos['blancos'].frecuencia.sum(), 0)
+        entrada = self.entradas(1)[0]
+        vacio.agregar(entrada['sorteo'])
+        self.assertEqual(vacio.grupos['blancos'].ausencia()[entrada['sorteo']['blancos'][0]], 0)
+
+    def test_juego_con_bolas_rojas(self):
+        scraper = MuslSiteScraper('2by2', GAMES['2by2'])
+        dos = [scraper.entrada_historico(scraper.build_results('2026-07-15', [3, 9], None, rojas=[1, 26])),
+               scraper.entrada_historico(scraper.build_results('2026-07-16', [3, 12], None, rojas=[1, 2]))]
+        resumen = estadisticas.EstadisticasJuego.desde_tabla(TablaSorteos.desde_entradas('2by2', dos)).resumen(3)
+        self.assertEqual(set(resumen['grupos']), {'blancos', 'rojos'})
+        self.assertEqual(resumen['grupos']['blancos']['mas_frecuentes'][0], (3, 2))
+        self.assertEqual(resumen['grupos']['rojos']['pares'][0], ((1, 2), 1))
+        self.assertEqual(resumen['grupos']['rojos']['trios'], [])
+
+    def test_se_pone_al_dia_con_el_historico(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = dict(GAMES['cash4life'], historic_file=os.path.join(tmp, 'historico.json'))
+            entradas = self.entradas(5)
+            with open(cfg['historic_file'], 'w', encoding='utf-8') as f:
+                json.dump(entradas[:4][::-1], f)
+            with mock.patch.dict(GAMES, {'cash4life': cfg}), mock.patch.dict(estadisticas._estadisticas, clear=True):
+                try:
+                    antes = estadisticas.de_juego('cash4life')
+                    self.assertEqual(antes.n_sorteos, 4)
+                    historico_store.obtener_store(cfg['historic_file']).agregar(entradas[4])
+                    self.assertIs(estadisticas.de_juego('cash4life'), antes)
+                    self.assertEqual(antes.n_sorteos, 5)
+                    self.assertEqual(antes.ultima_fecha, entradas[4]['sorteo']['fecha'])
+
+                    # El JSON cambió por fuera (se borró un sorteo): se recalcula
+                    with open(cfg['historic_file'], 'w', encoding='utf-8') as f:
+                        json.dump(entradas[:3][::-1], f)
+                    os.utime(cfg['historic_file'], ns=(0, os.stat(cfg['historic_file']).st_mtime_ns + 1))
+                    despues = estadisticas.de_juego('cash4life')
+                    self.assertIsNot(despues, antes)
+                    self.assertEqual(despues.n_sorteos, 3)
+                finally:
+                    historico_store.cerrar_stores()
+
+
+class TestVerificador(unittest.TestCase):
+    def test_aciertos_por_bits_igual_que_por_conjuntos(self):
+        azar = np.random.default_rng(3)
+        boletos = np.array([azar.choice(np.arange(1, 71), 5, replace=False) for _ in range(50)])
+        sorteos = np.array([azar.choice(np.arange(1, 71), 5, replace=False) for _ in range(40)])
+        sorteos[0] = boletos[0]  # las bolas 64-70 caen en la segunda palabra
+        palabras = verificador.palabras_para(70)
+        cuenta = verificador.aciertos(verificador.mascaras(boletos, palabras),
+                                      verificador.mascaras(sorteos, palabras))
+        esperado = [[len(set(b) & set(s)) for s in sorteos] for b in boletos]
+        self.assertEqual(cuenta.tolist(), esperado)
+        self.assertEqual(cuenta[0, 0], 5)
+
+    def test_coincidencias_con_especial_y_doble_jugada(self):
+        scraper = PowerballScraper('powerball', GAMES['powerball'])
+        # [2, 7, 18, 29, 38] + 16, Double Play [5, 11, 22, 33, 44] + 9
+        tabla = TablaSorteos.desde_entradas('powerball', [scraper.entrada_historico(scraper.parse_html(HTML_POWERBALL))])
+        sorteos = verificador.SorteosCodificados(tabla)
+        lineas = ['# boletos de prueba', '2 7 18 40 50 + 16', '5 11 22 1 3 9', '1 2 3 4', '2 7 18 29 60 + 1', '2 7 18 29 70 + 1', '']
+        conteo = {}
+        bloques = verificador.leer_boletos(lineas, GAMES['powerball'], bloque=1, conteo=conteo)
+        filas = list(verificador.coincidencias(bloques, sorteos, minimo=4))
+        self.assertEqual(filas, [(2, '2026-07-15', 3, 0, 1, 0), (3, '2026-07-15', 3, 0, 1, 1),
+                                 (5, '2026-07-15', 4, 0, 0, 0)])
+        self.assertEqual(conteo['boletos'], 3)
+        self.assertEqual([n for n, _ in conteo['invalidos']], [4, 6])
+        self.assertEqual(verificador.columnas(sorteos), ['boleto', 'fecha', 'blancas', 'powerball', 'doble_jugada'])
+
+    def test_premios_por_boleto(self):
+        scraper = PowerballScraper('powerball', GAMES['powerball'])
+        tabla = TablaSorteos.desde_entradas('powerball', [scraper.entrada_historico(scraper.parse_html(HTML_POWERBALL))])
+        bloques = verificador.leer_boletos(['2 7 18 40 50 + 16', '5 11 22 1 3 9', '1 3 4 6 8 + 10'],
+                                           GAMES['powerball'])
+        filas = list(verificador.coincidencias(bloques, verificador.SorteosCodificados(tabla),
+                                               premios=premios.de_juego('powerball')))
+        # 3+1 con Power Play 2x = $200; en la Double Play 3+1 = $500 (sin multiplicador)
+        self.assertEqual(filas, [(1, '2026-07-15', 3, 0, 1, 0, 200), (2, '2026-07-15', 3, 0, 1, 1, 500)])
+
+        # Boletos sin la Double Play: solo el sorteo principal, sin la columna
+        sin_doble = verificador.SorteosCodificados(tabla, con_doble_jugada=False)
+        bloques = verificador.leer_boletos(['2 7 18 40 50 + 16', '5 11 22 1 3 9'], GAMES['powerball'])
+        filas = list(verificador.coincidencias(bloques, sin_doble, premios=premios.de_juego('powerball')))
+        self.assertEqual(filas, [(1, '2026-07-15', 3, 0, 1, 0, 200)])
+        self.assertNotIn('doble_jugada', verificador.columnas(sin_doble, con_premio=True))
+
+
+class TestPremios(unittest.TestCase):
+    def test_niveles_y_multiplicadores(self):
+        powerball = premios.de_juego('powerball').principal
+        nivel, premio = powerball.evaluar([5, 5, 5, 4, 0, 2], [1, 0, 0, 1, 1, 0], [3, 1, 3, 10, 2, 5])
+        self.assertEqual(premio.tolist(), [0, 1_000_000, 2_000_000, 500_000, 8, 0])
+        self.assertEqual(powerball.descripcion(nivel[0]), 'Jackpot')
+        self.assertEqual(powerball.descripcion(nivel[3]), '4+1')
+        self.assertEqual(nivel[-1], premios.SIN_PREMIO)
+
+        cash4life = premios.de_juego('cash4life').principal
+        nivel, premio = cash4life.evaluar(5, 0)
+        self.assertEqual((cash4life.descripcion(nivel), int(premio)), ('$1,000 a la semana de por vida', 0))
+
+    def test_multiplicador_por_sorteo(self):
+        scraper = MuslSiteScraper('2by2', GAMES['2by2'])
+        dos = TablaSorteos.desde_entradas('2by2', [
+            scraper.entrada_historico(scraper.build_results(fecha, [3, 9], None, rojas=[1, 26]))
+            for fecha in ('2026-07-13', '2026-07-14')])   # lunes y martes
+        juego = premios.de_juego('2by2')
+        factores = juego.multiplicadores(dos)
+        self.assertEqual(factores.tolist(), [1, 2])
+        self.assertEqual(juego.principal.evaluar(2, 1, factores)[1].tolist(), [100, 200])
+
+        megamillions = premios.de_juego('megamillions')
+        tabla = TablaSorteos.desde_entradas('megamillions', [
+            {'sorteo': {'fecha': '2026-07-14', 'blancos': [1, 2, 3, 4, 5], 'megaball': 6, 'megaplier': 3}},
+            {'sorteo': {'fecha': '2024-07-16', 'blancos': [1, 2, 3, 4, 5], 'megaball': 6, 'megaplier': -1}},
+            {'sorteo': {'fecha': '2024-07-19', 'blancos': [1, 2, 3, 4, 5], 'megaball': 6, 'megaplier': 4}}])
+        # Desde abril de 2025 el megaplier va incluido: se aplica aunque el
+        # boleto no "lo compre"; antes era opcional
+        self.assertEqual(megamillions.multiplicadores(tabla, con_multiplicador=False).tolist(), [1, 1, 3])
+        self.assertEqual(megamillions.multiplicadores(tabla).tolist(), [1, 4, 3])
+        self.assertEqual(premios.de_juego('powerball').multiplicadores(
+            TablaSorteos.desde_entradas('powerball', []), con_multiplicador=False).tolist(), [])
+
+
+class TestSimulador(unittest.TestCase):
+    def test_bolas_distintas_y_probabilidades(self):
+        bolas = simulador.bolas_distintas(np.random.default_rng(1), 20_000, 5, 6)
+        self.assertEqual(bolas.shape, (5, 20_000))
+        self.assertTrue((np.sort(bolas, axis=0)[1:] != np.sort(bolas, axis=0)[:-1]).all())
+        self.assertEqual((bolas.min(), bolas.max()), (1, 6))
+        self.assertAlmostEqual(1 / simulador.probabilidad_exacta(GAMES['powerball'], (5, 1)), 292_201_338, places=0)
+        self.assertAlmostEqual(1 / simulador.probabilidad_exacta(GAMES['2by2'], (2, 2)), 105_625, places=0)
+
+    def test_reproducible_con_cualquier_cantidad_de_procesos(self):
+        uno = simulador.simular('2by2', 200_000, semilla=11, workers=1, bloque=30_000, por_tarea=50_000)
+        varios = simulador.simular('2by2', 200_000, semilla=11, workers=2, bloque=30_000, por_tarea=50_000)
+        self.assertEqual([n['veces'] for n in uno['niveles']], [n['veces'] for n in varios['niveles']])
+        self.assertEqual(uno['premios_fijos'], varios['premios_fijos'])
+        # 1 de 4 paga en 1 de cada 8 boletos; la simulación se acerca a lo exacto
+        for nivel in uno['niveles'][-2:]:
+            self.assertAlmostEqual(nivel['frecuencia'], nivel['probabilidad'], delta=0.005)
+        self.assertEqual(uno['precio'], 1)
+
+    def test_monto_por_nivel_respeta_topes_del_multiplicador(self):
+        resumen = simulador.simular('powerball', 1_000, semilla=3, workers=1, multiplicador=5)
+        montos = {n['nivel']: n['monto'] for n in resumen['niveles']}
+        self.assertEqual((montos['5+1'], montos['5+0'], montos['4+1']), (None, 2_000_000, 250_000))
+
+    def test_mega_millions_sortea_el_multiplicador_incluido(self):
+        resumen = simulador.simular('megamillions', 200_000, semilla=5, workers=1)
+        self.assertEqual(resumen['multiplicador'], {2: 15, 3: 10, 4: 4, 5: 2, 10: 1})
+        # En promedio 3x: 5+0 paga $1M × 3
+        self.assertEqual(resumen['niveles'][1]['monto'], 3_000_000)
+        fijo = simulador.simular('megamillions', 200_000, semilla=5, workers=1, multiplicador=2)
+        self.assertGreater(resumen['premios_fijos'], fijo['premios_fijos'])
+
+
+class TestApiResultados(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        ruta = lambda nombre: os.path.join(self.tmp.name, nombre)
+        self.games = {'cash4life': dict(GAMES['cash4life'], results_file=ruta('resultados.json'),
+                                        historic_file=ruta('historico.json'))}
+        self.historico = [TestHistoricoStore.entrada(f'2026-07-{d:02d}') for d in range(30, 0, -1)]
+        escritura.escribir_json(self.games['cash4life']['historic_file'], self.historico)
+        escritura.escribir_json(self.games['cash4life']['results_file'], {'juego': 'cash4life'})
+        self.api = api_resultados.ApiResultados(self.games, combined_file=ruta('todos.json'))
+
+    def pedir(self, ruta, **cabeceras):
+        crudo = self.api.cabeceras_y_cuerpo('GET', ruta, {k.replace('_', '-'): v for k, v in cabeceras.items()})
+        cabecera, _, cuerpo = crudo.partition(b'\r\n\r\n')
+        lineas = cabecera.decode('latin-1').split('\r\n')
+        return int(lineas[0].split()[1]), dict(l.split(': ', 1) for l in lineas[1:]), cuerpo
+
+    def test_paginas_etag_gzip_y_recarga(self):
+        status, cabeceras, cuerpo = self.pedir('/historico/cash4life?por_pagina=20&pagina=2')
+        pagina = json.loads(cuerpo)
+        self.assertEqual((status, pagina['total'], pagina['paginas']), (200, 30, 2))
+        self.assertEqual([e['sorteo']['fecha'] for e in pagina['sorteos']][0], '2026-07-10')
+
+        status, cabeceras, cuerpo = self.pedir('/historico/cash4life?por_pagina=20', accept_encoding='gzip')
+        self.assertEqual(cabeceras['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(cuerpo))['sorteos']), 20)
+        status, _, cuerpo = self.pedir('/historico/cash4life?por_pagina=20', accept_encoding='gzip',
+                                       if_none_match=cabeceras['ETag'])
+        self.assertEqual((status, cuerpo), (304, b''))
+        armadas = self.api.estadisticas['armadas']
+        self.pedir('/historico/cash4life?por_pagina=20')
+        self.assertEqual(self.api.estadisticas['armadas'], armadas)   # servida desde la caché
+
+        self.assertEqual(self.pedir('/historico/cash4life/2026-07-02')[0], 200)
+        self.assertEqual(self.pedir('/historico/cash4life/2026-08-01')[0], 404)
+        self.assertEqual(self.pedir('/historico/powerball')[0], 404)
+        self.assertEqual(self.pedir('/historico/cash4life?pagina=x')[0], 400)
+        self.assertEqual(self.pedir('/resultados')[0], 503)   # el combinado todavía no existe
+
+        # El scraper reescribe el histórico: se recarga y cambia el ETag
+        escritura.escribir_json(self.games['cash4life']['historic_file'],
+                                [TestHistoricoStore.entrada('2026-08-01')] + self.historico)
+        os.utime(self.games['cash4life']['historic_file'], ns=(0, time.time_ns() + 10 ** 9))
+        self.assertEqual(self.api.refrescar(), {'historico:cash4life'})
+        status, nuevas, _ = self.pedir('/historico/cash4life?por_pagina=20', accept_encoding='gzip',
+                                       if_none_match=cabeceras['ETag'])
+        self.assertEqual(status, 200)
+        self.assertNotEqual(nuevas['ETag'], cabeceras['ETag'])
+        self.assertEqual(self.pedir('/historico/cash4life/2026-08-01')[0], 200)
+
+    def test_archivo_invalido_conserva_lo_anterior(self):
+        ruta = self.games['cash4life']['historic_file']
+        for contenido in ('[{"sin_sorteo": 1}]', '{"cortado": '):
+            with open(ruta, 'w', encoding='utf-8') as f:
+                f.write(contenido)
+            os.utime(ruta, ns=(0, time.time_ns() + 10 ** 9))
+            self.assertEqual(asyncio.run(self.api.refrescar_async()), set())
+            self.assertEqual(self.pedir('/historico/cash4life/2026-07-02')[0], 200)
+
+        escritura.escribir_json(ruta, [TestHistoricoStore.entrada('2026-08-01')])
+        os.utime(ruta, ns=(0, time.time_ns() + 2 * 10 ** 9))
+        self.assertEqual(asyncio.run(self.api.refrescar_async()), {'historico:cash4life'})
+        self.assertEqual(self.pedir('/historico/cash4life/2026-07-02')[0], 404)
+
+    def test_conexion_keep_alive(self):
+        async def dos_peticiones():
+            servidor = await asyncio.start_server(self.api.atender, '127.0.0.1', 0)
+            puerto = servidor.sockets[0].getsockname()[1]
+            async with servidor:
+                reader, writer = await asyncio.open_connection('127.0.0.1', puerto)
+                writer.write(b'GET /resultados/cash4life HTTP/1.1\r\nHost: x\r\n\r\n'
+                             b'HEAD /salud HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n')
+                respuesta = await reader.read()
+                writer.close()
+                return respuesta
+
+        respuesta = asyncio.run(dos_peticiones())
+        self.assertEqual(respuesta.count(b'HTTP/1.1 200 OK'), 2)
+        self.assertIn(b'"juego": "cash4life"', respuesta)   # el archivo tal cual
+        self.assertTrue(respuesta.endswith(b'\r\n\r\n'))   # HEAD sin cuerpo
+
+
+class TestConcurrencia(unittest.TestCase):
+    def test_juegos_en_paralelo_conservan_orden(self):
+        def lento(game_key, cfg, **kwargs):
+            time.sleep(0.2)
+            return {'juego': game_key, '_success': True}
+
+        with mock.patch.object(lottery_scraper, 'procesar_juego', side_effect=lento):
+            inicio = time.monotonic()
+            resumen = procesar_juegos(GAMES, concurrente=True, max_workers=len(GAMES))
+            duracion = time.monotonic() - inicio
+
+        self.assertEqual(list(resumen), list(GAMES))
+        # El tiempo total se parece al de un solo juego, no a la suma
+        self.assertLess(duracion, 0.2 * len(GAMES) / 2)
+
+    def test_error_inesperado_no_afecta_a_otros_juegos(self):
+        def falla_powerball(game_key, cfg, **kwargs):
+            if game_key == 'powerball':
+                raise RuntimeError('boom')
+            return {'juego': game_key, '_success': True}
+
+        with mock.patch.object(lottery_scraper, 'procesar_juego', side_effect=falla_powerball):
+            resumen = procesar_juegos(GAMES, concurrente=True)
+
+        self.assertFalse(resumen['powerball']['_success'])
+        self.assertIn('boom', resumen['powerball']['error'])
+        self.assertTrue(resumen['megamillions']['_success'])
+
+    def test_al_terminar_se_llama_por_cada_juego(self):
+        def rapido(game_key, cfg, **kwargs):
+            time.sleep(0.1 if game_key == 'powerball' else 0)
+            return {'juego': game_key, '_success': True}
+
+        for concurrente in (True, False):
+            terminados = []
+            with mock.patch.object(lottery_scraper, 'procesar_juego', side_effect=rapido):
+                procesar_juegos(GAMES, concurrente=concurrente,
+                                al_terminar=lambda game_key, results: terminados.append(game_key))
+            self.assertEqual(sorted(terminados), sorted(GAMES))
+            if concurrente:
+                # Powerball es el más lento: no retiene la publicación de los demás
+                self.assertEqual(terminados[-1], 'powerball')
+
+
+class TestCombinado(unittest.TestCase):
+    def resultado(self, game_key, fecha, actualizado):
+        return {'juego': game_key, 'nombre': GAMES[game_key]['nombre'], '_success': True,
+                'sorteo': {'fecha': fecha}, 'proximo_sorteo': {'fecha': None},
+                'fecha_actualizacion': actualizado}
+
+    def test_se_arma_en_memoria_y_conserva_los_fallidos(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archivo = os.path.join(tmp, 'todos.json')
+            anterior = Combinado(GAMES, archivo)
+            anterior.agregar('powerball', self.resultado('powerball', '2026-07-13', 'ayer'))
+            anterior.agregar('cash4life', self.resultado('cash4life', '2026-07-14', 'ayer'))
+            anterior.guardar()
+
+            combinado = Combinado(GAMES, archivo)
+            combinado.agregar('cash4life', self.resultado('cash4life', '2026-07-15', 'hoy'))
+            combinado.agregar('powerball', {'juego': 'powerball', '_success': False, 'error': 'timeout'})
+            with mock.patch('builtins.open', wraps=open) as abrir:
+                self.assertTrue(combinado.guardar())
+            # Solo se lee el propio combinado (para comparar), no los archivos de cada juego
+            self.assertEqual({c.args[0] for c in abrir.call_args_list}, {archivo})
+
+            with open(archivo, encoding='utf-8') as f:
+                datos = json.load(f)
+        self.assertEqual(list(datos['juegos']), ['powerball', 'cash4life'])
+        self.assertEqual(datos['juegos']['powerball']['sorteo']['fecha'], '2026-07-13')
+        self.assertEqual(datos['juegos']['cash4life']['sorteo']['fecha'], '2026-07-15')
+        self.assertNotIn('_success', datos['juegos']['cash4life'])
+        self.assertEqual(datos['fecha_actualizacion'], 'ayer')
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,300 @@
+"""Verificación masiva de boletos contra todo el histórico de un juego.
+
+Cada boleto y cada sorteo se codifican como un conjunto de bits sobre el rango
+de bolas del juego (bit n = salió la bola n), en palabras uint64: las blancas
+de Powerball (1-69) ocupan dos palabras por sorteo. Los aciertos de un bloque
+de boletos contra todos los sorteos son entonces un AND y un conteo de bits
+(np.bitwise_count) sobre matrices (boletos × sorteos), sin bucles en Python.
+
+La bola especial se compara por igualdad, las rojas de 2by2 tienen su propio
+conjunto de bits y la Double Play de Powerball se verifica como un sorteo
+aparte (columna doble_jugada = 1).
+
+Los boletos se leen de a bloques (VERIFICADOR_BLOQUE) y las coincidencias con
+al menos VERIFICADOR_MINIMO_ACIERTOS aciertos se escriben en CSV a medida que
+se encuentran, así la memoria no crece con la cantidad de boletos.
+
+Formato de boletos: uno por línea, primero las blancas, después las rojas
+(2by2) y al final la bola especial, separados por cualquier cosa que no sea un
+dígito ("5 12 33 41 60 + 7", "5,12,33,41,60,7"). Las líneas vacías o que
+empiezan con # se ignoran.
+
+Uso:
+    python verificador.py powerball boletos.txt > coincidencias.csv
+    python verificador.py 2by2 boletos.txt --minimo 2 --desde 2026-01-01
+"""
+
+import argparse
+import csv
+import logging
+import re
+import sys
+import time
+
+import numpy as np
+
+from config import GAMES, VERIFICADOR_BLOQUE, VERIFICADOR_MINIMO_ACIERTOS
+import historico_store
+import premios as premios_juego
+from tabla_sorteos import SIN_DATO, TablaSorteos
+
+BITS_POR_PALABRA = 64
+RE_NUMERO = re.compile(r'\d+')
+
+
+def palabras_para(maximo):
+    """Palabras uint64 necesarias para los bits 0..maximo."""
+    return maximo // BITS_POR_PALABRA + 1
+
+
+def mascaras(matriz, palabras):
+    """Conjuntos de bits (filas × palabras, uint64) de una matriz de bolas.
+
+    Las celdas SIN_DATO (0) no marcan ningún bit."""
+    matriz = np.asarray(matriz, dtype=np.int64)
+    resultado = np.zeros((len(matriz), palabras), dtype=np.uint64)
+    filas = np.arange(len(matriz))
+    for columna in matriz.T:
+        bits = np.left_shift(np.uint64(1), (columna % BITS_POR_PALABRA).astype(np.uint64))
+        resultado[filas, columna // BITS_POR_PALABRA] |= np.where(columna != SIN_DATO, bits, np.uint64(0))
+    return resultado
+
+
+def aciertos(boletos, sorteos):
+    """Bolas en común entre cada boleto y cada sorteo (boletos × sorteos, uint8)."""
+    cuenta = np.zeros((len(boletos), len(sorteos)), dtype=np.uint8)
+    for palabra in range(boletos.shape[1]):
+        cuenta += np.bitwise_count(boletos[:, palabra, None] & sorteos[None, :, palabra])
+    return cuenta
+
+
+class SorteosCodificados:
+    """Los sorteos de una TablaSorteos, listos para comparar.
+
+    Con con_doble_jugada=False (boletos que no compraron la Double Play) se
+    dejan afuera los números de la Double Play."""
+
+    def __init__(self, tabla, con_doble_jugada=True):
+        cfg = tabla.cfg
+        self.tabla = tabla
+        self.game_key = tabla.game_key
+        self.cfg = cfg
+        self.fechas = tabla.fechas.astype(str).tolist()
+        self.max_blancos = max(cfg['max_blancos'], int(tabla.blancos.max(initial=0)),
+                               int(tabla.doble_blancos.max(initial=0)))
+        self.max_rojos = max(cfg.get('max_rojos', 0), int(tabla.rojos.max(initial=0)))
+        self.palabras_blancos = palabras_para(self.max_blancos)
+        self.palabras_rojos = palabras_para(self.max_rojos)
+
+        self.blancos = mascaras(tabla.blancos, self.palabras_blancos)
+        self.rojos = mascaras(tabla.rojos, self.palabras_rojos) if tabla.rojos.shape[1] else None
+        self.especial = tabla.especial if cfg.get('bola_especial') else None
+
+        # Double Play: solo las filas que la tienen, como otra tabla de sorteos
+        self.filas_doble = (np.flatnonzero(tabla.doble == 1) if con_doble_jugada
+                            else np.zeros(0, dtype=np.intp))
+        self.doble_blancos = mascaras(tabla.doble_blancos[self.filas_doble], self.palabras_blancos)
+        self.doble_especial = tabla.doble_especial[self.filas_doble]
+
+    def __len__(self):
+        return len(self.fechas)
+
+    @property
+    def con_doble_jugada(self):
+        return len(self.filas_doble) > 0
+
+
+class Boletos:
+    """Un bloque de boletos: números de línea y bolas en matrices."""
+
+    def __init__(self, lineas, blancos, rojos, especial):
+        self.lineas = np.asarray(lineas, dtype=np.int64)
+        self.blancos = np.asarray(blancos, dtype=np.uint8)
+        self.rojos = np.asarray(rojos, dtype=np.uint8)
+        self.especial = np.asarray(especial, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.lineas)
+
+
+def parsear_boleto(linea, cfg):
+    """(blancos, rojos, especial) de una línea, o ValueError si no es válida."""
+    numeros = [int(n) for n in RE_NUMERO.findall(linea)]
+    n_blancos, n_rojos = cfg.get('num_blancos', 5), cfg.get('num_rojas', 0)
+    con_especial = bool(cfg.get('bola_especial'))
+    esperados = n_blancos + n_rojos + con_especial
+    if len(numeros) != esperados:
+        raise ValueError(f'se esperaban {esperados} números y hay {len(numeros)}')
+    blancos, rojos = numeros[:n_blancos], numeros[n_blancos:n_blancos + n_rojos]
+    especial = numeros[-1] if con_especial else SIN_DATO
+    for nombre, bolas, maximo in (('blancas', blancos, cfg['max_blancos']),
+                                  ('rojas', rojos, cfg.get('max_rojos', 0))):
+        if len(set(bolas)) != len(bolas):
+            raise ValueError(f'bolas {nombre} repetidas')
+        if any(not 1 <= b <= maximo for b in bolas):
+            raise ValueError(f'bolas {nombre} fuera de rango (1-{maximo})')
+    if con_especial and not 1 <= especial <= cfg['max_especial']:
+        raise ValueError(f"{cfg['bola_especial']} fuera de rango (1-{cfg['max_especial']})")
+    return blancos, rojos, especial
+
+
+def leer_boletos(lineas, cfg, bloque=VERIFICADOR_BLOQUE, conteo=None):
+    """Genera bloques de Boletos a partir de un iterable de líneas.
+
+    Las líneas inválidas se registran y se saltean. Si se pasa `conteo`
+    (dict), se acumulan ahí los boletos leídos ('boletos') y las líneas
+    inválidas ('invalidos': [(número de línea, motivo)])."""
+    conteo = conteo if conteo is not None else {}
+    conteo.setdefault('boletos', 0)
+    conteo.setdefault('invalidos', [])
+    actual = ([], [], [], [])
+    for numero, linea in enumerate(lineas, 1):
+        linea = linea.strip()
+        if not linea or linea.startswith('#'):
+            continue
+        try:
+            blancos, rojos, especial = parsear_boleto(linea, cfg)
+        except ValueError as e:
+            logging.warning(f"Línea {numero}: boleto inválido ({e}): {linea!r}")
+            conteo['invalidos'].append((numero, str(e)))
+            continue
+        for columna, valor in zip(actual, (numero, blancos, rojos, especial)):
+            columna.append(valor)
+        conteo['boletos'] += 1
+        if len(actual[0]) >= bloque:
+            yield Boletos(*actual)
+            actual = ([], [], [], [])
+    if actual[0]:
+        yield Boletos(*actual)
+
+
+def coincidencias(bloques, sorteos, minimo=VERIFICADOR_MINIMO_ACIERTOS, premios=None, con_multiplicador=True):
+    """Genera (línea, fecha, blancas, rojas, especial, doble_jugada) por cada
+    boleto y sorteo con al menos `minimo` aciertos en total, bloque a bloque.
+
+    `especial` y `doble_jugada` son 0/1; en la fila de Double Play los
+    aciertos son contra los números de la Double Play.
+
+    Con `premios` (un premios.PremiosJuego) se listan en cambio los boletos
+    premiados, sin importar `minimo`, y cada fila suma el premio: el monto en
+    dólares o la descripción de un premio no fijo ('Jackpot')."""
+    if premios is not None:
+        multiplicadores = premios.multiplicadores(sorteos.tabla, con_multiplicador)[None, :]
+    for boletos in bloques:
+        blancos = mascaras(boletos.blancos, sorteos.palabras_blancos)
+        total_blancos = aciertos(blancos, sorteos.blancos)
+        total_rojos = (aciertos(mascaras(boletos.rojos, sorteos.palabras_rojos), sorteos.rojos)
+                       if sorteos.rojos is not None else np.zeros_like(total_blancos))
+        especial = (boletos.especial[:, None] == sorteos.especial[None, :]
+                    if sorteos.especial is not None else np.zeros(total_blancos.shape, dtype=bool))
+
+        if premios is None:
+            filas = zip(*np.nonzero(total_blancos + total_rojos + especial >= minimo))
+        else:
+            segundo = total_rojos if sorteos.rojos is not None else especial
+            nivel, premio = premios.principal.evaluar(total_blancos, segundo, multiplicadores)
+            filas = zip(*np.nonzero(nivel >= 0))
+        for b, s in filas:
+            fila = (int(boletos.lineas[b]), sorteos.fechas[s], int(total_blancos[b, s]),
+                    int(total_rojos[b, s]), int(especial[b, s]), 0)
+            yield fila if premios is None else fila + (_premio(premios.principal, nivel[b, s], premio[b, s]),)
+
+        if sorteos.con_doble_jugada:
+            doble_blancos = aciertos(blancos, sorteos.doble_blancos)
+            doble_especial = boletos.especial[:, None] == sorteos.doble_especial[None, :]
+            if premios is None:
+                filas = zip(*np.nonzero(doble_blancos + doble_especial >= minimo))
+            else:
+                nivel, premio = premios.doble.evaluar(doble_blancos, doble_especial)
+                filas = zip(*np.nonzero(nivel >= 0))
+            for b, d in filas:
+                fila = (int(boletos.lineas[b]), sorteos.fechas[sorteos.filas_doble[d]],
+                        int(doble_blancos[b, d]), 0, int(doble_especial[b, d]), 1)
+                yield fila if premios is None else fila + (_premio(premios.doble, nivel[b, d], premio[b, d]),)
+
+
+def _premio(tabla, nivel, monto):
+    return int(monto) if tabla.es_fijo(nivel) else tabla.descripcion(nivel)
+
+
+def columnas(sorteos, con_premio=False):
+    """Encabezado del CSV: solo las columnas que aplican al juego."""
+    cfg = sorteos.cfg
+    encabezado = ['boleto', 'fecha', 'blancas']
+    if sorteos.rojos is not None:
+        encabezado.append('rojas')
+    if sorteos.especial is not None:
+        encabezado.append(cfg['bola_especial'])
+    if sorteos.con_doble_jugada:
+        encabezado.append('doble_jugada')
+    if con_premio:
+        encabezado.append('premio')
+    return encabezado
+
+
+def escribir_csv(filas, sorteos, salida, con_premio=False):
+    """Escribe las coincidencias a medida que llegan; devuelve cuántas fueron
+    y la suma de los premios fijos."""
+    encabezado = columnas(sorteos, con_premio)
+    incluir = [True, True, True, sorteos.rojos is not None, sorteos.especial is not None,
+               sorteos.con_doble_jugada, True]
+    escritor = csv.writer(salida, lineterminator='\n')
+    escritor.writerow(encabezado)
+    total = monto = 0
+    for fila in filas:
+        escritor.writerow([v for v, si in zip(fila, incluir) if si])
+        total += 1
+        if con_premio and isinstance(fila[-1], int):
+            monto += fila[-1]
+    return total, monto
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Verifica boletos contra todo el histórico de un juego')
+    parser.add_argument('juego', choices=list(GAMES))
+    parser.add_argument('boletos', help="archivo de boletos, uno por línea ('-' para stdin)")
+    parser.add_argument('--salida', '-o', help='CSV de coincidencias (por defecto stdout)')
+    parser.add_argument('--minimo', type=int, default=VERIFICADOR_MINIMO_ACIERTOS,
+                        help=f'aciertos mínimos para listar (por defecto {VERIFICADOR_MINIMO_ACIERTOS})')
+    parser.add_argument('--desde', help='solo sorteos desde esta fecha (YYYY-MM-DD)')
+    parser.add_argument('--hasta', help='solo sorteos hasta esta fecha (YYYY-MM-DD)')
+    parser.add_argument('--bloque', type=int, default=VERIFICADOR_BLOQUE,
+                        help=f'boletos por bloque (por defecto {VERIFICADOR_BLOQUE})')
+    parser.add_argument('--premios', action='store_true',
+                        help='listar solo boletos premiados, con el premio (ignora --minimo)')
+    parser.add_argument('--sin-multiplicador', action='store_true',
+                        help='boletos sin el multiplicador opcional (Power Play, All Star Bonus)')
+    parser.add_argument('--sin-doble-jugada', action='store_true',
+                        help='boletos sin la Double Play (Powerball): no se verifican sus números')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    cfg = GAMES[args.juego]
+    tabla = TablaSorteos.desde_store(args.juego, desde=args.desde, hasta=args.hasta, con_actualizacion=False)
+    historico_store.cerrar_stores()
+    sorteos = SorteosCodificados(tabla, con_doble_jugada=not args.sin_doble_jugada)
+
+    inicio = time.monotonic()
+    conteo = {}
+    entrada = sys.stdin if args.boletos == '-' else open(args.boletos, 'r', encoding='utf-8')
+    salida = open(args.salida, 'w', encoding='utf-8', newline='') if args.salida else sys.stdout
+    try:
+        bloques = leer_boletos(entrada, cfg, args.bloque, conteo)
+        premios = premios_juego.de_juego(args.juego) if args.premios else None
+        filas = coincidencias(bloques, sorteos, args.minimo, premios, not args.sin_multiplicador)
+        total, monto = escribir_csv(filas, sorteos, salida, con_premio=args.premios)
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+
+    encontrado = (f"{total} premios (${monto:,} en premios fijos)" if args.premios
+                  else f"{total} coincidencias con {args.minimo}+ aciertos")
+    logging.info(f"[{cfg['nombre']}] {conteo['boletos']} boletos contra {len(sorteos)} sorteos: "
+                 f"{encontrado}, {len(conteo['invalidos'])} líneas inválidas "
+                 f"({time.monotonic() - inicio:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()